@@ -1,12 +1,11 @@
 from flask import Flask
 from flask_cors import CORS
-from .extensions import mongo, jwt
+from .extensions import mongo, jwt, blacklist
+from .utils.db_utils import mongo_client_options, parse_route_read_preferences, read_preference_mode
+from .utils.json_utils import json_provider_class
 import logging
 from dotenv import load_dotenv
 import os
-import json
-from datetime import datetime
-from bson import ObjectId
 
 load_dotenv()
 
@@ -20,38 +19,142 @@ logger = logging.getLogger(__name__)
 def create_app():
     app = Flask(__name__)
 
-    # Configurar encoder JSON personalizado para manejar datetime y ObjectId
-    from flask.json.provider import DefaultJSONProvider
-    
-    class CustomJSONProvider(DefaultJSONProvider):
-        def default(self, obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            if isinstance(obj, ObjectId):
-                return str(obj)
-            return super().default(obj)
-    
-    app.json = CustomJSONProvider(app)
+    # Proveedor JSON que serializa datetime y ObjectId: "auto" usa orjson si está instalado
+    app.config["JSON_PROVIDER"] = os.getenv("JSON_PROVIDER", "auto")
 
     # Config seguridad
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "clave-secreta-development") #Quitar segundo parámetro para producción
     app.config["JWT_SECRET_KEY"] = os.getenv("SECRET_KEY", "clave-secreta-jwt")
     app.config["JWT_BLACKLIST_ENABLED"] = True
     app.config["JWT_BLACKLIST_TOKEN_CHECKS"] = ["access"]
+    # Backend de tokens revocados: "mongo" (compartido, con TTL) o "memory" (un solo proceso)
+    app.config["JWT_BLOCKLIST_BACKEND"] = os.getenv("JWT_BLOCKLIST_BACKEND", "mongo")
+    app.config["JWT_BLOCKLIST_SYNC_SECONDS"] = float(os.getenv("JWT_BLOCKLIST_SYNC_SECONDS", 1.0))
+    # Sin sincronizar durante más de este tiempo, los tokens se rechazan (fail closed)
+    app.config["JWT_BLOCKLIST_MAX_STALE_SECONDS"] = float(os.getenv("JWT_BLOCKLIST_MAX_STALE_SECONDS", 5.0))
+
+    # Hash de contraseñas: método de werkzeug (p. ej. "scrypt:32768:8:1", "pbkdf2:sha256:600000"),
+    # procesos del pool por worker (0 = en el hilo de la petición) y operaciones pendientes máximas
+    app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    app.config["PASSWORD_HASH_MAX_PENDING"] = int(os.getenv("PASSWORD_HASH_MAX_PENDING", (os.cpu_count() or 1) * 4))
+    app.config["PASSWORD_HASH_QUEUE_TIMEOUT"] = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 0.5))
 
     # MongoDB config
-    app.config["MONGO_URI"] = "mongodb://localhost:27017/db_plataforma_donaciones"
+    app.config["MONGO_URI"] = os.getenv("MONGO_URI", "mongodb://localhost:27017/db_plataforma_donaciones")
+    # Pool de conexiones y timeouts (ms); los que no se definan usan los valores por defecto de pymongo
+    for key in ("MONGO_MAX_POOL_SIZE", "MONGO_MIN_POOL_SIZE", "MONGO_MAX_IDLE_TIME_MS",
+                "MONGO_WAIT_QUEUE_TIMEOUT_MS", "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+                "MONGO_CONNECT_TIMEOUT_MS", "MONGO_SOCKET_TIMEOUT_MS"):
+        if os.getenv(key):
+            app.config[key] = int(os.getenv(key))
+    # Compresión de red, p. ej. "zstd,snappy,zlib" (zstd y snappy requieren zstandard / python-snappy)
+    app.config["MONGO_COMPRESSORS"] = os.getenv("MONGO_COMPRESSORS", "")
+    # Read preference de las lecturas que la admiten (read_db), global y por endpoint
+    app.config["MONGO_READ_PREFERENCE"] = read_preference_mode(os.getenv("MONGO_READ_PREFERENCE", "primary"))
+    app.config["MONGO_ROUTE_READ_PREFERENCES"] = parse_route_read_preferences(os.getenv("MONGO_ROUTE_READ_PREFERENCES", ""))
+    # Crear los índices registrados al arrancar (también disponible: flask ensure-indexes)
+    app.config["MONGO_AUTO_INDEX"] = os.getenv("MONGO_AUTO_INDEX", "false").lower() == "true"
+
+    # Feed híbrido: creadores con al menos este número de seguidores se leen en modo pull
+    app.config["FEED_CELEBRITY_THRESHOLD"] = int(os.getenv("FEED_CELEBRITY_THRESHOLD", 10000))
+
+    # Likes en modo write-behind (buffer por worker volcado periódicamente)
+    app.config["LIKE_WRITE_BEHIND"] = os.getenv("LIKE_WRITE_BEHIND", "false").lower() == "true"
+    app.config["LIKE_BUFFER_FLUSH_SECONDS"] = float(os.getenv("LIKE_BUFFER_FLUSH_SECONDS", 1.0))
+    app.config["LIKE_BUFFER_MAX_PENDING"] = int(os.getenv("LIKE_BUFFER_MAX_PENDING", 10000))
+
+    # Autocompletado de creadores: segundos entre recargas del trie en memoria
+    app.config["AUTOCOMPLETE_REFRESH_SECONDS"] = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", 600))
+
+    # Caché de documentos de usuario por worker (LRU con caducidad)
+    app.config["USER_CACHE_MAX_SIZE"] = int(os.getenv("USER_CACHE_MAX_SIZE", 10000))
+    app.config["USER_CACHE_TTL_SECONDS"] = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+
+    # Caché del panel de creador por worker (se invalida al cambiar sus estadísticas)
+    app.config["DASHBOARD_CACHE_MAX_SIZE"] = int(os.getenv("DASHBOARD_CACHE_MAX_SIZE", 5000))
+    app.config["DASHBOARD_CACHE_TTL_SECONDS"] = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", 15))
+
+    # Cola de tareas diferidas: "thread" (hilo en cada worker web), "worker" (solo procesos
+    # flask worker) o "inline" (se ejecutan en la propia petición; desarrollo y pruebas)
+    app.config["TASK_QUEUE_MODE"] = os.getenv("TASK_QUEUE_MODE", "thread")
+    app.config["TASK_WORKER_CONCURRENCY"] = int(os.getenv("TASK_WORKER_CONCURRENCY", 2))
+    app.config["TASK_POLL_SECONDS"] = float(os.getenv("TASK_POLL_SECONDS", 1.0))
+    app.config["TASK_LEASE_SECONDS"] = float(os.getenv("TASK_LEASE_SECONDS", 60))
+    app.config["TASK_RETRY_BACKOFF_SECONDS"] = float(os.getenv("TASK_RETRY_BACKOFF_SECONDS", 2))
+    app.config["TASK_RETRY_BACKOFF_MAX_SECONDS"] = float(os.getenv("TASK_RETRY_BACKOFF_MAX_SECONDS", 300))
+
+    # Borrado en cascada en segundo plano (cuentas y posts eliminados)
+    app.config["CASCADE_BATCH_SIZE"] = int(os.getenv("CASCADE_BATCH_SIZE", 500))
+    app.config["CASCADE_BATCH_PAUSE_SECONDS"] = float(os.getenv("CASCADE_BATCH_PAUSE_SECONDS", 0.05))
+
+    # Formato de las wallets de los creadores: "collection" (colección creator_wallets) o
+    # "embedded" (en el documento del usuario; migrar antes con flask migrate-wallets)
+    app.config["WALLET_STORAGE"] = os.getenv("WALLET_STORAGE", "collection")
+
+    # Token para la ruta interna /metrics (sin token, la ruta está desactivada)
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN", "")
+
+    # Carga masiva de donaciones (exportaciones del indexador de la cadena): token de la
+    # ruta /donations/ingest (sin token, la ruta está desactivada) y registros por lote
+    app.config["DONATION_INGEST_TOKEN"] = os.getenv("DONATION_INGEST_TOKEN", "")
+    app.config["DONATION_INGEST_CHUNK_SIZE"] = int(os.getenv("DONATION_INGEST_CHUNK_SIZE", 1000))
+
+    # Rollups de donaciones: días que se conservan los buckets por hora (compact-donation-rollups)
+    app.config["DONATION_ROLLUP_HOURLY_RETENTION_DAYS"] = int(os.getenv("DONATION_ROLLUP_HOURLY_RETENTION_DAYS", 7))
 
     # Inicializa extensiones
-    mongo.init_app(app)
+    mongo.init_app(app, **mongo_client_options(app))
+    # Después de mongo.init_app, que instala su propio proveedor (Extended JSON de bson)
+    app.json = json_provider_class(app.config["JSON_PROVIDER"])(app)
     jwt.init_app(app)
+    blacklist.init_app(app)
+
+    from .utils.password_utils import password_hasher
+    password_hasher.init_app(app)
     CORS(app)
 
+    from .utils.like_buffer import like_buffer
+    like_buffer.init_app(app)
+
+    from .utils.autocomplete_utils import creator_autocomplete
+    creator_autocomplete.init_app(app)
+
+    from .utils.user_utils import init_user_cache
+    init_user_cache(app)
+
+    from .utils.dashboard_utils import init_dashboard_cache
+    init_dashboard_cache(app)
+
+    from .utils.wallet_utils import wallet_store
+    wallet_store.init_app(app)
+
+    from .utils.task_queue import task_queue
+    task_queue.init_app(app)
+
+    from .utils.cascade_utils import cascade_deleter
+    cascade_deleter.init_app(app)
+
     # Importa y registra Blueprints
     from .routes.auth_routes import auth_bp
     from .routes.user_routes import user_bp
+    from .routes.metrics_routes import metrics_bp
+    from .routes.donation_routes import donation_bp
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(user_bp, url_prefix='/user')
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")
+    app.register_blueprint(donation_bp, url_prefix="/donations")
+
+    # Registra comandos CLI de mantenimiento
+    from .commands import register_commands
+    register_commands(app)
+
+    if app.config["MONGO_AUTO_INDEX"]:
+        from .models.indexes import ensure_indexes
+        with app.app_context():
+            for collection, messages in ensure_indexes().items():
+                for message in messages:
+                    app.logger.error(f"[ensure_indexes] {collection}: {message}")
 
     return app
 
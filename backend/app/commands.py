@@ -0,0 +1,215 @@
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from typing import Any, Dict, Optional, Tuple
+
+from .extensions import mongo
+from .models.indexes import INDEX_REGISTRY, check_query_plans, ensure_indexes
+from .utils.timeline_utils import rebuild_timeline
+from .utils.like_utils import reconcile_likes_counts, remove_duplicate_likes
+from .utils.stats_utils import rebuild_creator_stats
+from .utils.search_utils import backfill_search_fields
+from .utils.task_queue import task_queue
+from .utils.donation_utils import check_donation_totals, compact_donation_rollups, rebuild_donation_rollups
+from .utils.ingest_utils import INGEST_FORMATS, READERS, ingest_donations
+from .utils.wallet_utils import WALLET_STORAGE_MODES, migrate_wallets
+
+
+# COMANDOS DE MANTENIMIENTO (flask <comando>)
+
+def _ensure_indexes_or_fail(*collections: str) -> None:
+    """Crea los índices registrados de las colecciones y aborta el comando si alguno falla"""
+    errors = ensure_indexes(collections or None)
+    for collection, messages in errors.items():
+        for message in messages:
+            click.echo(f"Error creando índice en {collection}: {message}", err=True)
+    if errors:
+        raise click.exceptions.Exit(1)
+
+
+@click.command("ensure-indexes")
+@click.option("--collection", "collections", multiple=True, help="Limitar a esta colección (repetible)")
+@with_appcontext
+def ensure_indexes_command(collections: Tuple[str, ...]) -> None:
+    """Crea los índices declarados en el registro (models/indexes.py)"""
+    unknown = [name for name in collections if name not in INDEX_REGISTRY]
+    if unknown:
+        raise click.BadParameter(f"Colecciones sin índices registrados: {', '.join(unknown)}")
+    _ensure_indexes_or_fail(*collections)
+    click.echo(f"Índices verificados: {', '.join(collections or INDEX_REGISTRY)}")
+
+
+@click.command("check-indexes")
+@with_appcontext
+def check_indexes_command() -> None:
+    """Ejecuta explain() sobre las consultas de las rutas y falla si alguna hace COLLSCAN"""
+    failures = check_query_plans()
+    for name, collection, stages in failures:
+        click.echo(f"COLLSCAN en {collection} ({name}): {' -> '.join(stages)}", err=True)
+    if failures:
+        raise click.exceptions.Exit(1)
+    click.echo("Todas las consultas registradas usan índices")
+
+
+@click.command("rebuild-timelines")
+@click.option("--email", default=None, help="Reconstruir solo el timeline de este follower")
+@with_appcontext
+def rebuild_timelines_command(email: Optional[str]) -> None:
+    """Reconstruye los timelines materializados de los followers"""
+    _ensure_indexes_or_fail("timelines")
+
+    if email:
+        emails = [email]
+    else:
+        emails = mongo.db.followings.distinct("follower_email")
+
+    total_entries = 0
+    for follower_email in emails:
+        total_entries += rebuild_timeline(follower_email)
+
+    click.echo(f"Timelines reconstruidos: {len(emails)} ({total_entries} entradas)")
+
+
+@click.command("reconcile-likes")
+@click.option("--post-id", default=None, help="Reconciliar solo este post")
+@with_appcontext
+def reconcile_likes_command(post_id: Optional[str]) -> None:
+    """Elimina likes duplicados, crea el índice único y recalcula likes_count de los posts"""
+    if not post_id:
+        removed = remove_duplicate_likes()
+        _ensure_indexes_or_fail("likes")
+        click.echo(f"Likes duplicados eliminados: {removed}")
+
+    fixed = reconcile_likes_counts(post_id)
+    click.echo(f"Contadores de likes corregidos: {fixed}")
+
+
+@click.command("rebuild-creator-stats")
+@with_appcontext
+def rebuild_creator_stats_command() -> None:
+    """Recalcula la colección creator_stats desde followings, posts y donations"""
+    _ensure_indexes_or_fail("creator_stats")
+    written = rebuild_creator_stats()
+    click.echo(f"Estadísticas de creadores reconstruidas: {written}")
+
+
+@click.command("check-donation-totals")
+@click.option("--fix", is_flag=True, help="Reescribir los totales de los creadores con diferencias")
+@with_appcontext
+def check_donation_totals_command(fix: bool) -> None:
+    """Compara los totales de donaciones de creator_stats con la agregación sobre donations"""
+    mismatches = check_donation_totals(fix)
+    for email, stored, expected in mismatches:
+        click.echo(
+            f"{email}: guardado {stored.get('donations_total', 0)} ({stored.get('donations_count', 0)}), "
+            f"esperado {expected['donations_total']} ({expected['donations_count']})",
+            err=True
+        )
+    if mismatches and not fix:
+        raise click.exceptions.Exit(1)
+    click.echo(f"Creadores con diferencias{' corregidos' if fix else ''}: {len(mismatches)}")
+
+
+@click.command("rebuild-donation-rollups")
+@with_appcontext
+def rebuild_donation_rollups_command() -> None:
+    """Recalcula los rollups de donaciones por hora y por día desde la colección donations"""
+    _ensure_indexes_or_fail("donation_rollups")
+    written = rebuild_donation_rollups(current_app.config["DONATION_ROLLUP_HOURLY_RETENTION_DAYS"])
+    click.echo(f"Rollups de donaciones reconstruidos: {written}")
+
+
+@click.command("compact-donation-rollups")
+@click.option("--retention-days", default=None, type=int,
+              help="Días de rollups por hora a conservar (por defecto DONATION_ROLLUP_HOURLY_RETENTION_DAYS)")
+@with_appcontext
+def compact_donation_rollups_command(retention_days: Optional[int]) -> None:
+    """Elimina los rollups por hora antiguos (sus días quedan en los rollups diarios)"""
+    if retention_days is None:
+        retention_days = current_app.config["DONATION_ROLLUP_HOURLY_RETENTION_DAYS"]
+    removed = compact_donation_rollups(retention_days)
+    click.echo(f"Rollups por hora compactados: {removed}")
+
+
+@click.command("ingest-donations")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option("--format", "input_format", type=click.Choice(INGEST_FORMATS), default=None,
+              help="Formato del fichero (por defecto, según la extensión)")
+@click.option("--chunk-size", default=None, type=int, help="Registros por lote (por defecto DONATION_INGEST_CHUNK_SIZE)")
+@with_appcontext
+def ingest_donations_command(path: str, input_format: Optional[str], chunk_size: Optional[int]) -> None:
+    """Carga donaciones desde un fichero NDJSON o CSV (- para la entrada estándar)"""
+    if input_format is None:
+        input_format = "csv" if path.lower().endswith(".csv") else "ndjson"
+    _ensure_indexes_or_fail("donations")
+
+    def progress(report: Dict[str, Any]) -> None:
+        click.echo(f"  {report['rows']} filas ({report['rows_per_second']} filas/s)", err=True)
+
+    with click.open_file(path, "rb") as stream:
+        report = ingest_donations(
+            READERS[input_format](stream),
+            chunk_size=chunk_size or current_app.config["DONATION_INGEST_CHUNK_SIZE"],
+            on_chunk=progress
+        )
+    for error in report["errors"]:
+        click.echo(f"Fila {error['row'] or '-'}: {error['error']}", err=True)
+    click.echo(
+        f"Donaciones: {report['rows']} filas, {report['inserted']} insertadas, "
+        f"{report['duplicates']} duplicadas, {report['invalid']} no válidas "
+        f"en {report['seconds']} s ({report['rows_per_second']} filas/s)"
+    )
+
+
+@click.command("build-search-index")
+@with_appcontext
+def build_search_index_command() -> None:
+    """Rellena username_lower en los usuarios y crea los índices de búsqueda de creadores"""
+    updated = backfill_search_fields()
+    _ensure_indexes_or_fail("users")
+    click.echo(f"Usuarios actualizados para la búsqueda: {updated}")
+
+
+@click.command("migrate-wallets")
+@click.option("--to", "target", type=click.Choice(WALLET_STORAGE_MODES), required=True, help="Formato de destino")
+@with_appcontext
+def migrate_wallets_command(target: str) -> None:
+    """Copia las wallets de los creadores al formato indicado (después, cambiar WALLET_STORAGE)"""
+    _ensure_indexes_or_fail("users" if target == "embedded" else "creator_wallets")
+    migrated = migrate_wallets(target)
+    click.echo(f"Creadores con wallets migradas a {target}: {migrated}")
+    if current_app.config["WALLET_STORAGE"] != target:
+        click.echo(f"Configura WALLET_STORAGE={target} para usar el nuevo formato")
+
+
+@click.command("worker")
+@click.option("--concurrency", default=None, type=int, help="Tareas simultáneas (por defecto TASK_WORKER_CONCURRENCY)")
+@click.option("--executor", type=click.Choice(["thread", "process"]), default="thread", help="Pool de hilos o de procesos")
+@click.option("--task", "names", multiple=True, help="Procesar solo este tipo de tarea (repetible)")
+@click.option("--once", is_flag=True, help="Terminar cuando no queden tareas disponibles")
+@with_appcontext
+def worker_command(concurrency: Optional[int], executor: str, names: Tuple[str, ...], once: bool) -> None:
+    """Ejecuta las tareas diferidas de la cola (colección tasks)"""
+    unknown = [name for name in names if name not in task_queue.handlers]
+    if unknown:
+        raise click.BadParameter(f"Tareas no registradas: {', '.join(unknown)}")
+    _ensure_indexes_or_fail("tasks")
+    click.echo(f"Worker {task_queue.worker_id}: {', '.join(names or task_queue.handlers)}")
+    processed = task_queue.run_worker(concurrency, executor, names or None, once)
+    click.echo(f"Tareas procesadas: {processed}")
+
+
+def register_commands(app: Flask) -> None:
+    """Registra los comandos CLI de mantenimiento en la aplicación"""
+    app.cli.add_command(ensure_indexes_command)
+    app.cli.add_command(check_indexes_command)
+    app.cli.add_command(rebuild_timelines_command)
+    app.cli.add_command(reconcile_likes_command)
+    app.cli.add_command(rebuild_creator_stats_command)
+    app.cli.add_command(check_donation_totals_command)
+    app.cli.add_command(ingest_donations_command)
+    app.cli.add_command(rebuild_donation_rollups_command)
+    app.cli.add_command(compact_donation_rollups_command)
+    app.cli.add_command(build_search_index_command)
+    app.cli.add_command(migrate_wallets_command)
+    app.cli.add_command(worker_command)
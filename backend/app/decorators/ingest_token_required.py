@@ -0,0 +1,19 @@
+import hmac
+from flask import jsonify, current_app, request
+from functools import wraps
+
+# Decorador para la ruta interna de carga de donaciones: exige la cabecera X-Ingest-Token
+def ingest_token_required(fn):
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        expected = current_app.config.get("DONATION_INGEST_TOKEN")
+        if not expected:
+            # Sin token configurado la carga por HTTP está desactivada
+            return jsonify({"error": "Recurso no encontrado"}), 404
+
+        provided = request.headers.get("X-Ingest-Token", "")
+        if not hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8")):
+            return jsonify({"error": "No tienes permisos para acceder a esta ruta"}), 403
+
+        return fn(*args, **kwargs)
+    return decorated
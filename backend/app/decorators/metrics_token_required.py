@@ -0,0 +1,19 @@
+import hmac
+from flask import jsonify, current_app, request
+from functools import wraps
+
+# Decorador para rutas internas de métricas: exige la cabecera X-Metrics-Token
+def metrics_token_required(fn):
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        expected = current_app.config.get("METRICS_TOKEN")
+        if not expected:
+            # Sin token configurado las métricas están desactivadas
+            return jsonify({"error": "Recurso no encontrado"}), 404
+
+        provided = request.headers.get("X-Metrics-Token", "")
+        if not hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8")):
+            return jsonify({"error": "No tienes permisos para acceder a esta ruta"}), 403
+
+        return fn(*args, **kwargs)
+    return decorated
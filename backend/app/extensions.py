@@ -1,10 +1,12 @@
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager
+from .utils.blocklist_utils import TokenBlocklist
 
 mongo = PyMongo()
 
 jwt = JWTManager()
-blacklist = set()
+# Tokens revocados (logout, borrado de cuenta), compartidos entre workers
+blacklist = TokenBlocklist(mongo)
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload):
     return jwt_payload["jti"] in blacklist
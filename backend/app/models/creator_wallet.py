@@ -1,9 +1,19 @@
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
+from pymongo import ASCENDING, IndexModel
 
 class CreatorWallet:
     """Modelo para gestionar las direcciones de wallet de los creadores"""
 
+    # Índices de la colección creator_wallets (ver models/indexes.py)
+    INDEXES: List[IndexModel] = [
+        IndexModel([("creator_email", ASCENDING), ("currency_type", ASCENDING)], unique=True),
+        # Dueño de una dirección en la carga masiva de donaciones
+        IndexModel([("wallet_address", ASCENDING)])
+    ]
+
+    __slots__ = ("creator_email", "wallet_address", "currency_type", "created_at")
+
     SUPPORTED_CURRENCIES: list[str] = [
         # Layer 1 Blockchains principales
         "BTC",    # Bitcoin
@@ -60,9 +70,14 @@ class CreatorWallet:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CreatorWallet':
-        """Crea una instancia desde un diccionario"""
-        return cls(
-            creator_email=data['creator_email'],
-            wallet_address=data['wallet_address'],
-            currency_type=data['currency_type']
-        )
\ No newline at end of file
+        """
+        Crea una instancia desde un diccionario (asignación directa, sin pasar por __init__)
+
+        No vuelve a validar la moneda: los documentos guardados ya pasaron por __init__.
+        """
+        wallet = cls.__new__(cls)
+        wallet.creator_email = data['creator_email']
+        wallet.wallet_address = data['wallet_address']
+        wallet.currency_type = data['currency_type']
+        wallet.created_at = data['created_at'] if 'created_at' in data else datetime.now()
+        return wallet
\ No newline at end of file
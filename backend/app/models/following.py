@@ -1,9 +1,19 @@
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class Following:
     """Modelo para gestionar la relación de seguimiento entre follower y creator"""
 
+    # Índices de la colección followings (ver models/indexes.py)
+    INDEXES: List[IndexModel] = [
+        IndexModel([("follower_email", ASCENDING), ("creator_email", ASCENDING)], unique=True),
+        # Seguidores de un creador, más recientes primero
+        IndexModel([("creator_email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    ]
+
+    __slots__ = ("follower_email", "creator_email", "created_at")
+
     def __init__(self, follower_email: str, creator_email: str, created_at: Optional[datetime] = None) -> None:
         """
         Args:
@@ -25,9 +35,9 @@ class Following:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Following':
-        """Crea una instancia desde un diccionario"""
-        return cls(
-            follower_email=data["follower_email"],
-            creator_email=data["creator_email"],
-            created_at=data.get("created_at", datetime.now())
-        )
\ No newline at end of file
+        """Crea una instancia desde un diccionario (asignación directa, sin pasar por __init__)"""
+        following = cls.__new__(cls)
+        following.follower_email = data["follower_email"]
+        following.creator_email = data["creator_email"]
+        following.created_at = data["created_at"] if "created_at" in data else datetime.now()
+        return following
\ No newline at end of file
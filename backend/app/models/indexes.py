@@ -0,0 +1,179 @@
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+from ..extensions import mongo
+from ..utils.blocklist_utils import REVOKED_TOKEN_INDEXES
+from ..utils.db_utils import DUPLICATE_KEY_ERROR
+from ..utils.task_queue import TASK_INDEXES
+from ..utils.pagination_utils import POPULAR_SORT, POSTS_SORT, RECENT_SORT, USERNAME_SORT
+from .creator_wallet import CreatorWallet
+from .following import Following
+from .like import Like
+from .post import Post
+from .user import User
+
+# Registro de índices por colección. Las colecciones con modelo declaran sus índices en
+# el propio modelo (atributo INDEXES); el resto se declaran aquí.
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": User.INDEXES,
+    "followings": Following.INDEXES,
+    "posts": Post.INDEXES,
+    "likes": Like.INDEXES,
+    "creator_wallets": CreatorWallet.INDEXES,
+    "donations": [
+        IndexModel([("receiver_email", ASCENDING)]),
+        # Deduplicación de la carga masiva: una donación por transacción y moneda
+        IndexModel(
+            [("currency_type", ASCENDING), ("tx_hash", ASCENDING)],
+            unique=True, partialFilterExpression={"tx_hash": {"$exists": True}}
+        )
+    ],
+    "timelines": [
+        # Lectura del timeline en orden TIMELINE_SORT
+        IndexModel([("follower_email", ASCENDING), ("created_at", DESCENDING), ("post_id", DESCENDING)]),
+        IndexModel([("follower_email", ASCENDING), ("post_id", ASCENDING)], unique=True),
+        IndexModel([("post_id", ASCENDING)]),
+        IndexModel([("follower_email", ASCENDING), ("creator_email", ASCENDING)]),
+        IndexModel([("creator_email", ASCENDING)])
+    ],
+    "creator_stats": [
+        IndexModel([("creator_email", ASCENDING)], unique=True),
+        # Orden "popular" (POPULAR_SORT) y su paginación por keyset
+        IndexModel([("followers_count", DESCENDING), ("creator_email", ASCENDING)])
+    ],
+    "donation_rollups": [
+        # Serie de un creador (/user/creator/donations/stats) y upsert de cada bucket
+        IndexModel([("creator_email", ASCENDING), ("granularity", ASCENDING), ("bucket", ASCENDING)], unique=True),
+        # Compactación de los rollups por hora antiguos
+        IndexModel([("granularity", ASCENDING), ("bucket", ASCENDING)])
+    ],
+    "revoked_tokens": REVOKED_TOKEN_INDEXES,
+    "tasks": TASK_INDEXES
+}
+
+# Ejemplos de valores repetidos que se muestran cuando no se puede crear un índice único
+MAX_REPORTED_DUPLICATES: int = 5
+
+# Formas de consulta de las rutas que deben resolverse con un índice:
+# (nombre, colección, filtro, orden)
+_EMAIL = "check@example.com"
+QUERY_SHAPES: List[Tuple[str, str, Dict[str, Any], Optional[List[Tuple[str, Any]]]]] = [
+    ("users por email", "users", {"email": _EMAIL}, None),
+    ("users por username", "users", {"username": "check"}, None),
+    ("creadores alfabético", "users", {"role": "creator"}, USERNAME_SORT),
+    ("creadores recientes", "users", {"role": "creator"}, RECENT_SORT),
+    ("búsqueda por prefijo", "users", {"role": "creator", "username_lower": {"$regex": "^che"}},
+     [("username_lower", ASCENDING)]),
+    ("búsqueda en bio", "users", {"$text": {"$search": "check"}, "role": "creator"}, None),
+    ("creadores seguidos", "followings", {"follower_email": _EMAIL}, None),
+    ("relación de seguimiento", "followings", {"follower_email": _EMAIL, "creator_email": _EMAIL}, None),
+    ("seguidores de un creador", "followings", {"creator_email": _EMAIL}, RECENT_SORT),
+    ("posts de un creador", "posts", {"creator_email": _EMAIL}, POSTS_SORT),
+    ("feed en modo pull", "posts", {"creator_email": {"$in": [_EMAIL, "other@example.com"]}}, POSTS_SORT),
+    ("like de un usuario", "likes", {"post_id": str(ObjectId()), "user_email": _EMAIL}, None),
+    ("likes de un usuario", "likes", {"user_email": _EMAIL}, None),
+    ("wallets de un creador", "creator_wallets", {"creator_email": _EMAIL}, None),
+    ("wallet por moneda", "creator_wallets", {"creator_email": _EMAIL, "currency_type": "BTC"}, None),
+    ("wallets por dirección", "creator_wallets", {"wallet_address": {"$in": ["check"]}}, None),
+    ("wallets embebidas por dirección", "users", {"wallets.wallet_address": {"$in": ["check"]}}, None),
+    ("donaciones recibidas", "donations", {"receiver_email": _EMAIL}, None),
+    ("donación por transacción", "donations", {"currency_type": "BTC", "tx_hash": "check"}, None),
+    ("timeline", "timelines", {"follower_email": _EMAIL}, [("created_at", -1), ("post_id", -1)]),
+    ("entradas de un post", "timelines", {"post_id": ObjectId()}, None),
+    ("entradas de un creador", "timelines", {"creator_email": _EMAIL}, None),
+    ("entradas de un follower y creador", "timelines", {"follower_email": _EMAIL, "creator_email": _EMAIL}, None),
+    ("estadísticas de un creador", "creator_stats", {"creator_email": _EMAIL}, None),
+    ("serie de donaciones", "donation_rollups",
+     {"creator_email": _EMAIL, "granularity": "day", "bucket": {"$gte": datetime(2000, 1, 1)}}, None),
+    ("compactación de rollups", "donation_rollups", {"granularity": "hour", "bucket": {"$lt": datetime(2000, 1, 1)}}, None),
+    ("ranking popular", "creator_stats", {}, POPULAR_SORT),
+    ("sincronización de revocados", "revoked_tokens", {"revoked_at": {"$gte": datetime(2000, 1, 1)}}, None),
+    ("siguiente tarea disponible", "tasks",
+     {"status": {"$in": ["pending", "running"]}, "available_at": {"$lte": datetime(2000, 1, 1)}}, [("available_at", ASCENDING)])
+]
+
+
+def _duplicate_values(name: str, index: IndexModel) -> List[Any]:
+    """Valores repetidos (hasta MAX_REPORTED_DUPLICATES) que impiden crear un índice único"""
+    keys = list(index.document["key"])
+    partial = index.document.get("partialFilterExpression")
+    pipeline: List[Dict[str, Any]] = [{"$match": partial}] if partial else []
+    pipeline += [
+        {"$group": {"_id": {f"k{i}": f"${key}" for i, key in enumerate(keys)}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": MAX_REPORTED_DUPLICATES}
+    ]
+    return [
+        item["_id"].get("k0") if len(keys) == 1 else tuple(item["_id"].get(f"k{i}") for i in range(len(keys)))
+        for item in mongo.db[name].aggregate(pipeline, allowDiskUse=True)
+    ]
+
+
+def ensure_indexes(collections: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """
+    Crea los índices registrados (idempotente: los existentes no se modifican)
+
+    Cada índice se crea por separado para que un fallo (p. ej. datos duplicados que
+    impiden un índice único) no impida crear los demás. Si un índice único falla por
+    datos duplicados, el error indica los campos y algunos de los valores repetidos.
+
+    Args:
+        collections: Limitar a estas colecciones (por defecto, todas las registradas)
+
+    Returns:
+        Diccionario colección -> errores encontrados (vacío si todo fue bien)
+    """
+    errors: Dict[str, List[str]] = {}
+    for name in collections or INDEX_REGISTRY:
+        for index in INDEX_REGISTRY[name]:
+            try:
+                mongo.db[name].create_indexes([index])
+            except PyMongoError as e:
+                message = f"{index.document['name']}: {e}"
+                if index.document.get("unique") and getattr(e, "code", None) == DUPLICATE_KEY_ERROR:
+                    fields = ", ".join(index.document["key"])
+                    try:
+                        examples = ", ".join(repr(value) for value in _duplicate_values(name, index))
+                    except PyMongoError:
+                        examples = "no disponibles"
+                    message = (
+                        f"{index.document['name']}: hay documentos con el mismo valor en ({fields}); "
+                        f"corregirlos y volver a ejecutar ensure-indexes. Valores repetidos: {examples}"
+                    )
+                errors.setdefault(name, []).append(message)
+    return errors
+
+
+def _plan_stages(plan: Any) -> Iterable[str]:
+    """Todas las etapas (stage) de un plan de explain(), recorriendo los planes anidados"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def check_query_plans() -> List[Tuple[str, str, List[str]]]:
+    """
+    Ejecuta explain() sobre cada forma de consulta registrada
+
+    Returns:
+        Lista (nombre, colección, etapas del plan ganador) de las consultas cuyo plan
+        incluye un COLLSCAN
+    """
+    failures: List[Tuple[str, str, List[str]]] = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = mongo.db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = list(_plan_stages(plan))
+        if "COLLSCAN" in stages:
+            failures.append((name, collection, stages))
+    return failures
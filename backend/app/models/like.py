@@ -1,12 +1,28 @@
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from pymongo import ASCENDING, IndexModel
 
 class Like:
-    """Modelo para los likes de posts"""
+    """
+    Modelo para los likes de posts
+
+    Existe un único documento por (post_id, user_email); quitar el like lo marca
+    como inactivo (active=False) en lugar de borrarlo. Los documentos anteriores
+    a este campo no lo tienen y cuentan como activos.
+    """
+
+    # Índices de la colección likes (ver models/indexes.py)
+    INDEXES: List[IndexModel] = [
+        IndexModel([("post_id", ASCENDING), ("user_email", ASCENDING)], unique=True),
+        IndexModel([("user_email", ASCENDING)])
+    ]
+
+    __slots__ = ("user_email", "post_id", "active", "created_at")
     
-    def __init__(self, user_email: str, post_id: str):
+    def __init__(self, user_email: str, post_id: str, active: bool = True):
         self.user_email = user_email
         self.post_id = post_id
+        self.active = active
         self.created_at = datetime.utcnow()
     
     def to_dict(self) -> Dict[str, Any]:
@@ -14,6 +30,7 @@ class Like:
         return {
             "user_email": self.user_email,
             "post_id": self.post_id,
+            "active": self.active,
             "created_at": self.created_at
         }
     
@@ -23,5 +40,6 @@ class Like:
         like = cls.__new__(cls)
         like.user_email = data["user_email"]
         like.post_id = data["post_id"]
-        like.created_at = data.get("created_at", datetime.utcnow())
+        like.active = data.get("active", True)
+        like.created_at = data["created_at"] if "created_at" in data else datetime.utcnow()
         return like
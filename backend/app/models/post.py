@@ -1,9 +1,18 @@
 from datetime import datetime
 from typing import Dict, Any, List, Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class Post:
     """Modelo para las publicaciones de los creadores"""
 
+    # Índices de la colección posts (ver models/indexes.py)
+    INDEXES: List[IndexModel] = [
+        # Posts de un creador y feed en modo pull, en orden POSTS_SORT
+        IndexModel([("creator_email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    ]
+
+    __slots__ = ("creator_email", "title", "content", "media_urls", "created_at", "updated_at", "likes_count")
+
     def __init__(
         self,
         creator_email: str,
@@ -33,14 +42,13 @@ class Post:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Post':
-        """Crea una instancia desde un diccionario"""
-        post = cls(
-            creator_email=data["creator_email"],
-            title=data["title"],
-            content=data["content"],
-            media_urls=data.get("media_urls", [])
-        )
-        post.created_at = data.get("created_at", datetime.now())
+        """Crea una instancia desde un diccionario (asignación directa, sin pasar por __init__)"""
+        post = cls.__new__(cls)
+        post.creator_email = data["creator_email"]
+        post.title = data["title"]
+        post.content = data["content"]
+        post.media_urls = data.get("media_urls") or []
+        post.created_at = data["created_at"] if "created_at" in data else datetime.now()
         post.updated_at = data.get("updated_at", post.created_at)
         post.likes_count = data.get("likes_count", 0)
         return post
\ No newline at end of file
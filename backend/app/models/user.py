@@ -1,11 +1,28 @@
 from datetime import datetime
-from typing import Dict, Any, Optional
-from werkzeug.security import generate_password_hash, check_password_hash
+from typing import Dict, Any, List, Optional
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
 from ..extensions import mongo
+from ..utils.password_utils import password_hasher
 
 class User:
     """Modelo de usuario"""
 
+    # Índices de la colección users (ver models/indexes.py)
+    INDEXES: List[IndexModel] = [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("username", ASCENDING)], unique=True),
+        # Listados de creadores: alfabético (USERNAME_SORT) y recientes (RECENT_SORT)
+        IndexModel([("role", ASCENDING), ("username", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("role", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        # Búsqueda: prefijo de username normalizado y texto de la bio
+        IndexModel([("role", ASCENDING), ("username_lower", ASCENDING)]),
+        IndexModel([("bio", TEXT)], name="bio_text", default_language="spanish"),
+        # Wallets embebidas (WALLET_STORAGE=embedded): dueño de una dirección en la carga de donaciones
+        IndexModel([("wallets.wallet_address", ASCENDING)], sparse=True)
+    ]
+
+    __slots__ = ("username", "email", "role", "first_name", "last_name", "password_hash", "created_at")
+
     def __init__(self, username: str, email: str, password: str, role: str = "follower", 
                  first_name: str = "", last_name: str = "", is_hashed: bool = False) -> None:
         self.username: str = username
@@ -13,13 +30,14 @@ class User:
         self.role: str = role
         self.first_name: str = first_name
         self.last_name: str = last_name
-        self.password_hash: str = password if is_hashed else generate_password_hash(password)
+        self.password_hash: str = password if is_hashed else password_hasher.hash_password(password)
         self.created_at: datetime = datetime.now()
 
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el objeto a diccionario para persistencia"""
         return {
             "username": self.username,
+            "username_lower": self.username.strip().lower(),  # Índice de búsqueda por prefijo
             "email": self.email,
             "role": self.role,
             "first_name": self.first_name,
@@ -30,17 +48,25 @@ class User:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'User':
-        """Crea una instancia desde un diccionario"""
-        return cls(
-            username=data["username"],
-            email=data["email"],
-            password=data["password"],
-            role=data["role"],
-            first_name=data.get("first_name", ""),
-            last_name=data.get("last_name", ""),
-            is_hashed=True
-        )
+        """
+        Crea una instancia desde un diccionario (asignación directa, sin pasar por __init__)
+
+        El campo password ya contiene el hash; se conserva el created_at guardado.
+        """
+        user = cls.__new__(cls)
+        user.username = data["username"]
+        user.email = data["email"]
+        user.role = data["role"]
+        user.first_name = data.get("first_name", "")
+        user.last_name = data.get("last_name", "")
+        user.password_hash = data["password"]
+        user.created_at = data["created_at"] if "created_at" in data else datetime.now()
+        return user
 
     def check_password(self, password: str) -> bool:
         """Verifica si la contraseña coincide"""
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return password_hasher.verify_password(self.password_hash, password)
+
+    def needs_rehash(self) -> bool:
+        """Indica si el hash de la contraseña usa parámetros distintos de los configurados"""
+        return password_hasher.needs_rehash(self.password_hash)
\ No newline at end of file
@@ -1,13 +1,17 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt, create_access_token
-from werkzeug.security import generate_password_hash
 from datetime import timedelta
 from typing import Dict, Any, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
 
 from ..models.user import User
 
 from ..extensions import mongo
 from ..extensions import blacklist
+from ..utils.stats_utils import init_creator_stats
+from ..utils.autocomplete_utils import creator_autocomplete
+from ..utils.password_utils import PasswordHashingBusyError, password_hasher
+from ..utils.user_utils import DELETED_ROLE, find_account_by_email, find_account_by_username, invalidate_user
 
 auth_bp = Blueprint("auth_bp", __name__)
 
@@ -20,19 +24,6 @@ MAX_PASSWORD_LENGTH: int = 128
 
 # FUNCIONES AUXILIARES
 
-
-def find_by_email(email: str) -> Optional[Dict[str, Any]]:
-    """
-    Busca un usuario por su correo electrónico en la base de datos
-    
-    Args:
-        email: El correo electrónico a buscar
-        
-    Returns:
-        Un diccionario con los datos del usuario si se encuentra, None en caso contrario
-    """
-    return mongo.db.users.find_one({"email": email})
-
 def save_user_to_db(user_dict: Dict[str, Any]) -> bool:
     """
     Guarda un usuario en la base de datos
@@ -42,10 +33,15 @@ def save_user_to_db(user_dict: Dict[str, Any]) -> bool:
         
     Returns:
         True si se guardó correctamente, False en caso contrario
+
+    Raises:
+        DuplicateKeyError: Si el email o el username ya están registrados
     """
     try:
         mongo.db.users.insert_one(user_dict)
         return True
+    except DuplicateKeyError:
+        raise
     except Exception as e:
         current_app.logger.error(f"Error guardando usuario: {e}")
         return False
@@ -80,9 +76,13 @@ def register():
             return jsonify({"error": "Contraseña demasiado larga"}), 400
 
         # Validar email
-        if find_by_email(data["email"]):
+        if find_account_by_email(data["email"]):
             return jsonify({"error": "El usuario ya existe"}), 409
 
+        # Validar username (índice único en users.username)
+        if find_account_by_username(data["username"]):
+            return jsonify({"error": "El nombre de usuario ya está en uso"}), 409
+
         # Crear usuario
         user = User(
             username=data["username"], 
@@ -95,10 +95,19 @@ def register():
         user_dict = user.to_dict()
         
         if save_user_to_db(user_dict):
+            # Los creadores entran en el ranking de popularidad desde el registro
+            if user.role == "creator":
+                init_creator_stats(user.email)
+                creator_autocomplete.add_creator(user.email, user.username)
             return jsonify({"message": "Usuario registrado con éxito"}), 201
         else:
             return jsonify({"error": "Error al registrar usuario"}), 500
 
+    except DuplicateKeyError:
+        # Otro registro con el mismo email o username se guardó entre la comprobación y la inserción
+        return jsonify({"error": "El usuario ya existe"}), 409
+    except PasswordHashingBusyError:
+        return jsonify({"error": "Servidor ocupado, inténtalo de nuevo"}), 503
     except Exception as e:
         current_app.logger.error(f"[register] Error: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
@@ -126,11 +135,20 @@ def login():
         # Obtener el valor de remember_me (por defecto False)
         remember_me = data.get("remember_me", False)
 
-        # Autenticar usuario
-        user_data = find_by_email(data["email"])
-        if user_data:
+        # Autenticar usuario (lectura sin caché: refleja cambios hechos en otros workers)
+        user_data = find_account_by_email(data["email"])
+        # Las cuentas eliminadas (tombstone) no pueden iniciar sesión
+        if user_data and user_data.get("role") != DELETED_ROLE:
             user = User.from_dict(user_data)
             if user.check_password(data["password"]):
+                # Rehash transparente si cambiaron los parámetros de hash configurados
+                if user.needs_rehash():
+                    mongo.db.users.update_one(
+                        {"email": user.email, "password": user.password_hash},
+                        {"$set": {"password": password_hasher.hash_password(data["password"])}}
+                    )
+                    invalidate_user(user.email)
+
                 # Configurar la duración del token basado en remember_me
                 if remember_me:
                     expires = timedelta(days=30)  # 30 días si "recordarme" está marcado
@@ -149,6 +167,8 @@ def login():
         
         return jsonify({"error": "Credenciales incorrectas"}), 401
 
+    except PasswordHashingBusyError:
+        return jsonify({"error": "Servidor ocupado, inténtalo de nuevo"}), 503
     except Exception as e:
         current_app.logger.error(f"[login] Error: {e}")
         return jsonify({"error": "Error interno del servidor"}), 500
@@ -166,8 +186,8 @@ def logout():
     Retorna: confirmación de cierre de sesión
     """
     try:
-        jti = get_jwt()["jti"]  # JWT ID
-        blacklist.add(jti)
+        claims = get_jwt()
+        blacklist.add(claims["jti"], claims.get("exp"))  # JWT ID y expiración
         return jsonify({"message": "Sesión cerrada correctamente"}), 200
     except Exception as e:
         return jsonify({"error": "Error al cerrar sesión"}), 500
\ No newline at end of file
@@ -0,0 +1,45 @@
+from flask import Blueprint, current_app, jsonify, request
+from typing import Any, Tuple
+
+from ..decorators.ingest_token_required import ingest_token_required
+from ..utils.ingest_utils import READERS, ingest_donations
+
+donation_bp = Blueprint("donation_bp", __name__)
+
+# Content-Type aceptados en la carga masiva
+INGEST_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv"
+}
+
+
+@donation_bp.route("/ingest", methods=["POST"])
+@ingest_token_required
+def ingest() -> Tuple[Any, int]:
+    """
+    Carga masiva de donaciones exportadas por el indexador de la cadena
+
+    Requiere: cabecera X-Ingest-Token igual a DONATION_INGEST_TOKEN
+    Recibe: cuerpo NDJSON (application/x-ndjson) o CSV con cabecera (text/csv); se lee
+    en streaming por lotes de DONATION_INGEST_CHUNK_SIZE registros
+    Retorna: informe con filas leídas, insertadas, duplicadas, no válidas y filas por segundo
+    """
+    try:
+        input_format = INGEST_CONTENT_TYPES.get(request.mimetype)
+        if input_format is None:
+            return jsonify({"error": "Content-Type no soportado. Use application/x-ndjson o text/csv"}), 415
+
+        report = ingest_donations(
+            READERS[input_format](request.stream),
+            chunk_size=current_app.config["DONATION_INGEST_CHUNK_SIZE"]
+        )
+        current_app.logger.info(
+            f"[ingest_donations] {report['rows']} filas, {report['inserted']} insertadas, "
+            f"{report['rows_per_second']} filas/s"
+        )
+        return jsonify(report), 200
+
+    except Exception as e:
+        current_app.logger.error(f"[ingest_donations] Error: {e}")
+        return jsonify({"error": "Error al cargar las donaciones"}), 500
@@ -0,0 +1,30 @@
+from flask import Blueprint, current_app, jsonify
+from typing import Any, Dict, Tuple
+
+from ..decorators.metrics_token_required import metrics_token_required
+from ..utils.db_utils import pool_metrics
+from ..utils.task_queue import task_queue
+from ..utils.dashboard_utils import dashboard_cache
+from ..utils.user_utils import user_cache_stats
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+
+@metrics_bp.route("", methods=["GET"])
+@metrics_token_required
+def get_metrics() -> Tuple[Any, int]:
+    """
+    Métricas internas de este worker (cachés, contadores)
+    
+    Requiere: cabecera X-Metrics-Token igual a METRICS_TOKEN
+    Retorna: contadores en JSON
+    """
+    metrics: Dict[str, Any] = {
+        "user_cache": user_cache_stats(),
+        "dashboard_cache": dashboard_cache.stats(),
+        # Sin MONGO_MAX_POOL_SIZE, pymongo usa 100 conexiones por servidor
+        "mongo_pool": pool_metrics.stats(current_app.config.get("MONGO_MAX_POOL_SIZE", 100)),
+        # Profundidad de la cola (compartida) y latencias de las tareas de este proceso
+        "task_queue": task_queue.stats()
+    }
+    return jsonify(metrics), 200
@@ -1,7 +1,6 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from werkzeug.security import generate_password_hash
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 from bson import ObjectId
@@ -11,62 +10,31 @@ from ..models.post import Post
 from ..models.user import User
 from ..models.following import Following
 from ..models.creator_wallet import CreatorWallet
-from ..models.like import Like
-from ..utils.like_utils import add_like_info_to_posts
+from ..utils.like_utils import add_like_info_to_posts, toggle_like, ACTIVE_LIKE_FILTER
+from ..utils.cascade_utils import cascade_deleter
+from ..utils.task_queue import task_queue
+from ..utils.like_buffer import like_buffer
+from ..utils.search_utils import SEARCH_FIELDS_EXCLUDED, normalize_username, search_creators as find_creators
+from ..utils.autocomplete_utils import AUTOCOMPLETE_TOP_K, creator_autocomplete
+from ..utils.password_utils import PasswordHashingBusyError, password_hasher
+from ..utils.user_utils import (
+    DELETED_ROLE, find_account_by_email, find_account_by_username, find_by_email, find_by_username, invalidate_user
+)
+from ..utils.db_utils import read_db
+from ..utils.dashboard_utils import get_creator_dashboard
+from ..utils.wallet_utils import WALLET_FIELDS_EXCLUDED, wallet_store
+from ..utils.donation_utils import STATS_RANGES, get_donation_series
+from ..utils.stats_utils import (
+    delete_creator_stats, get_creator_stats_map, increment_creator_stats, increment_many_creator_stats
+)
+from ..utils.feed_utils import build_feed, add_creator_info_to_posts, increment_followers
+from ..utils.pagination_utils import (
+    InvalidCursorError, POSTS_SORT, USERNAME_SORT, RECENT_SORT, POPULAR_SORT, apply_cursor, next_cursor
+)
 from ..extensions import mongo
 
 user_bp = Blueprint("user_bp", __name__)
 
-# FUNCIONES AUXILIARES
-
-def convert_bson_dates_to_iso(data):
-    """Convierte fechas BSON de MongoDB a strings ISO para JSON"""
-    if isinstance(data, dict):
-        if "$date" in data:
-            # Es una fecha BSON, convertir a ISO string
-            return data["$date"]
-        else:
-            # Es un diccionario normal, procesar recursivamente
-            return {key: convert_bson_dates_to_iso(value) for key, value in data.items()}
-    elif isinstance(data, list):
-        # Es una lista, procesar cada elemento
-        return [convert_bson_dates_to_iso(item) for item in data]
-    elif isinstance(data, datetime):
-        # Es un objeto datetime de Python
-        return data.isoformat() + "Z"
-    else:
-        # Es un valor primitivo, retornar tal como está
-        return data
-
-def process_post_for_json(post_dict):
-    """Procesa un post para serialización JSON correcta"""
-    # Convertir ObjectId a string
-    post_dict["_id"] = str(post_dict["_id"])
-    
-    # Convertir fechas BSON a ISO strings
-    post_dict = convert_bson_dates_to_iso(post_dict)
-    
-    return post_dict
-
-def find_by_email(email: str) -> Optional[Dict[str, Any]]:
-    """
-    Busca un usuario por su correo electrónico en la base de datos
-    
-    Args:
-        email: El correo electrónico a buscar
-        
-    Returns:
-        Un diccionario con los datos del usuario si se encuentra, None en caso contrario
-    """
-    try:
-        user_data = mongo.db.users.find_one({"email": email})
-        if user_data:
-            return user_data
-        return None
-    except Exception as e:
-        current_app.logger.error(f"[find_by_email] Error: {e}")
-        return None 
-
 # RUTAS COMUNES PARA TODOS LOS USUARIOS
 
 @user_bp.route("/profile", methods=["GET"])
@@ -90,9 +58,6 @@ def get_user_profile() -> Tuple[Any, int]:
         if "_id" in user_data:
             user_data["_id"] = str(user_data["_id"])
             
-        # Convertir fechas BSON a formato JSON
-        user_data = convert_bson_dates_to_iso(user_data)
-            
         return jsonify(user_data), 200
     except Exception as e:
         current_app.logger.error(f"[get_user_profile] Error: {e}")
@@ -125,6 +90,7 @@ def update_user_profile() -> Tuple[Any, int]:
             existing = mongo.db.users.find_one({"username": update_data["username"], "email": {"$ne": email}})
             if existing:
                 return jsonify({"error": "El nombre de usuario ya está en uso"}), 409
+            update_data["username_lower"] = normalize_username(update_data["username"])
                 
         # Actualizar perfil
         result = mongo.db.users.update_one(
@@ -133,6 +99,9 @@ def update_user_profile() -> Tuple[Any, int]:
         )
         
         if result.modified_count > 0:
+            invalidate_user(email, update_data.get("username"))
+            if "username" in update_data:
+                creator_autocomplete.rename_creator(email, update_data["username"])
             return jsonify({"message": "Perfil actualizado con éxito"}), 200
         else:
             return jsonify({"message": "No se realizaron cambios"}), 200
@@ -158,9 +127,9 @@ def change_password() -> Tuple[Any, int]:
         if not data or "current_password" not in data or "new_password" not in data:
             return jsonify({"error": "Se requiere contraseña actual y nueva"}), 400
             
-        # Verificar contraseña actual
+        # Verificar contraseña actual (sin caché)
         from ..models.user import User
-        user_data = find_by_email(email)
+        user_data = find_account_by_email(email)
         if not user_data:
             return jsonify({"error": "Usuario no encontrado"}), 404
             
@@ -169,13 +138,16 @@ def change_password() -> Tuple[Any, int]:
             return jsonify({"error": "Contraseña actual incorrecta"}), 401
             
         # Cambiar contraseña
-        hashed_password: str = generate_password_hash(data["new_password"])
+        hashed_password: str = password_hasher.hash_password(data["new_password"])
         mongo.db.users.update_one(
             {"email": email},
             {"$set": {"password": hashed_password}}
         )
+        invalidate_user(email)
         
         return jsonify({"message": "Contraseña actualizada con éxito"}), 200
+    except PasswordHashingBusyError:
+        return jsonify({"error": "Servidor ocupado, inténtalo de nuevo"}), 503
     except Exception as e:
         current_app.logger.error(f"[change_password] Error: {e}")
         return jsonify({"error": "Error al cambiar la contraseña"}), 500
@@ -187,6 +159,9 @@ def delete_account() -> Tuple[Any, int]:
     """
     Elimina la cuenta del usuario autenticado y todos sus datos relacionados
     
+    La cuenta se marca como eliminada (tombstone) y deja de ser visible al momento;
+    sus datos se borran en segundo plano (ver utils/cascade_utils.py).
+    
     Requiere: JWT válido en cabecera, password para confirmar
     Retorna: confirmación o error
     """
@@ -197,9 +172,9 @@ def delete_account() -> Tuple[Any, int]:
         if not data or "password" not in data:
             return jsonify({"error": "Se requiere contraseña para confirmar"}), 400
             
-        # Verificar contraseña
-        user_data = find_by_email(email)
-        if not user_data:
+        # Verificar contraseña (sin caché)
+        user_data = find_account_by_email(email)
+        if not user_data or user_data.get("role") == DELETED_ROLE:
             return jsonify({"error": "Usuario no encontrado"}), 404
             
         user = User.from_dict(user_data)
@@ -208,42 +183,33 @@ def delete_account() -> Tuple[Any, int]:
             
         user_role = user_data.get("role")
         
-        # Eliminar datos específicos según el rol
-        if user_role == "creator":
-            # Eliminar wallets del creador
-            mongo.db.creator_wallets.delete_many({"creator_email": email})
-            
-            # Eliminar posts del creador
-            mongo.db.posts.delete_many({"creator_email": email})
-            
-            # Eliminar relaciones de seguimiento donde es el creador
-            mongo.db.followings.delete_many({"creator_email": email})
-            
-            # Eliminar likes en posts del creador
-            mongo.db.likes.delete_many({"creator_email": email})
-            
-        elif user_role == "follower":
-            # Eliminar relaciones de seguimiento donde es el follower
-            mongo.db.followings.delete_many({"follower_email": email})
-            
-            # Eliminar likes hechos por el follower
-            mongo.db.likes.delete_many({"user_email": email})
-        
-        # Eliminar la cuenta del usuario
-        result = mongo.db.users.delete_one({"email": email})
+        # Marcar la cuenta como eliminada; el resto de sus datos se borra en segundo plano
+        result = mongo.db.users.update_one(
+            {"email": email, "role": user_role},
+            {"$set": {"role": DELETED_ROLE, "deleted_role": user_role, "deleted_at": datetime.now()}}
+        )
+        invalidate_user(email)
         
-        if result.deleted_count > 0:
+        if result.modified_count > 0:
+            if user_role == "creator":
+                creator_autocomplete.remove_creator(email)
+                # Sale del ranking "popular" ya, sin esperar al paso stats de la cascada
+                delete_creator_stats(email)
+            cascade_deleter.enqueue_account(email, user_role)
+            
             # Invalidar el token JWT actual
-            jti: str = get_jwt()["jti"]
+            claims: Dict[str, Any] = get_jwt()
             from ..extensions import blacklist
-            blacklist.add(jti)
+            blacklist.add(claims["jti"], claims.get("exp"))
             
             return jsonify({
-                "message": "Cuenta eliminada con éxito. Todos tus datos han sido eliminados."
+                "message": "Cuenta eliminada con éxito. Tus datos se están eliminando."
             }), 200
         else:
             return jsonify({"error": "No se pudo eliminar la cuenta"}), 500
             
+    except PasswordHashingBusyError:
+        return jsonify({"error": "Servidor ocupado, inténtalo de nuevo"}), 503
     except Exception as e:
         current_app.logger.error(f"[delete_account] Error: {e}")
         return jsonify({"error": "Error al eliminar la cuenta"}), 500
@@ -267,58 +233,40 @@ def follower_feed() -> Tuple[Any, int]:
         page: int = int(request.args.get("page", 1))
         limit: int = int(request.args.get("limit", 10))
         skip: int = (page - 1) * limit
-        
-        # Obtener lista de creadores seguidos
-        following_data = mongo.db.followings.find(
-            {"follower_email": email},
-            {"_id": 0, "creator_email": 1}
-        )
-        
-        creator_emails: List[str] = [item["creator_email"] for item in following_data]
-        
-        if not creator_emails:
-            return jsonify({
-                "posts": [],
-                "message": "No sigues a ningún creador. ¡Explora y sigue a algunos creadores!",
-                "page": page,            "pages": 0,
-                "total": 0
-            }), 200
-        
-        # Obtener posts de los creadores seguidos
-        total_posts = mongo.db.posts.count_documents({"creator_email": {"$in": creator_emails}})
-        posts_cursor = mongo.db.posts.find({"creator_email": {"$in": creator_emails}}) \
-                      .sort("created_at", -1) \
-                      .skip(skip) \
-                      .limit(limit)
-        posts: List[Dict[str, Any]] = []
-        for post in posts_cursor:
-            # Convertir fechas y ObjectId para JSON
-            post_dict = dict(post)
-            post_dict = process_post_for_json(post_dict)
-            
-            # Obtener información básica del creador
-            creator = mongo.db.users.find_one(
-                {"email": post_dict["creator_email"]},
-                {"_id": 0, "username": 1, "avatar_url": 1}
-            )
-            
-            if creator:
-                post_dict["creator_username"] = creator["username"]
-                post_dict["creator_avatar"] = creator.get("avatar_url", "")
-                
-            posts.append(post_dict)
-        
-        # Agregar información de likes usando la función utilitaria
-        follower_email = get_jwt_identity()
-        posts = add_like_info_to_posts(posts, follower_email)
+        cursor: Optional[str] = request.args.get("cursor")
+        
+        # Combinar timeline materializado (push) y creadores celebridad (pull)
+        posts_page, total_posts = build_feed(email, skip, limit, cursor)
+        page_cursor: Optional[str] = next_cursor(posts_page, POSTS_SORT, limit)
+        
+        if total_posts == 0:
+            # Solo se consultan los seguimientos cuando el feed está vacío
+            if not mongo.db.followings.find_one({"follower_email": email}, {"_id": 1}):
+                return jsonify({
+                    "posts": [],
+                    "message": "No sigues a ningún creador. ¡Explora y sigue a algunos creadores!",
+                    "page": page,            "pages": 0,
+                    "total": 0,
+                    "next_cursor": None
+                }), 200
+        
+        # Las fechas y ObjectId los serializa el proveedor JSON de la app
+        posts: List[Dict[str, Any]] = posts_page
+        
+        # Información del creador y de likes en una consulta por colección (sin N+1)
+        posts = add_creator_info_to_posts(posts)
+        posts = add_like_info_to_posts(posts, email)
             
         return jsonify({
             "posts": posts,
             "page": page,
             "limit": limit,
             "total": total_posts,
-            "pages": (total_posts + limit - 1) // limit
+            "pages": (total_posts + limit - 1) // limit,
+            "next_cursor": page_cursor
         }), 200
+    except InvalidCursorError as ce:
+        return jsonify({"error": str(ce)}), 400
     except Exception as e:
         current_app.logger.error(f"[follower_feed] Error: {e}")
         return jsonify({"error": "Error al obtener el feed"}), 500
@@ -328,11 +276,11 @@ def follower_feed() -> Tuple[Any, int]:
 @role_required("follower")
 def search_creators() -> Tuple[Any, int]:
     """
-    Busca creadores por username para que los followers puedan seguirlos
+    Busca creadores por username y bio para que los followers puedan seguirlos
     
     Requiere: JWT válido en cabecera, rol follower
-    Query params: q (search query), page, limit
-    Retorna: lista de creadores que coinciden con la búsqueda
+    Query params: q (search query), page, limit, cursor
+    Retorna: lista de creadores que coinciden con la búsqueda, por relevancia y popularidad
     """
     try:
         follower_email: str = get_jwt_identity()
@@ -342,6 +290,7 @@ def search_creators() -> Tuple[Any, int]:
         page: int = int(request.args.get("page", 1))
         limit: int = int(request.args.get("limit", 10))
         skip: int = (page - 1) * limit
+        cursor: Optional[str] = request.args.get("cursor")
         
         if not search_query:
             return jsonify({
@@ -350,7 +299,8 @@ def search_creators() -> Tuple[Any, int]:
                 "page": page,
                 "limit": limit,
                 "total": 0,
-                "pages": 0
+                "pages": 0,
+                "next_cursor": None
             }), 200
         
         # Validar longitud mínima
@@ -361,27 +311,13 @@ def search_creators() -> Tuple[Any, int]:
                 "page": page,
                 "limit": limit,
                 "total": 0,
-                "pages": 0
+                "pages": 0,
+                "next_cursor": None
             }), 200
         
-        # Crear query de búsqueda (case insensitive)
-        search_pattern = {"$regex": search_query, "$options": "i"}
-        query = {
-            "role": "creator",
-            "$or": [
-                {"username": search_pattern},
-                {"bio": search_pattern}
-            ]
-        }
-        
-        # Contar total de resultados
-        total_creators = mongo.db.users.count_documents(query)
-        
-        # Realizar búsqueda con paginación
-        creators_cursor = mongo.db.users.find(
-            query,
-            {"_id": 0, "password": 0, "email": 0}  # Excluir información sensible
-        ).sort("username", 1).skip(skip).limit(limit)
+        # Búsqueda indexada: prefijo de username + texto de la bio, ordenada por relevancia y popularidad
+        # total cuenta todas las coincidencias; las páginas solo llegan a los candidatos ordenados
+        creators_page, total_creators, available, page_cursor = find_creators(search_query, skip, limit, cursor)
         
         creators: List[Dict[str, Any]] = []
         
@@ -392,17 +328,10 @@ def search_creators() -> Tuple[Any, int]:
         )
         followed_emails = {item["creator_email"] for item in following_data}
         
-        for creator in creators_cursor:
-            # Añadir información adicional
-            creator_email = creator.get("email", "")
-            
-            # Número de seguidores
-            followers_count = mongo.db.followings.count_documents({"creator_email": creator_email})
-            creator["followers_count"] = followers_count
-            
-            # Número de posts
-            posts_count = mongo.db.posts.count_documents({"creator_email": creator_email})
-            creator["posts_count"] = posts_count
+        for creator in creators_page:
+            # Añadir información adicional (seguidores y posts ya vienen de la búsqueda)
+            creator_email = creator.pop("email", "")
+            del creator["_id"]
             
             # Si ya lo sigue
             creator["following"] = creator_email in followed_emails
@@ -414,15 +343,44 @@ def search_creators() -> Tuple[Any, int]:
             "page": page,
             "limit": limit,
             "total": total_creators,
-            "pages": (total_creators + limit - 1) // limit,
+            "pages": (available + limit - 1) // limit,
             "query": search_query,
-            "message": f"Se encontraron {total_creators} creadores para '{search_query}'"
+            "message": f"Se encontraron {total_creators} creadores para '{search_query}'",
+            "next_cursor": page_cursor
         }), 200
         
+    except InvalidCursorError as ce:
+        return jsonify({"error": str(ce)}), 400
     except Exception as e:
         current_app.logger.error(f"[search_creators] Error: {e}")
         return jsonify({"error": "Error al buscar creadores"}), 500
 
+@user_bp.route("/creators/autocomplete", methods=["GET"])
+@role_required("follower")
+def autocomplete_creators() -> Tuple[Any, int]:
+    """
+    Sugerencias de creadores por prefijo de username (type-ahead)
+    
+    Requiere: JWT válido en cabecera, rol follower
+    Query params: q (prefijo), limit (máximo 10)
+    Retorna: usernames de creadores que empiezan por el prefijo, ordenados por seguidores
+    """
+    try:
+        prefix: str = request.args.get("q", "").strip()
+        limit: int = min(max(int(request.args.get("limit", AUTOCOMPLETE_TOP_K)), 1), AUTOCOMPLETE_TOP_K)
+        
+        if not prefix:
+            return jsonify({"suggestions": [], "query": prefix}), 200
+        
+        return jsonify({
+            "suggestions": creator_autocomplete.suggest(prefix, limit),
+            "query": prefix
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"[autocomplete_creators] Error: {e}")
+        return jsonify({"error": "Error al obtener sugerencias"}), 500
+
 @user_bp.route("/explore-all-creators", methods=["GET"])
 @role_required("follower")
 def explore_all_creators() -> Tuple[Any, int]:
@@ -434,12 +392,16 @@ def explore_all_creators() -> Tuple[Any, int]:
     Retorna: lista paginada de todos los creadores
     """
     try:
+        # Lectura de listado: admite la read preference configurada para la ruta
+        db = read_db()
+        
         follower_email: str = get_jwt_identity()
         
         # Paginación
         page: int = int(request.args.get("page", 1))
         limit: int = int(request.args.get("limit", 12))
         skip: int = (page - 1) * limit
+        cursor: Optional[str] = request.args.get("cursor")
         
         # Ordenación
         sort_by: str = request.args.get("sort", "popular")
@@ -447,42 +409,66 @@ def explore_all_creators() -> Tuple[Any, int]:
         # Query base para todos los creadores
         query = {"role": "creator"}
         
-        # Contar total de creadores
-        total_creators = mongo.db.users.count_documents(query)
-        
-        if sort_by == "alphabetical":
-            sort_criteria = [("username", 1)]
-        elif sort_by == "recent":
-            sort_criteria = [("created_at", -1)]
+        if sort_by in ("alphabetical", "recent"):
+            sort_criteria = USERNAME_SORT if sort_by == "alphabetical" else RECENT_SORT
+            
+            # Contar total de creadores
+            total_creators = db.users.count_documents(query)
+            
+            # Obtener creadores (keyset sobre la clave de ordenación si hay cursor)
+            creators_cursor = db.users.find(
+                apply_cursor(query, sort_criteria, cursor),
+                {"password": 0, **WALLET_FIELDS_EXCLUDED, **SEARCH_FIELDS_EXCLUDED}
+            ).sort(sort_criteria)
+            if not cursor:
+                creators_cursor = creators_cursor.skip(skip)
+            creators_page: List[Dict[str, Any]] = list(creators_cursor.limit(limit))
+            page_cursor: Optional[str] = next_cursor(creators_page, sort_criteria, limit)
         else:  # popular (por defecto)
-            sort_criteria = [("username", 1)]  # Temporal, ordenaremos después
-        
-        # Obtener creadores
-        creators_cursor = mongo.db.users.find(
-            query,
-            {"_id": 0, "password": 0}
-        ).sort(sort_criteria).skip(skip).limit(limit)
+            # Página ordenada por seguidores directamente sobre el índice de creator_stats;
+            # el total se cuenta en la misma colección para que las páginas cuadren con el ranking
+            ranking_query: Dict[str, Any] = {}
+            total_creators = db.creator_stats.count_documents(ranking_query)
+            stats_cursor = db.creator_stats.find(
+                apply_cursor(ranking_query, POPULAR_SORT, cursor),
+                {"_id": 0, "creator_email": 1, "followers_count": 1}
+            ).sort(POPULAR_SORT)
+            if not cursor:
+                stats_cursor = stats_cursor.skip(skip)
+            stats_page: List[Dict[str, Any]] = list(stats_cursor.limit(limit))
+            page_cursor = next_cursor(stats_page, POPULAR_SORT, limit)
+            
+            # Datos de los creadores de la página, conservando el orden del ranking
+            page_emails = [item["creator_email"] for item in stats_page]
+            users_by_email = {
+                user["email"]: user
+                for user in db.users.find(
+                    {"email": {"$in": page_emails}, **query},
+                    {"password": 0, **WALLET_FIELDS_EXCLUDED, **SEARCH_FIELDS_EXCLUDED}
+                )
+            }
+            creators_page = [users_by_email[email] for email in page_emails if email in users_by_email]
         
         creators: List[Dict[str, Any]] = []
         
         # Obtener lista de creadores que ya sigue
-        following_data = mongo.db.followings.find(
+        following_data = db.followings.find(
             {"follower_email": follower_email},
             {"_id": 0, "creator_email": 1}
         )
         followed_emails = {item["creator_email"] for item in following_data}
         
-        for creator in creators_cursor:
+        # Estadísticas precalculadas de todos los creadores de la página en una consulta
+        stats_map = get_creator_stats_map(creator["email"] for creator in creators_page)
+        
+        for creator in creators_page:
             # Información adicional
             creator_email = creator["email"]
+            del creator["_id"]
             
-            # Número de seguidores
-            followers_count = mongo.db.followings.count_documents({"creator_email": creator_email})
-            creator["followers_count"] = followers_count
-            
-            # Número de posts
-            posts_count = mongo.db.posts.count_documents({"creator_email": creator_email})
-            creator["posts_count"] = posts_count
+            # Número de seguidores y de posts
+            creator["followers_count"] = stats_map[creator_email]["followers_count"]
+            creator["posts_count"] = stats_map[creator_email]["posts_count"]
             
             # Si ya lo sigue
             creator["following"] = creator_email in followed_emails
@@ -492,10 +478,6 @@ def explore_all_creators() -> Tuple[Any, int]:
             
             creators.append(creator)
         
-        # Ordenar por popularidad si se solicitó
-        if sort_by == "popular":
-            creators.sort(key=lambda x: x["followers_count"], reverse=True)
-        
         return jsonify({
             "creators": creators,
             "page": page,
@@ -503,9 +485,12 @@ def explore_all_creators() -> Tuple[Any, int]:
             "total": total_creators,
             "pages": (total_creators + limit - 1) // limit,
             "sort": sort_by,
-            "message": f"Mostrando {len(creators)} de {total_creators} creadores disponibles"
+            "message": f"Mostrando {len(creators)} de {total_creators} creadores disponibles",
+            "next_cursor": page_cursor
         }), 200
         
+    except InvalidCursorError as ce:
+        return jsonify({"error": str(ce)}), 400
     except Exception as e:
         current_app.logger.error(f"[explore_all_creators] Error: {e}")
         return jsonify({"error": "Error al explorar creadores"}), 500
@@ -568,12 +553,10 @@ def follow_creator() -> Tuple[Any, int]:
         creator_username: Optional[str] = data.get("creator_username")
         
         # Si viene username, convertir a email
+        creator_data: Optional[Dict[str, Any]] = None
         if creator_username and not creator_email:
-            creator_data = mongo.db.users.find_one(
-                {"username": creator_username, "role": "creator"},
-                {"email": 1}
-            )
-            if not creator_data:
+            creator_data = find_account_by_username(creator_username)
+            if not creator_data or creator_data.get("role") != "creator":
                 return jsonify({"error": "Creador no encontrado"}), 404
             creator_email = creator_data["email"]
         
@@ -583,8 +566,10 @@ def follow_creator() -> Tuple[Any, int]:
             
         follower_email: str = get_jwt_identity()
         
-        # Verificar que el creador exista
-        creator_data = find_by_email(creator_email)
+        # Verificar que el creador exista (sin caché: el rol puede haber cambiado en otro worker);
+        # si vino el username ya se leyó arriba
+        if creator_data is None:
+            creator_data = find_account_by_email(creator_email)
         if not creator_data or creator_data.get("role") != "creator":
             return jsonify({"error": "Creador no encontrado"}), 404
             
@@ -608,6 +593,10 @@ def follow_creator() -> Tuple[Any, int]:
         )
         
         mongo.db.followings.insert_one(following.to_dict())
+        increment_followers(creator_email, 1)
+        
+        # Copiar los posts recientes del creador al timeline del follower (en segundo plano)
+        task_queue.enqueue("follow_backfill", follower_email=follower_email, creator_email=creator_email)
         
         return jsonify({"message": f"Ahora sigues a {creator_data['username']}"}), 201
     except Exception as e:
@@ -633,11 +622,8 @@ def unfollow_creator() -> Tuple[Any, int]:
         
         # Si viene username, convertir a email
         if creator_username and not creator_email:
-            creator_data = mongo.db.users.find_one(
-                {"username": creator_username, "role": "creator"},
-                {"email": 1}
-            )
-            if not creator_data:
+            creator_data = find_account_by_username(creator_username)
+            if not creator_data or creator_data.get("role") != "creator":
                 return jsonify({"error": "Creador no encontrado"}), 404
             creator_email = creator_data["email"]
         
@@ -656,10 +642,15 @@ def unfollow_creator() -> Tuple[Any, int]:
             return jsonify({"message": "No estabas siguiendo a este creador"}), 404
             
         # Eliminar la relación de seguimiento
-        mongo.db.followings.delete_one({
+        result = mongo.db.followings.delete_one({
             "follower_email": follower_email,
             "creator_email": creator_email
         })
+        if result.deleted_count > 0:
+            increment_followers(creator_email, -1)
+        
+        # Quitar los posts del creador del timeline del follower (en segundo plano)
+        task_queue.enqueue("unfollow_trim", follower_email=follower_email, creator_email=creator_email)
         
         return jsonify({"message": "Has dejado de seguir a este creador"}), 200
     except Exception as e:
@@ -684,6 +675,7 @@ def explore_creators() -> Tuple[Any, int]:
         page: int = int(request.args.get("page", 1))
         limit: int = int(request.args.get("limit", 10))
         skip: int = (page - 1) * limit
+        cursor: Optional[str] = request.args.get("cursor")
         
         # Ordenación: popular o más reciente
         sort_by: str = request.args.get("sort", "recent")
@@ -704,7 +696,8 @@ def explore_creators() -> Tuple[Any, int]:
                 "page": page,
                 "limit": limit,
                 "total": 0,
-                "pages": 0
+                "pages": 0,
+                "next_cursor": None
             }), 200
         
         # 2. Contar total de creadores seguidos
@@ -717,22 +710,30 @@ def explore_creators() -> Tuple[Any, int]:
         if sort_by == "popular":
             # Ordenar por popularidad (número de seguidores)
             # Necesitamos añadir esta información después de obtener los datos
-            sort_criteria = [("username", 1)]  # Por defecto ordenamos por nombre
+            sort_criteria = USERNAME_SORT  # Por defecto ordenamos por nombre
         else:  # recent - ordenar por fecha de seguimiento
             # Aquí necesitamos procesar manualmente después de obtener los datos
-            sort_criteria = [("username", 1)]  # Ordenamos temporalmente por nombre
+            sort_criteria = USERNAME_SORT  # Ordenamos temporalmente por nombre
             
-        # Obtener datos de los creadores seguidos
+        # Obtener datos de los creadores seguidos (keyset por (username, _id) si hay cursor)
         creators_cursor = mongo.db.users.find(
-            query,
-            {"_id": 0, "password": 0}
-        ).sort(sort_criteria).skip(skip).limit(limit)
+            apply_cursor(query, sort_criteria, cursor),
+            {"password": 0, **WALLET_FIELDS_EXCLUDED, **SEARCH_FIELDS_EXCLUDED}
+        ).sort(sort_criteria)
+        if not cursor:
+            creators_cursor = creators_cursor.skip(skip)
+        creators_page: List[Dict[str, Any]] = list(creators_cursor.limit(limit))
+        page_cursor: Optional[str] = next_cursor(creators_page, sort_criteria, limit)
+        
+        # Estadísticas precalculadas de todos los creadores de la página en una consulta
+        stats_map = get_creator_stats_map(creator["email"] for creator in creators_page)
         
         creators: List[Dict[str, Any]] = []
-        for creator in creators_cursor:
+        for creator in creators_page:
+            del creator["_id"]
+
             # Para cada creador, obtener datos adicionales como número de seguidores
-            followers_count = mongo.db.followings.count_documents({"creator_email": creator["email"]})
-            creator["followers_count"] = followers_count
+            creator["followers_count"] = stats_map[creator["email"]]["followers_count"]
             
             # Añadir fecha de seguimiento 
             follow_info = next((item for item in following_data if item["creator_email"] == creator["email"]), None)
@@ -754,8 +755,11 @@ def explore_creators() -> Tuple[Any, int]:
             "limit": limit,
             "total": total_creators,
             "pages": (total_creators + limit - 1) // limit,
-            "message": f"Mostrando {len(creators)} de {total_creators} creadores que sigues"
+            "message": f"Mostrando {len(creators)} de {total_creators} creadores que sigues",
+            "next_cursor": page_cursor
         }), 200
+    except InvalidCursorError as ce:
+        return jsonify({"error": str(ce)}), 400
     except Exception as e:
         current_app.logger.error(f"[explore_creators] Error: {e}")
         return jsonify({"error": "Error al obtener creadores seguidos"}), 500
@@ -767,34 +771,27 @@ def explore_creators() -> Tuple[Any, int]:
 def public_creator_profile(username: str) -> Tuple[Any, int]:
     """Perfil público solo de creadores"""
     try:
-        user = mongo.db.users.find_one(
-            {"username": username, "role": "creator"},
-            {"_id": 0, "password": 0}
-        )
-        if not user:
+        # Lectura de listado: admite la read preference configurada para la ruta
+        db = read_db()
+        
+        # Datos de perfil desde la caché de usuarios (solo se devuelven campos públicos)
+        user = find_by_username(username)
+        if not user or user.get("role") != "creator":
             return jsonify({"error": "Creador no encontrado o no autorizado"}), 404
 
-        # Estadísticas
-        pipeline = [
-            {"$match": {"receiver_email": user["email"]}},
-            {
-                "$group": {
-                    "_id": None,
-                    "total_amount": {"$sum": "$amount"},
-                    "total_count": {"$sum": 1}
-                }
-            }
-        ]
-        stats = list(mongo.db.donations.aggregate(pipeline))
-        total_amount = stats[0]["total_amount"] if stats else 0
-        total_count = stats[0]["total_count"] if stats else 0
+        # Totales de donaciones materializados en creator_stats (una lectura por clave)
+        stats = db.creator_stats.find_one(
+            {"creator_email": user["email"]},
+            {"_id": 0, "donations_total": 1, "donations_count": 1, "donations_by_currency": 1}
+        ) or {}
 
         return jsonify({
             "username": user["username"],
             "bio": user.get("bio", ""),
             "avatar_url": user.get("avatar_url", ""),
-            "total_donations_received": total_amount,
-            "number_of_donations": total_count
+            "total_donations_received": stats.get("donations_total", 0),
+            "number_of_donations": stats.get("donations_count", 0),
+            "donations_by_currency": stats.get("donations_by_currency", {})
         }), 200
 
     except Exception as e:
@@ -807,27 +804,44 @@ def public_creator_profile(username: str) -> Tuple[Any, int]:
 @role_required("creator")
 def creator_dashboard() -> Tuple[Any, int]:
     """
-    Panel del creador: estadísticas de seguidores y posts
+    Panel del creador: seguidores, posts, likes recibidos, donaciones y crecimiento de seguidores
     
     Requiere: JWT válido en cabecera, rol creator
-    Retorna: estadísticas del creador (seguidores, posts)
+    Retorna: estadísticas del creador
     """
     try:
         email: str = get_jwt_identity()
 
-        # Estadísticas del creador
-        followers_count: int = mongo.db.followings.count_documents({"creator_email": email})
-        posts_count: int = mongo.db.posts.count_documents({"creator_email": email})
+        # Estadísticas precalculadas, cacheadas por creador con un TTL corto
+        stats: Dict[str, Any] = get_creator_dashboard(email)
 
-        return jsonify({
-            "stats": {
-                "followers_count": followers_count,
-                "posts_count": posts_count
-            }
-        }), 200
+        return jsonify({"stats": stats}), 200
     except Exception as e:
         current_app.logger.error(f"[creator_dashboard] Error: {e}")
         return jsonify({"error": "Error al obtener el panel del creador"}), 500
+
+
+@user_bp.route("/creator/donations/stats", methods=["GET"])
+@role_required("creator")
+def creator_donation_stats() -> Tuple[Any, int]:
+    """
+    Evolución de las donaciones recibidas por el creador autenticado
+
+    Requiere: JWT válido en cabecera, rol creator
+    Parámetros: range = 24h (por hora), 7d, 30d o 90d (por día); por defecto 30d
+    Retorna: buckets con total, número de donaciones y desglose por moneda
+    """
+    try:
+        email: str = get_jwt_identity()
+        range_name: str = request.args.get("range", "30d")
+        if range_name not in STATS_RANGES:
+            return jsonify({"error": f"Rango no válido. Use: {', '.join(STATS_RANGES)}"}), 400
+
+        # Rollups precalculados: como mucho 90 documentos por consulta
+        return jsonify(get_donation_series(read_db(), email, range_name)), 200
+    except Exception as e:
+        current_app.logger.error(f"[creator_donation_stats] Error: {e}")
+        return jsonify({"error": "Error al obtener las estadísticas de donaciones"}), 500
     
 
 @user_bp.route("/creator/followers", methods=["GET"])
@@ -846,17 +860,21 @@ def get_creator_followers() -> Tuple[Any, int]:
         page: int = int(request.args.get("page", 1))
         limit: int = int(request.args.get("limit", 20))
         skip: int = (page - 1) * limit
+        cursor: Optional[str] = request.args.get("cursor")
         
         # Obtener total de seguidores
         total_followers = mongo.db.followings.count_documents({"creator_email": creator_email})
         
-        # Obtener emails de seguidores con paginación
+        # Obtener emails de seguidores con paginación (keyset por (created_at, _id) si hay cursor)
         followers_cursor = mongo.db.followings.find(
-            {"creator_email": creator_email},
-            {"_id": 0, "follower_email": 1, "created_at": 1}
-        ).sort("created_at", -1).skip(skip).limit(limit)
+            apply_cursor({"creator_email": creator_email}, RECENT_SORT, cursor),
+            {"_id": 1, "follower_email": 1, "created_at": 1}
+        ).sort(RECENT_SORT)
+        if not cursor:
+            followers_cursor = followers_cursor.skip(skip)
         
-        followers_data = list(followers_cursor)
+        followers_data = list(followers_cursor.limit(limit))
+        page_cursor: Optional[str] = next_cursor(followers_data, RECENT_SORT, limit)
         
         # Obtener información de los usuarios seguidores
         followers_list = []
@@ -877,9 +895,12 @@ def get_creator_followers() -> Tuple[Any, int]:
             "page": page,
             "limit": limit,
             "total": total_followers,
-            "pages": (total_followers + limit - 1) // limit
+            "pages": (total_followers + limit - 1) // limit,
+            "next_cursor": page_cursor
         }), 200
         
+    except InvalidCursorError as ce:
+        return jsonify({"error": str(ce)}), 400
     except Exception as e:
         current_app.logger.error(f"[get_creator_followers] Error: {e}")
         return jsonify({"error": "Error al obtener los seguidores"}), 500
@@ -903,6 +924,7 @@ def update_creator_profile() -> Tuple[Any, int]:
             existing = mongo.db.users.find_one({"username": update_data["username"], "email": {"$ne": email}})
             if existing:
                 return jsonify({"error": "El nombre de usuario ya está en uso"}), 409
+            update_data["username_lower"] = normalize_username(update_data["username"])
             
         # Actualizar perfil
         result = mongo.db.users.update_one(
@@ -911,6 +933,9 @@ def update_creator_profile() -> Tuple[Any, int]:
         )
         
         if result.modified_count > 0:
+            invalidate_user(email, update_data.get("username"))
+            if "username" in update_data:
+                creator_autocomplete.rename_creator(email, update_data["username"])
             return jsonify({"message": "Perfil de creador actualizado con éxito"}), 200
         else:
             return jsonify({"message": "No se realizaron cambios en el perfil"}), 200
@@ -950,6 +975,10 @@ def create_post() -> Tuple[Any, int]:
         
         # Guardar el post en la base de datos
         result = mongo.db.posts.insert_one(post_dict)
+        increment_creator_stats(email, posts_count=1)
+        
+        # Distribuir el post a los timelines de los seguidores (en segundo plano, salvo celebridades)
+        task_queue.enqueue("publish_post", post_id=result.inserted_id)
         
         return jsonify({
             "message": "Post creado con éxito",
@@ -964,39 +993,48 @@ def create_post() -> Tuple[Any, int]:
 def get_creator_posts(username: str) -> Tuple[Any, int]:
     """Obtener posts de un creador por su username"""
     try:
+        # Lectura de listado: admite la read preference configurada para la ruta
+        db = read_db()
+        
         # Paginación
         page: int = int(request.args.get("page", 1))
         limit: int = int(request.args.get("limit", 10))
         skip: int = (page - 1) * limit
+        cursor: Optional[str] = request.args.get("cursor")
 
-        # Obtener email del creador - CORREGIDO: estructura de find_one
-        creator = mongo.db.users.find_one({"username": username, "role": "creator"})
-        if not creator:
+        # Obtener email del creador desde la caché de usuarios
+        creator = find_by_username(username)
+        if not creator or creator.get("role") != "creator":
             return jsonify({"error": "Creador no encontrado"}), 404
         email = creator["email"]
 
         # Total posts
-        total_posts = mongo.db.posts.count_documents({"creator_email": email})
+        total_posts = db.posts.count_documents({"creator_email": email})
 
         # Obtener posts del creador - CORREGIDO: creator_email en lugar de author_email
-        posts_cursor = mongo.db.posts.find({"creator_email": email}).sort("created_at", -1).skip(skip).limit(limit)        # Convertir el cursor a lista y formatear ObjectId - CORREGIDO: manipulación correcta
-        posts: List[Dict[str, Any]] = []
-        for post in posts_cursor:
-            post_dict = dict(post)
-            post_dict = process_post_for_json(post_dict)
-            posts.append(post_dict)
+        # Con cursor se continúa tras la última clave (created_at, _id) en lugar de usar skip
+        posts_cursor = db.posts.find(
+            apply_cursor({"creator_email": email}, POSTS_SORT, cursor)
+        ).sort(POSTS_SORT)
+        if not cursor:
+            posts_cursor = posts_cursor.skip(skip)
+        posts_page: List[Dict[str, Any]] = list(posts_cursor.limit(limit))
+        page_cursor: Optional[str] = next_cursor(posts_page, POSTS_SORT, limit)
         
         # Agregar información de likes usando la función utilitaria
-        posts = add_like_info_to_posts(posts)
+        posts = add_like_info_to_posts(posts_page)
         
         return jsonify({
             "posts": posts,
             "page": page,
             "limit": limit,
             "total": total_posts,
-            "pages": (total_posts + limit - 1) // limit            
+            "pages": (total_posts + limit - 1) // limit,
+            "next_cursor": page_cursor
         }), 200
     
+    except InvalidCursorError as ce:
+        return jsonify({"error": str(ce)}), 400
     except Exception as e:
         current_app.logger.error(f"[get_creator_posts] Error: {e}")
         return jsonify({"error": "Error al obtener los posts del creador"}), 500
@@ -1023,8 +1061,11 @@ def delete_post(post_id: str) -> Tuple[Any, int]:
         if not post:
             return jsonify({"error": "Post no encontrado o no autorizado"}), 404
         
-        # Eliminar post
-        mongo.db.posts.delete_one({"_id": post_object_id})
+        # Eliminar post; sus likes y entradas de timeline se borran en segundo plano
+        result = mongo.db.posts.delete_one({"_id": post_object_id})
+        if result.deleted_count > 0:
+            increment_creator_stats(email, posts_count=-1, likes_count=-post.get("likes_count", 0))
+            cascade_deleter.enqueue_post(post_object_id, email)
         return jsonify({"message": "Post eliminado correctamente"}), 200
     except Exception as e:
         current_app.logger.error(f"[delete_post] Error: {e}")
@@ -1055,17 +1096,6 @@ def add_creator_wallet() -> Tuple[Any, int]:
                 "error": f"Tipo de moneda no soportada. Use: {CreatorWallet.SUPPORTED_CURRENCIES}"
             }), 400
             
-        # Validar que la wallet no exista ya para este creador y tipo de moneda
-        existing = mongo.db.creator_wallets.find_one({
-            "creator_email": email,
-            "currency_type": data["currency_type"]
-        })
-        
-        if existing:
-            return jsonify({
-                "error": f"Ya tienes una wallet configurada para {data['currency_type']}"
-            }), 409
-            
         # Crear wallet usando el modelo
         wallet = CreatorWallet(
             creator_email=email,
@@ -1073,8 +1103,11 @@ def add_creator_wallet() -> Tuple[Any, int]:
             currency_type=data["currency_type"]
         )
         
-        # Guardar en la base de datos
-        mongo.db.creator_wallets.insert_one(wallet.to_dict())
+        # Guardar (falla si ya hay una wallet para este creador y tipo de moneda)
+        if not wallet_store.add(wallet):
+            return jsonify({
+                "error": f"Ya tienes una wallet configurada para {data['currency_type']}"
+            }), 409
         
         return jsonify({
             "message": f"Wallet de {data['currency_type']} añadida con éxito"
@@ -1099,15 +1132,7 @@ def get_creator_wallets() -> Tuple[Any, int]:
         email: str = get_jwt_identity()
         
         # Buscar wallets del creador
-        wallets_cursor = mongo.db.creator_wallets.find({"creator_email": email})
-        
-        # Formatear respuesta
-        wallets: List[Dict[str, Any]] = []
-        for wallet in wallets_cursor:
-            # Convertir ObjectId a string para JSON
-            if "_id" in wallet:
-                wallet["_id"] = str(wallet["_id"])
-            wallets.append(wallet)
+        wallets: List[Dict[str, Any]] = wallet_store.list(email)
         
         if not wallets:
             return jsonify({
@@ -1144,20 +1169,13 @@ def get_creator_wallet(currency_type: str) -> Tuple[Any, int]:
             }), 400
         
         # Buscar la wallet específica
-        wallet = mongo.db.creator_wallets.find_one({
-            "creator_email": email,
-            "currency_type": currency_type
-        })
+        wallet = wallet_store.get(email, currency_type)
         
         if not wallet:
             return jsonify({
                 "error": f"No tienes una wallet configurada para {currency_type}"
             }), 404
             
-        # Convertir ObjectId a string para JSON
-        if "_id" in wallet:
-            wallet["_id"] = str(wallet["_id"])
-            
         return jsonify({
             "message": f"Wallet de {currency_type} recuperada",
             "wallet": wallet
@@ -1192,32 +1210,15 @@ def update_creator_wallet(currency_type: str) -> Tuple[Any, int]:
                 "error": f"Tipo de moneda no soportada. Use: {CreatorWallet.SUPPORTED_CURRENCIES}"
             }), 400
             
-        # Verificar que la wallet existe
-        existing = mongo.db.creator_wallets.find_one({
-            "creator_email": email,
-            "currency_type": currency_type
-        })
+        # Actualizar dirección de wallet (None si la wallet no existe)
+        modified = wallet_store.update_address(email, currency_type, data["wallet_address"])
         
-        if not existing:
+        if modified is None:
             return jsonify({
                 "error": f"No tienes una wallet configurada para {currency_type}"
             }), 404
-            
-        # Actualizar dirección de wallet
-        result = mongo.db.creator_wallets.update_one(
-            {
-                "creator_email": email,
-                "currency_type": currency_type
-            },
-            {
-                "$set": {
-                    "wallet_address": data["wallet_address"],
-                    "updated_at": datetime.now()
-                }
-            }
-        )
         
-        if result.modified_count > 0:
+        if modified:
             return jsonify({
                 "message": f"Wallet de {currency_type} actualizada con éxito"
             }), 200
@@ -1249,31 +1250,15 @@ def delete_creator_wallet(currency_type: str) -> Tuple[Any, int]:
                 "error": f"Tipo de moneda no soportada. Use: {CreatorWallet.SUPPORTED_CURRENCIES}"
             }), 400
             
-        # Verificar que la wallet existe
-        existing = mongo.db.creator_wallets.find_one({
-            "creator_email": email,
-            "currency_type": currency_type
-        })
-        
-        if not existing:
+        # Eliminar wallet
+        if not wallet_store.delete(email, currency_type):
             return jsonify({
                 "error": f"No tienes una wallet configurada para {currency_type}"
             }), 404
-            
-        # Eliminar wallet
-        result = mongo.db.creator_wallets.delete_one({
-            "creator_email": email,
-            "currency_type": currency_type
-        })
         
-        if result.deleted_count > 0:
-            return jsonify({
-                "message": f"Wallet de {currency_type} eliminada con éxito"
-            }), 200
-        else:
-            return jsonify({
-                "error": "No se pudo eliminar la wallet"
-            }), 500
+        return jsonify({
+            "message": f"Wallet de {currency_type} eliminada con éxito"
+        }), 200
     except Exception as e:
         current_app.logger.error(f"[delete_creator_wallet] Error: {e}")
         return jsonify({"error": "Error al eliminar la wallet"}), 500
@@ -1298,40 +1283,16 @@ def set_default_wallet(currency_type: str) -> Tuple[Any, int]:
                 "error": f"Tipo de moneda no soportada. Use: {CreatorWallet.SUPPORTED_CURRENCIES}"
             }), 400
             
-        # Verificar que la wallet existe
-        existing = mongo.db.creator_wallets.find_one({
-            "creator_email": email,
-            "currency_type": currency_type
-        })
-        
-        if not existing:
+        # Marcar la wallet seleccionada como predeterminada (una escritura atómica en
+        # formato embedded)
+        if not wallet_store.set_default(email, currency_type):
             return jsonify({
                 "error": f"No tienes una wallet configurada para {currency_type}"
             }), 404
-            
-        # Primero, desmarcar cualquier wallet predeterminada actual
-        mongo.db.creator_wallets.update_many(
-            {"creator_email": email},
-            {"$set": {"is_default": False}}
-        )
         
-        # Marcar la wallet seleccionada como predeterminada
-        result = mongo.db.creator_wallets.update_one(
-            {
-                "creator_email": email,
-                "currency_type": currency_type
-            },
-            {"$set": {"is_default": True}}
-        )
-        
-        if result.modified_count > 0:
-            return jsonify({
-                "message": f"Wallet de {currency_type} establecida como predeterminada"
-            }), 200
-        else:
-            return jsonify({
-                "error": "No se pudo establecer la wallet como predeterminada"
-            }), 500
+        return jsonify({
+            "message": f"Wallet de {currency_type} establecida como predeterminada"
+        }), 200
     except Exception as e:
         current_app.logger.error(f"[set_default_wallet] Error: {e}")
         return jsonify({"error": "Error al establecer la wallet predeterminada"}), 500
@@ -1345,34 +1306,19 @@ def get_creator_donation_info(username: str) -> Tuple[Any, int]:
     Requiere: username del creador en la URL
     Retorna: información de donación, incluyendo wallets disponibles
     """
-    try:        # Buscar creador por username
-        creator = mongo.db.users.find_one(
-            {"username": username, "role": "creator"},
-            {"_id": 0, "password": 0}  # Solo excluir campos sensibles
-        )
+    try:
+        # Creador (sin email) y sus wallets: una sola lectura en formato embedded
+        donation_info = wallet_store.donation_info(username)
         
-        if not creator:
+        if not donation_info:
             return jsonify({"error": "Creador no encontrado"}), 404
-            
-        # Buscar wallets del creador
-        wallets_cursor = mongo.db.creator_wallets.find(
-            {"creator_email": creator["email"]},
-            {"_id": 0, "creator_email": 0}  # No exponer el email del creador
-        )
-        
-        wallets = list(wallets_cursor)
+        creator, wallets = donation_info
         
-        # Obtener wallet predeterminada si existe
-        default_wallet = next((w for w in wallets if w.get("is_default")), None)
-        if not default_wallet and wallets:
-            default_wallet = wallets[0]  # Si no hay predeterminada, usar la primera
+        # Wallet predeterminada (si no hay, la primera)
+        default_wallet = next((w for w in wallets if w["is_default"]), None)
             
         # Crear lista de métodos de donación disponibles
         available_currencies = [w["currency_type"] for w in wallets]
-        
-        # Eliminar el email del creador de la respuesta por seguridad
-        if "email" in creator:
-            del creator["email"]
             
         return jsonify({
             "creator": creator,
@@ -1405,40 +1351,21 @@ def toggle_like_post() -> Tuple[Any, int]:
         
         user_email: str = get_jwt_identity()
         
-        # Verificar si el post existe
-        from bson import ObjectId
         try:
             post_object_id = ObjectId(post_id)
         except:
             return jsonify({"error": "post_id inválido"}), 400
-            
-        post_exists = mongo.db.posts.find_one({"_id": post_object_id})
-        if not post_exists:
-            return jsonify({"error": "Post no encontrado"}), 404
         
-        # Verificar si ya existe el like
-        existing_like = mongo.db.likes.find_one({
-            "user_email": user_email,
-            "post_id": post_id
-        })
-        
-        if existing_like:
-            # Quitar like
-            mongo.db.likes.delete_one({
-                "user_email": user_email,
-                "post_id": post_id
-            })
-            liked = False
-            action = "removed"
+        # Alternar el like y actualizar el contador (dos operaciones atómicas),
+        # o acumularlo en el buffer write-behind si está activado
+        if current_app.config.get("LIKE_WRITE_BEHIND"):
+            liked, total_likes = like_buffer.toggle(post_object_id, user_email)
         else:
-            # Agregar like
-            like = Like(user_email, post_id)
-            mongo.db.likes.insert_one(like.to_dict())
-            liked = True
-            action = "added"
+            liked, total_likes = toggle_like(post_object_id, user_email)
+        if total_likes is None:
+            return jsonify({"error": "Post no encontrado"}), 404
         
-        # Contar total de likes para este post
-        total_likes = mongo.db.likes.count_documents({"post_id": post_id})
+        action = "added" if liked else "removed"
         
         return jsonify({
             "liked": liked,
@@ -1468,12 +1395,12 @@ def get_post_likes(post_id: str) -> Tuple[Any, int]:
         except:
             return jsonify({"error": "post_id inválido"}), 400
             
-        post_exists = mongo.db.posts.find_one({"_id": post_object_id})
+        post_exists = mongo.db.posts.find_one({"_id": post_object_id}, {"_id": 0, "likes_count": 1})
         if not post_exists:
             return jsonify({"error": "Post no encontrado"}), 404
         
-        # Contar total de likes
-        total_likes = mongo.db.likes.count_documents({"post_id": post_id})
+        # Total de likes desde el contador desnormalizado del post
+        total_likes = post_exists.get("likes_count", 0)
         
         # Verificar si el usuario actual le dio like (si está autenticado)
         user_liked = False
@@ -1484,7 +1411,8 @@ def get_post_likes(post_id: str) -> Tuple[Any, int]:
             if user_email:
                 user_like = mongo.db.likes.find_one({
                     "user_email": user_email,
-                    "post_id": post_id
+                    "post_id": post_id,
+                    **ACTIVE_LIKE_FILTER
                 })
                 user_liked = user_like is not None
         except:
@@ -0,0 +1,270 @@
+import heapq
+import logging
+import re
+import threading
+import time
+from itertools import chain
+from typing import Dict, Any, List, Optional, Tuple
+from flask import Flask
+from ..extensions import mongo
+
+logger = logging.getLogger(__name__)
+
+# Número de sugerencias precalculadas en cada nodo del trie
+AUTOCOMPLETE_TOP_K: int = 10
+
+# Candidatos leídos de MongoDB mientras el trie no está cargado
+AUTOCOMPLETE_FALLBACK_CANDIDATES: int = 200
+
+# (-followers_count, username_lower, username): el orden natural de la tupla es el ranking
+Entry = Tuple[int, str, str]
+
+
+class _Node:
+    """Nodo del trie comprimido: las aristas llevan etiquetas de varios caracteres"""
+
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self) -> None:
+        # primer carácter de la etiqueta -> (etiqueta, nodo hijo)
+        self.children: Dict[str, Tuple[str, "_Node"]] = {}
+        # email -> entrada de los creadores cuyo username termina en este nodo
+        # (None en los nodos intermedios para ahorrar memoria)
+        self.entries: Optional[Dict[str, Entry]] = None
+        # Mejores AUTOCOMPLETE_TOP_K entradas del subárbol, ya ordenadas
+        self.top: List[Entry] = []
+
+    def refresh_top(self) -> None:
+        self.top = heapq.nsmallest(
+            AUTOCOMPLETE_TOP_K,
+            chain(self.entries.values() if self.entries else (), *(child.top for _, child in self.children.values()))
+        )
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    length = min(len(a), len(b))
+    i = 0
+    while i < length and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class CreatorAutocomplete:
+    """
+    Trie comprimido en memoria con los usernames de los creadores, por worker
+
+    Cada nodo guarda las AUTOCOMPLETE_TOP_K mejores entradas de su subárbol ordenadas por
+    seguidores, así que una consulta solo recorre el prefijo (O(longitud del prefijo)).
+    Se carga en segundo plano desde MongoDB en el primer uso (mientras tanto responde
+    desde el índice username_lower), se actualiza al registrar, renombrar o eliminar
+    creadores en este worker y se reconstruye cada AUTOCOMPLETE_REFRESH_SECONDS para
+    recoger los cambios de seguidores y de otros workers.
+    """
+
+    def __init__(self) -> None:
+        self.refresh_seconds: float = 600.0
+        self._app: Optional[Flask] = None
+        self._lock = threading.RLock()
+        self._root = _Node()
+        # email -> entrada actual del creador (para renombrar y eliminar)
+        self._by_email: Dict[str, Entry] = {}
+        self._loaded_at: Optional[float] = None
+        self._refreshing: bool = False
+
+    def init_app(self, app: Flask) -> None:
+        """Lee la configuración y guarda la aplicación para las recargas en segundo plano"""
+        self._app = app
+        self.refresh_seconds = float(app.config.get("AUTOCOMPLETE_REFRESH_SECONDS", 600))
+
+    # Operaciones sobre el trie (llamar con el lock tomado)
+
+    def _insert(self, email: str, entry: Entry, refresh: bool = True) -> None:
+        node, rest = self._root, entry[1]
+        path: List[_Node] = [node]
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                child = _Node()
+                node.children[rest[0]] = (rest, child)
+                node, rest = child, ""
+            else:
+                label, child = edge
+                common = _common_prefix_length(label, rest)
+                if common < len(label):
+                    # Partir la arista: el nodo intermedio hereda el ranking del subárbol
+                    middle = _Node()
+                    middle.children[label[common]] = (label[common:], child)
+                    middle.top = list(child.top)
+                    node.children[rest[0]] = (label[:common], middle)
+                    child = middle
+                node, rest = child, rest[common:]
+            path.append(node)
+
+        if node.entries is None:
+            node.entries = {}
+        node.entries[email] = entry
+        self._by_email[email] = entry
+        if refresh:
+            for path_node in reversed(path):
+                path_node.refresh_top()
+
+    def _refresh_all(self) -> None:
+        # Recorrido en postorden: cada nodo combina los rankings ya calculados de sus hijos
+        stack: List[Tuple[_Node, bool]] = [(self._root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                node.refresh_top()
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for _, child in node.children.values())
+
+    def _remove(self, email: str) -> None:
+        entry = self._by_email.pop(email, None)
+        if entry is None:
+            return
+
+        node, rest = self._root, entry[1]
+        path: List[Tuple[_Node, str]] = []
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None or not rest.startswith(edge[0]):
+                return
+            path.append((node, rest[0]))
+            node, rest = edge[1], rest[len(edge[0]):]
+
+        if node.entries:
+            node.entries.pop(email, None)
+        node.refresh_top()
+        # Recalcular el ranking hacia la raíz, podando las hojas que quedan vacías
+        for parent, key in reversed(path):
+            child = parent.children[key][1]
+            if not child.entries and not child.children:
+                del parent.children[key]
+            parent.refresh_top()
+
+    def _search(self, prefix: str) -> List[Entry]:
+        node, rest = self._root, prefix
+        while rest:
+            edge = node.children.get(rest[0])
+            if edge is None:
+                return []
+            label, child = edge
+            if label.startswith(rest):
+                return child.top
+            if not rest.startswith(label):
+                return []
+            node, rest = child, rest[len(label):]
+        return node.top
+
+    # Carga desde la base de datos
+
+    def load(self) -> int:
+        """
+        Construye el trie desde las colecciones users y creator_stats y lo sustituye
+
+        Returns:
+            Número de creadores cargados
+        """
+        followers = {
+            item["creator_email"]: item.get("followers_count", 0)
+            for item in mongo.db.creator_stats.find({}, {"_id": 0, "creator_email": 1, "followers_count": 1})
+        }
+        fresh = CreatorAutocomplete()
+        for user in mongo.db.users.find({"role": "creator"}, {"_id": 0, "email": 1, "username": 1}):
+            username = user.get("username", "")
+            fresh._insert(user["email"], (-followers.get(user["email"], 0), username.lower(), username), refresh=False)
+        fresh._refresh_all()
+
+        with self._lock:
+            self._root, self._by_email = fresh._root, fresh._by_email
+            self._loaded_at = time.monotonic()
+        return len(fresh._by_email)
+
+    def _reload_in_background(self) -> None:
+        try:
+            with self._app.app_context():
+                self.load()
+        except Exception as e:
+            logger.error(f"[autocomplete] Error recargando el trie: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _ensure_loaded(self) -> bool:
+        """
+        Lanza la carga (o recarga periódica) del trie en segundo plano si hace falta
+
+        Returns:
+            True si ya hay un trie cargado que se puede consultar
+        """
+        if self._app is None:
+            # Sin aplicación registrada (p. ej. scripts): carga síncrona
+            if self._loaded_at is None:
+                self.load()
+            return True
+
+        loaded = self._loaded_at is not None
+        if not loaded or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            with self._lock:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._reload_in_background, name="autocomplete-reload", daemon=True
+                    ).start()
+        return loaded
+
+    def _suggest_from_db(self, prefix: str, limit: int) -> List[Entry]:
+        """Sugerencias desde el índice username_lower mientras el trie se está cargando"""
+        candidates = list(mongo.db.users.find(
+            {"role": "creator", "username_lower": {"$regex": f"^{re.escape(prefix)}"}},
+            {"_id": 0, "email": 1, "username": 1}
+        ).limit(AUTOCOMPLETE_FALLBACK_CANDIDATES))
+        followers = {
+            item["creator_email"]: item.get("followers_count", 0)
+            for item in mongo.db.creator_stats.find(
+                {"creator_email": {"$in": [user["email"] for user in candidates]}},
+                {"_id": 0, "creator_email": 1, "followers_count": 1}
+            )
+        }
+        return heapq.nsmallest(limit, (
+            (-followers.get(user["email"], 0), user["username"].lower(), user["username"])
+            for user in candidates
+        ))
+
+    # API pública
+
+    def suggest(self, prefix: str, limit: int = AUTOCOMPLETE_TOP_K) -> List[Dict[str, Any]]:
+        """Creadores cuyo username empieza por el prefijo (sin distinguir mayúsculas), por seguidores"""
+        prefix = prefix.strip().lower()
+        if self._ensure_loaded():
+            with self._lock:
+                top = self._search(prefix)[:limit]
+        else:
+            top = self._suggest_from_db(prefix, limit)
+        return [{"username": username, "followers_count": -neg_followers} for neg_followers, _, username in top]
+
+    def add_creator(self, email: str, username: str) -> None:
+        """Añade un creador recién registrado (sin seguidores)"""
+        if self._loaded_at is None:
+            return  # Se incluirá en la carga inicial
+        with self._lock:
+            self._remove(email)
+            self._insert(email, (0, username.lower(), username))
+
+    def rename_creator(self, email: str, username: str) -> None:
+        """Actualiza el username de un creador conservando su número de seguidores"""
+        with self._lock:
+            entry = self._by_email.get(email)
+            if entry is None:
+                return
+            self._remove(email)
+            self._insert(email, (entry[0], username.lower(), username))
+
+    def remove_creator(self, email: str) -> None:
+        """Elimina un creador del trie"""
+        with self._lock:
+            self._remove(email)
+
+
+creator_autocomplete = CreatorAutocomplete()
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from flask import Flask
+from flask_pymongo import PyMongo
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Margen al sincronizar revocaciones para tolerar desfases de reloj entre workers/hosts
+SYNC_OVERLAP_SECONDS: float = 5.0
+
+# Índices de revoked_tokens: TTL sobre la expiración del token y sincronización incremental
+REVOKED_TOKEN_INDEXES: List[IndexModel] = [
+    IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    IndexModel([("revoked_at", ASCENDING)])
+]
+
+
+class TokenBlocklist:
+    """
+    Lista de JTIs revocados compartida entre workers
+
+    Backends (JWT_BLOCKLIST_BACKEND):
+    - "mongo" (por defecto): colección revoked_tokens con índice TTL sobre la expiración
+      del token, así que las entradas desaparecen solas cuando el token ya no es válido.
+      Cada worker mantiene una copia en memoria (dict jti -> exp) que sincroniza de forma
+      incremental cada JWT_BLOCKLIST_SYNC_SECONDS; la comprobación de un token es una
+      búsqueda en ese dict. Una revocación hecha en otro worker tarda como mucho ese
+      intervalo en aplicarse aquí. Si la sincronización falla, la copia local se sigue
+      usando hasta JWT_BLOCKLIST_MAX_STALE_SECONDS desde la última sincronización
+      correcta; pasado ese tiempo todos los tokens se consideran revocados.
+    - "memory": solo el dict en memoria (un único proceso, p. ej. desarrollo).
+    """
+
+    def __init__(self, mongo: PyMongo) -> None:
+        self._mongo = mongo
+        self.backend: str = "mongo"
+        self.sync_seconds: float = 1.0
+        self.max_stale_seconds: float = 5.0
+        self._lock = threading.Lock()
+        # jti -> exp (epoch en segundos) de los tokens revocados conocidos por este worker
+        self._revoked: Dict[str, float] = {}
+        self._next_sync: float = 0.0
+        # Instante (time.monotonic) de la última sincronización correcta
+        self._last_sync: Optional[float] = None
+        self._synced_until: Optional[datetime] = None
+        self._indexes_ready: bool = False
+
+    def init_app(self, app: Flask) -> None:
+        """Lee la configuración del backend"""
+        self.backend = app.config.get("JWT_BLOCKLIST_BACKEND", "mongo")
+        self.sync_seconds = float(app.config.get("JWT_BLOCKLIST_SYNC_SECONDS", 1.0))
+        # Nunca menor que el intervalo: entre dos sincronizaciones la copia no está caducada
+        self.max_stale_seconds = max(
+            float(app.config.get("JWT_BLOCKLIST_MAX_STALE_SECONDS", 5.0)), self.sync_seconds
+        )
+
+    @property
+    def _collection(self):
+        return self._mongo.db.revoked_tokens
+
+    def ensure_indexes(self) -> None:
+        """Crea el índice TTL y el de sincronización de revoked_tokens (idempotente)"""
+        self._collection.create_indexes(REVOKED_TOKEN_INDEXES)
+        self._indexes_ready = True
+
+    def add(self, jti: str, exp: Optional[float] = None) -> None:
+        """
+        Revoca un token
+
+        Args:
+            jti: Identificador del token
+            exp: Expiración del token (epoch en segundos, claim "exp"); sin ella la entrada
+                no caduca
+        """
+        expires = float(exp) if exp is not None else float("inf")
+        with self._lock:
+            self._revoked[jti] = expires
+
+        if self.backend != "mongo":
+            return
+        if not self._indexes_ready:
+            self.ensure_indexes()
+
+        doc = {"_id": jti, "revoked_at": datetime.now(timezone.utc)}
+        if exp is not None:
+            doc["expires_at"] = datetime.fromtimestamp(float(exp), tz=timezone.utc)
+        try:
+            self._collection.insert_one(doc)
+        except DuplicateKeyError:
+            pass  # Ya estaba revocado
+
+    def _sync(self) -> None:
+        """Incorpora las revocaciones hechas por otros workers desde la última sincronización"""
+        now = datetime.now(timezone.utc)
+        query: Dict = {}
+        if self._synced_until is not None:
+            query = {"revoked_at": {"$gte": self._synced_until - timedelta(seconds=SYNC_OVERLAP_SECONDS)}}
+
+        fetched: Dict[str, float] = {}
+        for doc in self._collection.find(query, {"_id": 1, "expires_at": 1}):
+            expires_at = doc.get("expires_at")
+            if expires_at is None:
+                fetched[doc["_id"]] = float("inf")
+            else:
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                fetched[doc["_id"]] = expires_at.timestamp()
+
+        epoch_now = now.timestamp()
+        with self._lock:
+            self._revoked.update(fetched)
+            # Los tokens ya caducados los rechaza la propia validación del JWT
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > epoch_now}
+            self._synced_until = now
+
+    def __contains__(self, jti: str) -> bool:
+        if self.backend == "mongo":
+            clock = time.monotonic()
+            if clock >= self._next_sync:
+                self._next_sync = clock + self.sync_seconds
+                try:
+                    self._sync()
+                    self._last_sync = clock
+                except Exception as e:
+                    logger.error(f"[blocklist] Error sincronizando tokens revocados: {e}")
+            # Sin sincronizar desde hace demasiado (o nunca) no se puede saber si el token
+            # se revocó en otro worker: se rechaza
+            if self._last_sync is None or clock - self._last_sync > self.max_stale_seconds:
+                return True
+        return jti in self._revoked
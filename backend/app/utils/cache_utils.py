@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Caché LRU acotada con caducidad por entrada, segura entre hilos
+
+    Guarda como mucho max_size entradas; al superarlo descarta la usada hace más tiempo.
+    Cada entrada caduca ttl_seconds después de guardarse. Lleva contadores de aciertos
+    y fallos para medir su efectividad.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 60.0) -> None:
+        self.max_size: int = max_size
+        self.ttl_seconds: float = ttl_seconds
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def configure(self, max_size: int, ttl_seconds: float) -> None:
+        """Cambia los límites de la caché y la vacía"""
+        with self._lock:
+            self.max_size = max_size
+            self.ttl_seconds = ttl_seconds
+            self._data.clear()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Devuelve el valor guardado o None si no existe o ha caducado"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Como get, pero sin contar acierto/fallo ni cambiar el orden LRU"""
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item is not None and item[0] >= time.monotonic() else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Guarda un valor, descartando la entrada menos usada si la caché está llena"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Elimina una entrada (si existe)"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso de la caché"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
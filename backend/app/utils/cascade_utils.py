@@ -0,0 +1,176 @@
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from bson import ObjectId
+from flask import Flask
+from ..extensions import mongo
+from .feed_utils import on_followers_removed
+from .like_utils import release_user_likes_batch
+from .stats_utils import delete_creator_stats, increment_many_creator_stats
+from .task_queue import task_queue
+from .user_utils import DELETED_ROLE
+
+# Estados de un trabajo de borrado (los reintentos y fallos los gestiona la cola de tareas)
+JOB_PENDING, JOB_DONE = "pending", "done"
+
+
+def _delete_batch(collection: str, query: Dict[str, Any], limit: int) -> int:
+    """Borra como mucho limit documentos que cumplen query; devuelve cuántos había (0 = terminado)"""
+    ids = [doc["_id"] for doc in mongo.db[collection].find(query, {"_id": 1}).limit(limit)]
+    if ids:
+        mongo.db[collection].delete_many({"_id": {"$in": ids}})
+    return len(ids)
+
+
+# Pasos del borrado. Cada paso procesa un lote y devuelve su tamaño; se repite hasta
+# que devuelve 0. Todos son idempotentes, así que repetir un lote tras una caída es seguro.
+
+def _step_wallets(job: Dict[str, Any], limit: int) -> int:
+    return _delete_batch("creator_wallets", {"creator_email": job["email"]}, limit)
+
+
+def _step_posts(job: Dict[str, Any], limit: int) -> int:
+    # Primero los likes y entradas de timeline de cada post, luego el post: si el proceso
+    # se interrumpe, el lote se vuelve a encontrar en el siguiente intento
+    post_ids = [doc["_id"] for doc in mongo.db.posts.find({"creator_email": job["email"]}, {"_id": 1}).limit(limit)]
+    if post_ids:
+        mongo.db.likes.delete_many({"post_id": {"$in": [str(post_id) for post_id in post_ids]}})
+        mongo.db.timelines.delete_many({"post_id": {"$in": post_ids}})
+        mongo.db.posts.delete_many({"_id": {"$in": post_ids}})
+    return len(post_ids)
+
+
+def _step_followers(job: Dict[str, Any], limit: int) -> int:
+    return _delete_batch("followings", {"creator_email": job["email"]}, limit)
+
+
+def _step_followings(job: Dict[str, Any], limit: int) -> int:
+    followings = list(mongo.db.followings.find(
+        {"follower_email": job["email"]}, {"_id": 1, "creator_email": 1}
+    ).limit(limit))
+    if followings:
+        mongo.db.followings.delete_many({"_id": {"$in": [item["_id"] for item in followings]}})
+        increment_many_creator_stats({
+            item["creator_email"]: {"followers_count": -1} for item in followings
+        })
+        on_followers_removed(item["creator_email"] for item in followings)
+    return len(followings)
+
+
+def _step_likes(job: Dict[str, Any], limit: int) -> int:
+    return release_user_likes_batch(job["email"], limit)
+
+
+def _step_creator_timelines(job: Dict[str, Any], limit: int) -> int:
+    return _delete_batch("timelines", {"creator_email": job["email"]}, limit)
+
+
+def _step_timeline(job: Dict[str, Any], limit: int) -> int:
+    return _delete_batch("timelines", {"follower_email": job["email"]}, limit)
+
+
+def _step_stats(job: Dict[str, Any], limit: int) -> int:
+    # delete_account ya lo borra al marcar la cuenta; aquí se elimina el que hayan
+    # recreado los pasos anteriores o las escrituras concurrentes
+    delete_creator_stats(job["email"])
+    return 0
+
+
+def _step_user(job: Dict[str, Any], limit: int) -> int:
+    # Solo se borra el tombstone (nunca una cuenta nueva registrada con el mismo email)
+    mongo.db.users.delete_one({"email": job["email"], "role": DELETED_ROLE})
+    return 0
+
+
+def _step_post_likes(job: Dict[str, Any], limit: int) -> int:
+    return _delete_batch("likes", {"post_id": str(job["post_id"])}, limit)
+
+
+def _step_post_timelines(job: Dict[str, Any], limit: int) -> int:
+    return _delete_batch("timelines", {"post_id": job["post_id"]}, limit)
+
+
+STEPS: Dict[str, Callable[[Dict[str, Any], int], int]] = {
+    "wallets": _step_wallets,
+    "posts": _step_posts,
+    "followers": _step_followers,
+    "followings": _step_followings,
+    "likes": _step_likes,
+    "creator_timelines": _step_creator_timelines,
+    "timeline": _step_timeline,
+    "stats": _step_stats,
+    "user": _step_user,
+    "post_likes": _step_post_likes,
+    "post_timelines": _step_post_timelines
+}
+
+# Pasos de cada tipo de borrado, en orden (el documento del usuario siempre al final)
+ACCOUNT_STEPS: Dict[str, List[str]] = {
+    "creator": ["wallets", "posts", "followers", "likes", "creator_timelines", "stats", "user"],
+    "follower": ["followings", "likes", "timeline", "user"]
+}
+POST_STEPS: List[str] = ["post_likes", "post_timelines"]
+
+
+class CascadeDeleter:
+    """
+    Borrado en cascada de cuentas y posts en segundo plano
+
+    Las rutas solo marcan la cuenta (tombstone) o borran el post y encolan un trabajo:
+    el documento en deletion_jobs guarda los pasos y el progreso, y una tarea
+    cascade_delete de la cola (utils/task_queue.py) lo ejecuta por lotes de
+    CASCADE_BATCH_SIZE documentos, con una pausa de CASCADE_BATCH_PAUSE_SECONDS entre
+    lotes para no saturar la base de datos. Si la tarea se interrumpe, el reintento
+    continúa desde el paso guardado.
+    """
+
+    def __init__(self) -> None:
+        self.batch_size: int = 500
+        self.batch_pause: float = 0.05
+
+    def init_app(self, app: Flask) -> None:
+        """Lee el tamaño de lote y la pausa entre lotes"""
+        self.batch_size = max(int(app.config.get("CASCADE_BATCH_SIZE", 500)), 1)
+        self.batch_pause = float(app.config.get("CASCADE_BATCH_PAUSE_SECONDS", 0.05))
+
+    def _enqueue(self, job: Dict[str, Any]) -> ObjectId:
+        now = datetime.now()
+        job.update({"status": JOB_PENDING, "step": 0, "processed": {}, "created_at": now, "updated_at": now})
+        job_id = mongo.db.deletion_jobs.insert_one(job).inserted_id
+        task_queue.enqueue("cascade_delete", job_id=job_id)
+        return job_id
+
+    def enqueue_account(self, email: str, role: str) -> ObjectId:
+        """Encola el borrado de los datos de una cuenta ya marcada con DELETED_ROLE"""
+        steps = ACCOUNT_STEPS.get(role, ["likes", "user"])
+        return self._enqueue({"kind": "account", "email": email, "role": role, "steps": steps})
+
+    def enqueue_post(self, post_id: ObjectId, creator_email: str) -> ObjectId:
+        """Encola el borrado de los likes y entradas de timeline de un post ya eliminado"""
+        return self._enqueue({"kind": "post", "post_id": post_id, "email": creator_email, "steps": POST_STEPS})
+
+    def _progress(self, job: Dict[str, Any], update: Dict[str, Any]) -> None:
+        update.setdefault("$set", {})["updated_at"] = datetime.now()
+        mongo.db.deletion_jobs.update_one({"_id": job["_id"]}, update)
+
+    def run_job(self, job_id: ObjectId) -> None:
+        """Ejecuta los pasos pendientes de un trabajo de borrado"""
+        job = mongo.db.deletion_jobs.find_one({"_id": job_id})
+        if job is None or job["status"] == JOB_DONE:
+            return
+        for index in range(job.get("step", 0), len(job["steps"])):
+            name = job["steps"][index]
+            while (processed := STEPS[name](job, self.batch_size)) > 0:
+                self._progress(job, {"$inc": {f"processed.{name}": processed}})
+                if self.batch_pause > 0:
+                    time.sleep(self.batch_pause)
+            self._progress(job, {"$set": {"step": index + 1}})
+        self._progress(job, {"$set": {"status": JOB_DONE, "finished_at": datetime.now()}})
+
+
+cascade_deleter = CascadeDeleter()
+
+
+@task_queue.task("cascade_delete", max_concurrency=2)
+def run_deletion_job(job_id: ObjectId) -> None:
+    cascade_deleter.run_job(job_id)
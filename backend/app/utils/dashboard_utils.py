@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from flask import Flask
+from ..extensions import mongo
+from .cache_utils import TTLCache
+
+# Panel de cada creador ya calculado en este worker, por email. Se invalida al cambiar
+# sus contadores (stats_utils); en los demás workers el TTL acota el retraso.
+dashboard_cache = TTLCache(ttl_seconds=15)
+
+# Ventanas de crecimiento de seguidores del panel: nombre -> días
+FOLLOWER_GROWTH_WINDOWS: Dict[str, int] = {
+    "last_7_days": 7,
+    "last_30_days": 30
+}
+
+
+def init_dashboard_cache(app: Flask) -> None:
+    """Configura el tamaño y la caducidad de la caché de paneles"""
+    dashboard_cache.configure(
+        max_size=int(app.config.get("DASHBOARD_CACHE_MAX_SIZE", 5000)),
+        ttl_seconds=float(app.config.get("DASHBOARD_CACHE_TTL_SECONDS", 15))
+    )
+
+
+def _follower_growth(creator_email: str) -> Dict[str, int]:
+    """Nuevos seguidores en cada ventana, con una sola agregación $facet"""
+    now = datetime.now()
+    oldest = now - timedelta(days=max(FOLLOWER_GROWTH_WINDOWS.values()))
+    facets = {
+        name: [{"$match": {"created_at": {"$gte": now - timedelta(days=days)}}}, {"$count": "count"}]
+        for name, days in FOLLOWER_GROWTH_WINDOWS.items()
+    }
+    result = next(mongo.db.followings.aggregate([
+        # Usa el índice (creator_email, created_at) de los seguidores de un creador
+        {"$match": {"creator_email": creator_email, "created_at": {"$gte": oldest}}},
+        {"$facet": facets}
+    ]), {})
+    return {name: result[name][0]["count"] if result.get(name) else 0 for name in FOLLOWER_GROWTH_WINDOWS}
+
+
+def build_creator_dashboard(creator_email: str) -> Dict[str, Any]:
+    """
+    Calcula el panel de un creador: contadores precalculados de creator_stats y
+    crecimiento reciente de seguidores (dos consultas en total)
+    """
+    stats = mongo.db.creator_stats.find_one({"creator_email": creator_email}, {"_id": 0}) or {}
+    return {
+        "followers_count": stats.get("followers_count", 0),
+        "posts_count": stats.get("posts_count", 0),
+        "likes_count": stats.get("likes_count", 0),
+        "donations_total": stats.get("donations_total", 0),
+        "donations_count": stats.get("donations_count", 0),
+        "donations_by_currency": stats.get("donations_by_currency", {}),
+        "followers_growth": _follower_growth(creator_email)
+    }
+
+
+def get_creator_dashboard(creator_email: str) -> Dict[str, Any]:
+    """Panel de un creador desde la caché o, si no está, calculado y guardado en ella"""
+    dashboard = dashboard_cache.get(creator_email)
+    if dashboard is None:
+        dashboard = build_creator_dashboard(creator_email)
+        dashboard_cache.set(creator_email, dashboard)
+    return dashboard
+
+
+def invalidate_dashboard(*creator_emails: str) -> None:
+    """Descarta el panel cacheado de los creadores (tras cambiar sus estadísticas)"""
+    for creator_email in creator_emails:
+        dashboard_cache.delete(creator_email)
@@ -0,0 +1,172 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+from flask import Flask, current_app, has_request_context, request
+from pymongo import monitoring
+from pymongo.database import Database
+from pymongo.read_preferences import ReadPreference
+from ..extensions import mongo
+
+# Código de error de MongoDB para claves duplicadas (índices únicos, upserts concurrentes)
+DUPLICATE_KEY_ERROR: int = 11000
+
+# Modos de read preference admitidos en la configuración
+READ_PREFERENCE_MODES: Dict[str, Any] = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST
+}
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Contadores del pool de conexiones de MongoDB de este worker
+
+    Se registra como event_listener del MongoClient y permite ver en /metrics si el pool
+    se queda corto (esperas largas, checkouts fallidos por waitQueueTimeoutMS).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._checkout_started: Dict[int, float] = {}
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def _wait(self) -> float:
+        started = self._checkout_started.pop(threading.get_ident(), None)
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.created += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.closed += 1
+
+    def connection_check_out_started(self, event) -> None:
+        self._checkout_started[threading.get_ident()] = time.perf_counter()
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self._wait()
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            wait = self._wait()
+            self.checkouts += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self, max_pool_size: Optional[int] = None) -> Dict[str, Any]:
+        """Contadores actuales del pool"""
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "open_connections": self.created - self.closed,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3)
+            }
+        if max_pool_size:
+            stats["max_pool_size"] = max_pool_size
+            stats["utilization"] = round(stats["checked_out"] / max_pool_size, 4)
+        return stats
+
+
+pool_metrics = PoolMetricsListener()
+
+
+def mongo_client_options(app: Flask) -> Dict[str, Any]:
+    """
+    Opciones del MongoClient a partir de la configuración (solo las definidas)
+
+    Los compresores zstd y snappy necesitan los paquetes opcionales zstandard y
+    python-snappy; pymongo ignora con un aviso los que no estén instalados.
+    """
+    options: Dict[str, Any] = {"event_listeners": [pool_metrics]}
+    mapping = {
+        "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+        "MONGO_MIN_POOL_SIZE": "minPoolSize",
+        "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+        "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+        "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+        "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS"
+    }
+    for config_key, option in mapping.items():
+        value = app.config.get(config_key)
+        if value is not None:
+            options[option] = value
+    compressors = app.config.get("MONGO_COMPRESSORS")
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+def read_preference_mode(mode: str) -> str:
+    """Valida un modo de read preference de la configuración"""
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Read preference no válida: {mode}. Use: {list(READ_PREFERENCE_MODES)}")
+    return mode
+
+
+def parse_route_read_preferences(raw: str) -> Dict[str, str]:
+    """
+    Interpreta MONGO_ROUTE_READ_PREFERENCES: "endpoint=modo,endpoint=modo"
+
+    Ejemplo: "user_bp.explore_all_creators=secondaryPreferred,user_bp.search_creators=nearest"
+    """
+    preferences: Dict[str, str] = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        endpoint, _, mode = item.partition("=")
+        preferences[endpoint.strip()] = read_preference_mode(mode.strip())
+    return preferences
+
+
+def read_db() -> Database:
+    """
+    Base de datos para las lecturas de la ruta actual
+
+    Usa la read preference configurada para el endpoint en MONGO_ROUTE_READ_PREFERENCES
+    o, si no tiene, MONGO_READ_PREFERENCE (primary por defecto). Solo para lecturas que
+    toleran datos ligeramente atrasados: las de los secundarios pueden ir por detrás.
+    """
+    mode = current_app.config.get("MONGO_READ_PREFERENCE", "primary")
+    if has_request_context() and request.endpoint:
+        mode = current_app.config.get("MONGO_ROUTE_READ_PREFERENCES", {}).get(request.endpoint, mode)
+    if mode == "primary":
+        return mongo.db
+    return mongo.db.with_options(read_preference=READ_PREFERENCE_MODES[mode])
@@ -0,0 +1,342 @@
+import math
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo import InsertOne, UpdateOne
+from ..extensions import mongo
+from .stats_utils import STATS_BATCH_SIZE, STATS_FIELDS, increment_many_creator_stats
+
+# Moneda de las donaciones que no indican currency_type
+UNKNOWN_CURRENCY: str = "UNKNOWN"
+
+# Las monedas se usan como claves de donations_by_currency: solo caracteres seguros
+_CURRENCY_PATTERN = re.compile(r"^[A-Z0-9_]{1,16}$")
+
+# Granularidades de los rollups de donaciones (colección donation_rollups)
+HOUR, DAY = "hour", "day"
+
+# Días que se conservan los rollups por hora; los más antiguos solo se guardan por día
+ROLLUP_HOURLY_RETENTION_DAYS: int = 7
+
+# Rangos de /user/creator/donations/stats: rango -> (granularidad, número de buckets)
+STATS_RANGES: Dict[str, Tuple[str, int]] = {
+    "24h": (HOUR, 24),
+    "7d": (DAY, 7),
+    "30d": (DAY, 30),
+    "90d": (DAY, 90)
+}
+
+
+def to_naive_utc(moment: datetime) -> datetime:
+    """
+    Fecha en UTC sin zona horaria, como las guarda MongoDB
+
+    Las donaciones, los buckets de los rollups y los rangos de la serie usan este reloj;
+    una fecha sin zona horaria se considera ya en UTC.
+    """
+    if moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def currency_key(currency_type: Optional[str]) -> str:
+    """Clave de moneda normalizada de una donación"""
+    if not currency_type:
+        return UNKNOWN_CURRENCY
+    key = str(currency_type).strip().upper()
+    if not _CURRENCY_PATTERN.match(key):
+        raise ValueError(f"Moneda no válida: {currency_type}")
+    return key
+
+
+def donation_deltas(donations: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Incrementos de creator_stats correspondientes a un conjunto de donaciones
+
+    Returns:
+        Diccionario receiver_email -> incrementos (totales y por moneda)
+    """
+    deltas: Dict[str, Dict[str, Any]] = defaultdict(lambda: defaultdict(int))
+    for donation in donations:
+        creator = deltas[donation["receiver_email"]]
+        currency = currency_key(donation.get("currency_type"))
+        creator["donations_total"] += donation["amount"]
+        creator["donations_count"] += 1
+        creator[f"donations_by_currency.{currency}.total"] += donation["amount"]
+        creator[f"donations_by_currency.{currency}.count"] += 1
+    return deltas
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Inicio del bucket (hora o día UTC) que contiene moment"""
+    moment = to_naive_utc(moment)
+    if granularity == HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def increment_donation_rollups(donations: Iterable[Dict[str, Any]]) -> None:
+    """
+    Suma un conjunto de donaciones a sus rollups por hora y por día
+
+    Cada rollup es un documento por creador y bucket con el total, el número de
+    donaciones y el desglose by_currency, de modo que una gráfica de 90 días se sirve
+    leyendo como mucho 90 documentos. La carga masiva (ingest_utils) la llama con las
+    mismas donaciones que incrementan creator_stats.
+    """
+    deltas: Dict[Tuple[str, str, datetime], Dict[str, Any]] = defaultdict(lambda: defaultdict(int))
+    for donation in donations:
+        currency = currency_key(donation.get("currency_type"))
+        for granularity in (HOUR, DAY):
+            bucket = deltas[(donation["receiver_email"], granularity, bucket_start(donation["created_at"], granularity))]
+            bucket["total"] += donation["amount"]
+            bucket["count"] += 1
+            bucket[f"by_currency.{currency}.total"] += donation["amount"]
+            bucket[f"by_currency.{currency}.count"] += 1
+
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"creator_email": creator_email, "granularity": granularity, "bucket": bucket},
+            {"$inc": dict(increments), "$set": {"updated_at": now}},
+            upsert=True
+        )
+        for (creator_email, granularity, bucket), increments in deltas.items()
+    ]
+    for start in range(0, len(ops), STATS_BATCH_SIZE):
+        mongo.db.donation_rollups.bulk_write(ops[start:start + STATS_BATCH_SIZE], ordered=False)
+
+
+def get_donation_series(db: Any, creator_email: str, range_name: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Serie temporal de donaciones de un creador leída de los rollups
+
+    Los buckets sin donaciones se devuelven a cero para que la gráfica sea continua.
+
+    Args:
+        db: Base de datos de lectura (read_db() en las rutas)
+        creator_email: Email del creador
+        range_name: Rango de STATS_RANGES ("24h", "7d", "30d", "90d")
+        now: Fin del rango (por defecto, la hora actual en UTC)
+
+    Returns:
+        Diccionario con granularity, buckets y los totales del rango
+    """
+    granularity, size = STATS_RANGES[range_name]
+    step = timedelta(hours=1) if granularity == HOUR else timedelta(days=1)
+    first = bucket_start(now or datetime.utcnow(), granularity) - step * (size - 1)
+
+    stored = {
+        rollup["bucket"]: rollup
+        for rollup in db.donation_rollups.find(
+            {"creator_email": creator_email, "granularity": granularity, "bucket": {"$gte": first}},
+            {"_id": 0, "bucket": 1, "total": 1, "count": 1, "by_currency": 1}
+        )
+    }
+    buckets = []
+    for index in range(size):
+        bucket = first + step * index
+        rollup = stored.get(bucket, {})
+        buckets.append({
+            "bucket": bucket,
+            "total": rollup.get("total", 0),
+            "count": rollup.get("count", 0),
+            "by_currency": rollup.get("by_currency", {})
+        })
+    return {
+        "range": range_name,
+        "granularity": granularity,
+        "buckets": buckets,
+        "total": sum(bucket["total"] for bucket in buckets),
+        "count": sum(bucket["count"] for bucket in buckets)
+    }
+
+
+def compact_donation_rollups(retention_days: int = ROLLUP_HOURLY_RETENTION_DAYS) -> int:
+    """
+    Compacta los rollups antiguos: por encima de retention_days solo se conserva el
+    rollup diario
+
+    Los rollups diarios se mantienen al guardar cada donación, así que ya contienen las
+    horas del día y compactar es borrar los rollups por hora que han caducado (nunca se
+    suman dos veces, aunque el proceso se interrumpa y se repita).
+
+    Returns:
+        Número de rollups por hora eliminados
+    """
+    cutoff = bucket_start(datetime.utcnow(), DAY) - timedelta(days=retention_days)
+    return mongo.db.donation_rollups.delete_many({"granularity": HOUR, "bucket": {"$lt": cutoff}}).deleted_count
+
+
+def _bucket_expression(granularity: str) -> Dict[str, Any]:
+    # $dateFromParts (MongoDB 3.6+) en lugar de $dateTrunc (5.0+)
+    parts = {"year": {"$year": "$created_at"}, "month": {"$month": "$created_at"}, "day": {"$dayOfMonth": "$created_at"}}
+    if granularity == HOUR:
+        parts["hour"] = {"$hour": "$created_at"}
+    return {"$dateFromParts": parts}
+
+
+def rebuild_donation_rollups(retention_days: int = ROLLUP_HOURLY_RETENTION_DAYS) -> int:
+    """
+    Recalcula desde cero los rollups a partir de la colección donations: diarios para
+    todas las donaciones y por hora para los últimos retention_days días
+
+    Las donaciones guardadas mientras se ejecuta pueden quedar contadas dos veces o
+    ninguna: ejecutar sin carga de escritura (p. ej. tras desplegar los rollups).
+
+    Returns:
+        Número de rollups escritos
+    """
+    hourly_since = bucket_start(datetime.utcnow(), DAY) - timedelta(days=retention_days)
+    mongo.db.donation_rollups.delete_many({})
+    now = datetime.utcnow()
+    written = 0
+
+    for granularity, match in ((DAY, {}), (HOUR, {"created_at": {"$gte": hourly_since}})):
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": {"created_at": {"$type": "date"}, **match}},
+            {"$group": {
+                "_id": {
+                    "creator_email": "$receiver_email",
+                    "bucket": _bucket_expression(granularity),
+                    "currency_type": "$currency_type"
+                },
+                "total": {"$sum": "$amount"},
+                "count": {"$sum": 1}
+            }},
+            # Las monedas de un mismo bucket llegan juntas
+            {"$sort": {"_id.creator_email": 1, "_id.bucket": 1}}
+        ]
+        ops: List[InsertOne] = []
+        rollup: Optional[Dict[str, Any]] = None
+        for item in mongo.db.donations.aggregate(pipeline, allowDiskUse=True):
+            key = (item["_id"]["creator_email"], item["_id"]["bucket"])
+            if rollup is None or (rollup["creator_email"], rollup["bucket"]) != key:
+                if rollup is not None:
+                    ops.append(InsertOne(rollup))
+                rollup = {
+                    "creator_email": key[0], "granularity": granularity, "bucket": key[1],
+                    "total": 0, "count": 0, "by_currency": {}, "updated_at": now
+                }
+            try:
+                currency = currency_key(item["_id"].get("currency_type"))
+            except ValueError:
+                currency = UNKNOWN_CURRENCY
+            values = rollup["by_currency"].setdefault(currency, {"total": 0, "count": 0})
+            for target in (values, rollup):
+                target["total"] += item["total"]
+                target["count"] += item["count"]
+            if len(ops) >= STATS_BATCH_SIZE:
+                mongo.db.donation_rollups.bulk_write(ops, ordered=False)
+                written += len(ops)
+                ops = []
+        if rollup is not None:
+            ops.append(InsertOne(rollup))
+        if ops:
+            mongo.db.donation_rollups.bulk_write(ops, ordered=False)
+            written += len(ops)
+    return written
+
+
+def aggregate_donation_totals(creator_emails: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Totales de donaciones calculados sobre la colección donations
+
+    Returns:
+        Diccionario email -> {donations_total, donations_count, donations_by_currency}
+    """
+    pipeline: List[Dict[str, Any]] = []
+    if creator_emails is not None:
+        pipeline.append({"$match": {"receiver_email": {"$in": creator_emails}}})
+    pipeline.append({"$group": {
+        "_id": {"receiver_email": "$receiver_email", "currency_type": "$currency_type"},
+        "total": {"$sum": "$amount"},
+        "count": {"$sum": 1}
+    }})
+
+    totals: Dict[str, Dict[str, Any]] = defaultdict(
+        lambda: {"donations_total": 0, "donations_count": 0, "donations_by_currency": {}}
+    )
+    for item in mongo.db.donations.aggregate(pipeline, allowDiskUse=True):
+        creator = totals[item["_id"]["receiver_email"]]
+        try:
+            key = currency_key(item["_id"].get("currency_type"))
+        except ValueError:
+            key = UNKNOWN_CURRENCY  # Datos anteriores con monedas no normalizables
+        currency = creator["donations_by_currency"].setdefault(key, {"total": 0, "count": 0})
+        currency["total"] += item["total"]
+        currency["count"] += item["count"]
+        creator["donations_total"] += item["total"]
+        creator["donations_count"] += item["count"]
+    return totals
+
+
+def _same_amount(a: float, b: float) -> bool:
+    # Los incrementos suman en otro orden que $sum: se toleran errores de redondeo
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def _totals_match(stored: Dict[str, Any], expected: Dict[str, Any]) -> bool:
+    if stored.get("donations_count", 0) != expected["donations_count"]:
+        return False
+    if not _same_amount(stored.get("donations_total", 0), expected["donations_total"]):
+        return False
+    stored_currencies = {
+        currency: values for currency, values in (stored.get("donations_by_currency") or {}).items()
+        if values.get("count")
+    }
+    if stored_currencies.keys() != expected["donations_by_currency"].keys():
+        return False
+    return all(
+        stored_currencies[currency].get("count") == values["count"]
+        and _same_amount(stored_currencies[currency].get("total", 0), values["total"])
+        for currency, values in expected["donations_by_currency"].items()
+    )
+
+
+def check_donation_totals(fix: bool = False) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    Compara los totales materializados en creator_stats con la agregación sobre donations
+
+    Args:
+        fix: Reescribir los totales de los creadores que no coinciden
+
+    Returns:
+        Lista (email, guardado, esperado) de los creadores con diferencias
+    """
+    expected_totals = aggregate_donation_totals()
+    empty = {"donations_total": 0, "donations_count": 0, "donations_by_currency": {}}
+    mismatches: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+    seen = set()
+
+    for stored in mongo.db.creator_stats.find(
+        {}, {"_id": 0, "creator_email": 1, "donations_total": 1, "donations_count": 1, "donations_by_currency": 1}
+    ):
+        email = stored["creator_email"]
+        seen.add(email)
+        expected = expected_totals.get(email, empty)
+        if not _totals_match(stored, expected):
+            mismatches.append((email, stored, expected))
+
+    # Donaciones a cuentas que aún no tienen documento de estadísticas
+    for email, expected in expected_totals.items():
+        if email not in seen and mongo.db.users.find_one({"email": email, "role": "creator"}, {"_id": 1}):
+            mismatches.append((email, {}, expected))
+
+    if fix:
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {"creator_email": email},
+                {
+                    "$set": {**expected, "updated_at": now},
+                    "$setOnInsert": {field: 0 for field in STATS_FIELDS if field not in expected}
+                },
+                upsert=True
+            )
+            for email, _, expected in mismatches
+        ]
+        for start in range(0, len(ops), STATS_BATCH_SIZE):
+            mongo.db.creator_stats.bulk_write(ops[start:start + STATS_BATCH_SIZE], ordered=False)
+    return mismatches
@@ -0,0 +1,210 @@
+import heapq
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from flask import current_app
+from ..extensions import mongo
+from .task_queue import task_queue
+from .stats_utils import increment_followers_count
+from .timeline_utils import (
+    backfill_timeline, fan_out_post, fan_out_recent_posts, read_timeline, remove_creator_from_timelines, trim_timeline
+)
+from .pagination_utils import POSTS_SORT, apply_cursor
+
+
+def get_celebrity_threshold() -> int:
+    """Número de seguidores a partir del cual un creador deja de hacer fan-out"""
+    return current_app.config.get("FEED_CELEBRITY_THRESHOLD", 10000)
+
+
+def is_celebrity(creator_email: str) -> bool:
+    """Indica si un creador supera el umbral de seguidores (según creator_stats)"""
+    stats = mongo.db.creator_stats.find_one({"creator_email": creator_email}, {"_id": 0, "followers_count": 1})
+    return (stats or {}).get("followers_count", 0) >= get_celebrity_threshold()
+
+
+def get_celebrity_creators() -> Set[str]:
+    """
+    Obtiene los emails de los creadores cuyos posts se leen en modo pull
+
+    Usa el índice de creator_stats por followers_count, así que solo recorre los creadores
+    que superan el umbral. No se cachea: debe coincidir con is_celebrity, que decide al
+    publicar si un post se distribuye a los timelines.
+    """
+    return {
+        item["creator_email"]
+        for item in mongo.db.creator_stats.find(
+            {"followers_count": {"$gte": get_celebrity_threshold()}},
+            {"_id": 0, "creator_email": 1}
+        )
+    }
+
+
+def increment_followers(creator_email: str, delta: int) -> int:
+    """
+    Actualiza followers_count de un creador tras seguirlo o dejar de seguirlo y, si cruza
+    el umbral de celebridad, encola el ajuste de los timelines (feed_mode_change)
+
+    Returns:
+        followers_count resultante
+    """
+    followers = increment_followers_count(creator_email, delta)
+    threshold = get_celebrity_threshold()
+    if (followers - delta >= threshold) != (followers >= threshold):
+        task_queue.enqueue("feed_mode_change", creator_email=creator_email)
+    return followers
+
+
+def on_followers_removed(creator_emails: Iterable[str]) -> None:
+    """
+    Encola el ajuste de los timelines de los creadores que han bajado del umbral tras
+    descontarles un seguidor a cada uno (borrado de la cuenta de un follower)
+    """
+    for item in mongo.db.creator_stats.find(
+        {"creator_email": {"$in": list(creator_emails)}, "followers_count": get_celebrity_threshold() - 1},
+        {"_id": 0, "creator_email": 1}
+    ):
+        task_queue.enqueue("feed_mode_change", creator_email=item["creator_email"])
+
+
+def publish_post(post: Dict[str, Any]) -> int:
+    """
+    Publica un post recién creado en los timelines (push) salvo que el creador sea celebridad
+
+    Returns:
+        Número de timelines actualizados (0 si el post se leerá en modo pull)
+    """
+    if is_celebrity(post["creator_email"]):
+        return 0
+    return fan_out_post(post)
+
+
+def on_follow(follower_email: str, creator_email: str) -> int:
+    """Copia al timeline los posts recientes del creador si no se lee en modo pull"""
+    if is_celebrity(creator_email):
+        return 0
+    return backfill_timeline(follower_email, creator_email)
+
+
+# TAREAS DIFERIDAS DEL FEED (ver utils/task_queue.py)
+
+@task_queue.task("publish_post")
+def publish_post_task(post_id: Any) -> None:
+    """Fan-out de un post; no hace nada si el post se eliminó antes de ejecutarse"""
+    post = mongo.db.posts.find_one({"_id": post_id}, {"creator_email": 1, "created_at": 1})
+    if post:
+        publish_post(post)
+
+
+@task_queue.task("follow_backfill")
+def follow_backfill_task(follower_email: str, creator_email: str) -> None:
+    """Backfill del timeline tras seguir, salvo que el follower ya haya dejado de seguir"""
+    if mongo.db.followings.find_one({"follower_email": follower_email, "creator_email": creator_email}, {"_id": 1}):
+        on_follow(follower_email, creator_email)
+
+
+@task_queue.task("feed_mode_change")
+def feed_mode_change_task(creator_email: str) -> None:
+    """
+    Ajusta los timelines cuando un creador cruza el umbral de celebridad
+
+    Se evalúa el modo actual (no el del momento de encolar), así que si el creador cruza
+    el umbral varias veces seguidas se aplica el último cambio:
+    - modo pull: sus posts se quitan de los timelines (se leen de posts al construir el feed)
+    - modo push: sus posts recientes se copian a los timelines de todos sus seguidores,
+      incluidos los publicados mientras estaba en modo pull, que nunca se distribuyeron
+    """
+    if is_celebrity(creator_email):
+        remove_creator_from_timelines(creator_email)
+    else:
+        fan_out_recent_posts(creator_email)
+
+
+@task_queue.task("unfollow_trim")
+def unfollow_trim_task(follower_email: str, creator_email: str) -> None:
+    """Quita del timeline los posts del creador, salvo que el follower lo haya vuelto a seguir"""
+    if not mongo.db.followings.find_one({"follower_email": follower_email, "creator_email": creator_email}, {"_id": 1}):
+        trim_timeline(follower_email, creator_email)
+
+
+def build_feed(
+    follower_email: str,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Construye una página del feed combinando el timeline materializado (push)
+    con los posts de los creadores celebridad seguidos (pull)
+
+    Ambos flujos ya vienen ordenados por (created_at, _id) desc, por lo que se mezclan
+    con un k-way merge sin reordenar la página completa. Con cursor cada flujo lee
+    solo `limit` posts tras la clave del cursor; sin él se leen `skip + limit`.
+
+    Returns:
+        Tupla (posts de la página, total aproximado de posts del feed)
+    """
+    if cursor:
+        skip = 0
+    window = skip + limit
+
+    pushed_posts, pushed_total = read_timeline(follower_email, 0, window, cursor)
+
+    celebrities = get_celebrity_creators()
+    followed_celebrities: List[str] = []
+    if celebrities:
+        following_data = mongo.db.followings.find(
+            {"follower_email": follower_email, "creator_email": {"$in": list(celebrities)}},
+            {"_id": 0, "creator_email": 1}
+        )
+        followed_celebrities = [item["creator_email"] for item in following_data]
+
+    if not followed_celebrities:
+        return pushed_posts[skip:window], pushed_total
+
+    pull_query = {"creator_email": {"$in": followed_celebrities}}
+    pulled_total = mongo.db.posts.count_documents(pull_query)
+    pulled_posts = list(
+        mongo.db.posts.find(apply_cursor(pull_query, POSTS_SORT, cursor)).sort(POSTS_SORT).limit(window)
+    )
+
+    # Un post puede estar en ambos flujos si el creador superó el umbral después de publicarlo
+    merged: List[Dict[str, Any]] = []
+    seen: Set[Any] = set()
+    for post in heapq.merge(pushed_posts, pulled_posts, key=lambda p: (p["created_at"], p["_id"]), reverse=True):
+        if post["_id"] in seen:
+            continue
+        seen.add(post["_id"])
+        merged.append(post)
+        if len(merged) >= window:
+            break
+
+    return merged[skip:window], pushed_total + pulled_total
+
+
+def add_creator_info_to_posts(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Agrega username y avatar del creador a una lista de posts con una sola consulta $in
+
+    Args:
+        posts: Lista de posts (diccionarios con creator_email)
+
+    Returns:
+        La misma lista con creator_username y creator_avatar añadidos
+    """
+    creator_emails = list({post["creator_email"] for post in posts})
+    if not creator_emails:
+        return posts
+
+    creators = {
+        creator["email"]: creator
+        for creator in mongo.db.users.find(
+            {"email": {"$in": creator_emails}},
+            {"_id": 0, "email": 1, "username": 1, "avatar_url": 1}
+        )
+    }
+
+    for post in posts:
+        creator = creators.get(post["creator_email"])
+        if creator:
+            post["creator_username"] = creator["username"]
+            post["creator_avatar"] = creator.get("avatar_url", "")
+    return posts
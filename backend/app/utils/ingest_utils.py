@@ -0,0 +1,223 @@
+import csv
+import io
+import math
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from flask import json
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from ..extensions import mongo
+from ..models.creator_wallet import CreatorWallet
+from .db_utils import DUPLICATE_KEY_ERROR
+from .wallet_utils import wallet_store
+from .donation_utils import donation_deltas, increment_donation_rollups, to_naive_utc
+from .stats_utils import increment_many_creator_stats
+
+# Registros por lote: solo un lote está en memoria a la vez
+INGEST_CHUNK_SIZE: int = 1000
+
+# Errores de validación que se devuelven en el informe (el resto solo se cuentan)
+MAX_REPORTED_ERRORS: int = 20
+
+MAX_TX_HASH_LENGTH: int = 128
+
+INGEST_FORMATS = ("ndjson", "csv")
+
+# Búsqueda por conjunto: se valida cada registro
+SUPPORTED_CURRENCIES = frozenset(CreatorWallet.SUPPORTED_CURRENCIES)
+
+
+class InvalidDonationError(ValueError):
+    """Registro de donación con datos no válidos"""
+
+
+def read_ndjson(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Lee un flujo NDJSON línea a línea (las líneas vacías se ignoran)"""
+    for line in stream:
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = {"_error": f"JSON no válido: {e}"}
+            yield record if isinstance(record, dict) else {"_error": "Se esperaba un objeto JSON"}
+
+
+def read_csv(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Lee un flujo CSV con cabecera; las celdas vacías se tratan como ausentes"""
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    for row in csv.DictReader(text):
+        yield {key: value for key, value in row.items() if key and value not in (None, "")}
+
+
+READERS: Dict[str, Callable[[IO[bytes]], Iterator[Dict[str, Any]]]] = {
+    "ndjson": read_ndjson,
+    "csv": read_csv
+}
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """Fecha en UTC sin zona horaria (como las guarda MongoDB); sin zona se asume UTC"""
+    if isinstance(value, bool):
+        raise InvalidDonationError(f"Fecha no válida: {value}")
+    try:
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.replace(".", "", 1).isdigit()):
+            return datetime.utcfromtimestamp(float(value))
+        parsed = datetime.fromisoformat(str(value))
+    except (OverflowError, OSError, ValueError):
+        # Epoch fuera del rango de datetime (o no finito) o texto que no es ISO 8601
+        raise InvalidDonationError(f"Fecha no válida: {value}")
+    return to_naive_utc(parsed)
+
+
+def parse_donation(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Valida un registro exportado por el indexador y lo convierte en documento de donación
+
+    Campos: tx_hash, currency_type (o currency), amount, receiver_email o wallet_address,
+    y opcionalmente sender_address y timestamp (ISO 8601 o segundos epoch; sin zona horaria se toma como UTC)
+    """
+    if "_error" in record:
+        raise InvalidDonationError(record["_error"])
+
+    tx_hash = str(record.get("tx_hash", "")).strip()
+    if not tx_hash or len(tx_hash) > MAX_TX_HASH_LENGTH:
+        raise InvalidDonationError("tx_hash ausente o demasiado largo")
+
+    currency = str(record.get("currency_type") or record.get("currency") or "").strip().upper()
+    if currency not in SUPPORTED_CURRENCIES:
+        raise InvalidDonationError(f"Moneda no soportada: {currency or '(vacía)'}")
+
+    try:
+        amount = float(record["amount"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidDonationError("amount ausente o no numérico")
+    if not math.isfinite(amount) or amount <= 0:
+        raise InvalidDonationError("amount debe ser un número positivo")
+
+    donation: Dict[str, Any] = {"tx_hash": tx_hash, "currency_type": currency, "amount": amount}
+    if record.get("receiver_email"):
+        donation["receiver_email"] = str(record["receiver_email"]).strip()
+    elif record.get("wallet_address"):
+        donation["wallet_address"] = str(record["wallet_address"]).strip()
+    else:
+        raise InvalidDonationError("Falta receiver_email o wallet_address")
+    if record.get("sender_address"):
+        donation["sender_address"] = str(record["sender_address"]).strip()
+    donation["created_at"] = _parse_timestamp(record["timestamp"]) if record.get("timestamp") else datetime.utcnow()
+    return donation
+
+
+def _resolve_receivers(donations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Completa receiver_email a partir de la wallet del creador (una consulta por lote)"""
+    pending = [donation for donation in donations if "receiver_email" not in donation]
+    if not pending:
+        return donations
+    wallets = wallet_store.resolve_addresses(
+        (donation["currency_type"], donation["wallet_address"]) for donation in pending
+    )
+    for donation in pending:
+        creator_email = wallets.get((donation["currency_type"], donation["wallet_address"]))
+        if creator_email:
+            donation["receiver_email"] = creator_email
+    return donations
+
+
+def write_donation_chunk(donations: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Escribe un lote de donaciones con upserts sin orden y actualiza los totales y rollups
+    de los creadores solo con las donaciones que no existían
+
+    Returns:
+        (insertadas, duplicadas)
+    """
+    # Duplicados dentro del propio lote
+    unique: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for donation in donations:
+        unique.setdefault((donation["currency_type"], donation["tx_hash"]), donation)
+    batch = list(unique.values())
+    if not batch:
+        return 0, len(donations)
+
+    ops = [
+        UpdateOne(
+            {"currency_type": donation["currency_type"], "tx_hash": donation["tx_hash"]},
+            {"$setOnInsert": donation},
+            upsert=True
+        )
+        for donation in batch
+    ]
+    try:
+        upserted = mongo.db.donations.bulk_write(ops, ordered=False).upserted_ids
+    except BulkWriteError as e:
+        # Otra carga insertó la misma transacción a la vez: cuenta como duplicada
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+            raise
+        upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+
+    inserted = [batch[index] for index in upserted]
+    increment_many_creator_stats(donation_deltas(inserted))
+    increment_donation_rollups(inserted)
+    return len(inserted), len(donations) - len(inserted)
+
+
+def ingest_donations(
+    records: Iterable[Dict[str, Any]],
+    chunk_size: int = INGEST_CHUNK_SIZE,
+    on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Carga donaciones desde un iterable de registros, por lotes de chunk_size
+
+    Los registros no válidos (o cuya wallet no pertenece a ningún creador) se descartan y
+    se cuentan. Cargar dos veces el mismo fichero no duplica donaciones ni totales.
+
+    Args:
+        records: Registros leídos con read_ndjson / read_csv
+        chunk_size: Registros por lote
+        on_chunk: Función llamada con el informe parcial tras cada lote
+
+    Returns:
+        Informe con filas leídas, insertadas, duplicadas, no válidas y filas por segundo
+    """
+    report: Dict[str, Any] = {"rows": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    started = time.perf_counter()
+    iterator = iter(records)
+
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+
+        donations: List[Dict[str, Any]] = []
+        for offset, record in enumerate(chunk):
+            try:
+                donations.append(parse_donation(record))
+            except InvalidDonationError as e:
+                report["invalid"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append({"row": report["rows"] + offset + 1, "error": str(e)})
+
+        resolved = [donation for donation in _resolve_receivers(donations) if "receiver_email" in donation]
+        unresolved = len(donations) - len(resolved)
+        if unresolved:
+            report["invalid"] += unresolved
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"row": None, "error": f"{unresolved} wallets sin creador en el lote"})
+
+        inserted, duplicates = write_donation_chunk(resolved)
+        report["rows"] += len(chunk)
+        report["inserted"] += inserted
+        report["duplicates"] += duplicates
+
+        elapsed = time.perf_counter() - started
+        report["seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = round(report["rows"] / elapsed, 1) if elapsed else 0.0
+        if on_chunk:
+            on_chunk(report)
+
+    elapsed = time.perf_counter() - started
+    report["seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["rows"] / elapsed, 1) if elapsed else 0.0
+    return report
@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Any, Union
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: sin ella se usa el módulo json estándar
+    orjson = None
+
+
+def _datetime_to_iso(value: datetime) -> str:
+    """
+    Formato de fechas de las respuestas: ISO 8601 con sufijo Z en las fechas sin zona y en
+    las que están en UTC (como orjson con OPT_NAIVE_UTC y OPT_UTC_Z)
+    """
+    offset = value.utcoffset()
+    if offset is None:
+        return value.isoformat() + "Z"
+    if not offset:
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    return value.isoformat()
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON con el módulo json estándar que serializa datetime y ObjectId
+
+    Las fechas sin zona (las que devuelve pymongo) y las fechas en UTC se escriben como
+    isoformat() + "Z", y los ObjectId como string, igual que OrjsonJSONProvider.
+    """
+
+    sort_keys = False
+
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, datetime):
+            return _datetime_to_iso(obj)
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        return DefaultJSONProvider.default(obj)
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON basado en orjson
+
+    orjson serializa datetime de forma nativa (OPT_NAIVE_UTC + OPT_UTC_Z producen el
+    mismo "...Z" que StdlibJSONProvider) y solo llama a default() para los ObjectId, así
+    que los documentos de MongoDB se pueden pasar a jsonify sin convertirlos antes.
+    Las claves conservan el orden de los documentos, como con el proveedor de bson.
+    """
+
+    option: int = 0 if orjson is None else (
+        orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    )
+
+    def _dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        option = self.option | orjson.OPT_INDENT_2 if indent else self.option
+        return orjson.dumps(obj, default=_orjson_default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
+
+
+def json_provider_class(name: str = "auto") -> type:
+    """
+    Proveedor JSON según JSON_PROVIDER: "orjson", "json" o "auto" (orjson si está instalado)
+    """
+    if name not in ("auto", "orjson", "json"):
+        raise ValueError(f"JSON_PROVIDER no válido: {name}. Use: auto, orjson, json")
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON_PROVIDER=orjson requiere el paquete orjson")
+    if name == "json" or orjson is None:
+        return StdlibJSONProvider
+    return OrjsonJSONProvider
@@ -0,0 +1,267 @@
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from bson import ObjectId
+from flask import Flask
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from ..extensions import mongo
+from .db_utils import DUPLICATE_KEY_ERROR
+from .like_utils import ACTIVE_LIKE_FILTER, INACTIVE_LIKE_FILTER, repair_likes_counts
+from .stats_utils import increment_many_creator_stats
+
+logger = logging.getLogger(__name__)
+
+# Límites del intervalo de volcado (segundos) para que la pérdida máxima ante una caída sea acotada
+MIN_FLUSH_INTERVAL: float = 0.1
+MAX_FLUSH_INTERVAL: float = 10.0
+
+
+class LikeWriteBuffer:
+    """
+    Buffer write-behind de likes por worker
+
+    Los toggles se acumulan en memoria por (post_id, user_email): varios toques del mismo
+    usuario se compensan entre sí y solo se escribe el estado final. Un hilo de fondo
+    vuelca el buffer periódicamente con bulk_write(ordered=False) sobre likes y posts.
+
+    Cada worker tiene su propio buffer y su propia base (el estado leído de la base de
+    datos), así que dos workers pueden tener en vuelo toggles del mismo like. Al volcar,
+    cada escritura está condicionada al estado guardado y los contadores solo cuentan
+    los likes que realmente cambiaron.
+
+    Si la escritura de los likes falla, el lote vuelve al buffer y se reintenta en el
+    siguiente volcado; si falla la de los contadores, los posts afectados se recalculan
+    desde la colección de likes en el siguiente volcado.
+    """
+
+    def __init__(self) -> None:
+        self.flush_interval: float = 1.0
+        self.max_pending: int = 10000
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # (post_id, user_email) -> {"base": estado en BD, "liked": estado actual}
+        self._pending: Dict[Tuple[str, str], Dict[str, bool]] = {}
+        # Entradas que se están escribiendo en este momento
+        self._flushing: Dict[Tuple[str, str], Dict[str, bool]] = {}
+        # post_id -> incremento de likes_count aún no escrito
+        self._deltas: Dict[str, int] = {}
+        self._flushing_deltas: Dict[str, int] = {}
+        # Posts cuyo likes_count quedó sin actualizar por un volcado fallido
+        self._dirty_posts: Set[str] = set()
+
+    def init_app(self, app: Flask) -> None:
+        """Lee la configuración del buffer y registra el volcado final al cerrar el proceso"""
+        interval = float(app.config.get("LIKE_BUFFER_FLUSH_SECONDS", 1.0))
+        self.flush_interval = min(max(interval, MIN_FLUSH_INTERVAL), MAX_FLUSH_INTERVAL)
+        self.max_pending = int(app.config.get("LIKE_BUFFER_MAX_PENDING", 10000))
+        if app.config.get("LIKE_WRITE_BEHIND"):
+            atexit.register(self.shutdown)
+
+    def _ensure_started(self) -> None:
+        # El hilo se crea en el primer uso para que cada worker (tras el fork) tenga el suyo
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="like-write-behind", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"[like_buffer] Error volcando likes: {e}")
+
+    def _stored_state(self, key: Tuple[str, str]) -> bool:
+        """Estado del like guardado en la base de datos"""
+        post_id, user_email = key
+        return mongo.db.likes.find_one(
+            {"post_id": post_id, "user_email": user_email, **ACTIVE_LIKE_FILTER},
+            {"_id": 1}
+        ) is not None
+
+    def toggle(self, post_object_id: ObjectId, user_email: str) -> Tuple[bool, Optional[int]]:
+        """
+        Alterna el like en el buffer sin escribir en la base de datos
+
+        Returns:
+            Tupla (estado final del like, likes_count estimado incluyendo los cambios
+            pendientes de este worker, o None si el post no existe)
+        """
+        post_id = str(post_object_id)
+        post = mongo.db.posts.find_one({"_id": post_object_id}, {"_id": 0, "likes_count": 1})
+        if post is None:
+            return False, None
+
+        key = (post_id, user_email)
+        with self._lock:
+            seen = self._pending.get(key) or self._flushing.get(key)
+        base = False
+        if seen is None:
+            base = self._stored_state(key)
+
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                # Si la clave estaba en el buffer (o en vuelo), su último estado es la base
+                if seen is not None:
+                    base = seen["liked"]
+                entry = {"base": base, "liked": base}
+                self._pending[key] = entry
+            entry["liked"] = not entry["liked"]
+            liked = entry["liked"]
+            self._deltas[post_id] = self._deltas.get(post_id, 0) + (1 if liked else -1)
+            pending_delta = self._deltas[post_id] + self._flushing_deltas.get(post_id, 0)
+            should_flush = len(self._pending) >= self.max_pending
+
+        self._ensure_started()
+        if should_flush:
+            self._wake.set()
+        return liked, post.get("likes_count", 0) + pending_delta
+
+    def flush(self) -> int:
+        """
+        Escribe en la base de datos los cambios acumulados
+
+        Returns:
+            Número de likes cuyo estado cambió
+        """
+        with self._flush_lock:
+            return self._flush()
+
+    def _merge_back(self, batch: Dict[Tuple[str, str], Dict[str, bool]], deltas: Dict[str, int]) -> None:
+        """Devuelve al buffer un lote que no se pudo escribir (con self._lock adquirido)"""
+        for key, entry in batch.items():
+            # Un toque posterior ya está en _pending: conserva su estado y la base del lote
+            newer = self._pending.get(key)
+            self._pending[key] = {"base": entry["base"], "liked": newer["liked"] if newer else entry["liked"]}
+        for post_id, delta in deltas.items():
+            self._deltas[post_id] = self._deltas.get(post_id, 0) + delta
+        self._dirty_posts.update(post_id for post_id, _ in batch)
+
+    def _write_likes(self, changes: List[Tuple[Tuple[str, str], bool]]) -> Dict[str, int]:
+        """
+        Escribe los cambios de estado con operaciones condicionadas al estado en la base de datos
+
+        Cada operación solo modifica el like si su estado guardado es el contrario, así que el
+        incremento de cada post se calcula con lo que realmente cambió: un toggle ya aplicado
+        por otro worker (o por un volcado anterior reintentado) no se cuenta dos veces.
+
+        Returns:
+            post_id -> incremento de likes_count
+        """
+        now = datetime.utcnow()
+        like_ops: List[UpdateOne] = []
+        for (post_id, user_email), liked in changes:
+            # Con upsert, cada operación termina de una de tres formas distinguibles en el
+            # resultado: modifica el like (cuenta), inserta uno nuevo o choca con el índice único
+            state_filter = INACTIVE_LIKE_FILTER if liked else ACTIVE_LIKE_FILTER
+            like_ops.append(UpdateOne(
+                {"post_id": post_id, "user_email": user_email, **state_filter},
+                {"$set": {"active": liked, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+                upsert=True
+            ))
+
+        try:
+            upserted = set(mongo.db.likes.bulk_write(like_ops, ordered=False).upserted_ids)
+            duplicates = set()
+        except BulkWriteError as e:
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                raise
+            upserted = {item["index"] for item in e.details.get("upserted", [])}
+            duplicates = {error["index"] for error in e.details.get("writeErrors", [])}
+
+        post_deltas: Dict[str, int] = {}
+        for index, ((post_id, _), liked) in enumerate(changes):
+            if index in duplicates:
+                continue  # El like ya estaba en el estado final
+            if liked:
+                delta = 1  # Reactivado o insertado
+            elif index in upserted:
+                continue  # No había like activo: se insertó uno inactivo
+            else:
+                delta = -1
+            post_deltas[post_id] = post_deltas.get(post_id, 0) + delta
+        return post_deltas
+
+    def _apply_post_deltas(self, post_deltas: Dict[str, int]) -> None:
+        """Traslada los incrementos a likes_count de los posts y a las estadísticas de sus creadores"""
+        post_ops = [
+            UpdateOne({"_id": ObjectId(post_id)}, {"$inc": {"likes_count": delta}})
+            for post_id, delta in post_deltas.items() if delta
+        ]
+        if not post_ops:
+            return
+        mongo.db.posts.bulk_write(post_ops, ordered=False)
+
+        creator_deltas: Dict[str, Dict[str, int]] = {}
+        for post in mongo.db.posts.find(
+            {"_id": {"$in": [ObjectId(post_id) for post_id in post_deltas]}},
+            {"_id": 1, "creator_email": 1}
+        ):
+            deltas = creator_deltas.setdefault(post["creator_email"], {"likes_count": 0})
+            deltas["likes_count"] += post_deltas[str(post["_id"])]
+        increment_many_creator_stats(creator_deltas)
+
+    def _repair_dirty_posts(self) -> None:
+        """Recalcula los contadores que un volcado anterior dejó a medias"""
+        with self._lock:
+            dirty, self._dirty_posts = self._dirty_posts, set()
+        if not dirty:
+            return
+        try:
+            repair_likes_counts(dirty)
+        except Exception:
+            with self._lock:
+                self._dirty_posts.update(dirty)
+            raise
+
+    def _flush(self) -> int:
+        self._repair_dirty_posts()
+        with self._lock:
+            if not self._pending:
+                return 0
+            self._flushing, self._pending = self._pending, {}
+            self._flushing_deltas, self._deltas = self._deltas, {}
+            batch, batch_deltas = self._flushing, self._flushing_deltas
+
+        # Toggles que se compensan: nada que escribir
+        changes = [(key, entry["liked"]) for key, entry in batch.items() if entry["liked"] != entry["base"]]
+        try:
+            post_deltas = self._write_likes(changes) if changes else {}
+        except Exception:
+            # Parte del lote puede haberse escrito: se reintenta entero (las operaciones son
+            # condicionadas) y los contadores de sus posts se recalculan en el siguiente volcado
+            with self._lock:
+                self._merge_back(batch, batch_deltas)
+                self._flushing, self._flushing_deltas = {}, {}
+            raise
+
+        with self._lock:
+            self._flushing, self._flushing_deltas = {}, {}
+        try:
+            self._apply_post_deltas(post_deltas)
+        except Exception:
+            # Los likes ya están escritos: los contadores se recalculan en el siguiente volcado
+            with self._lock:
+                self._dirty_posts.update(post_deltas)
+            raise
+        return len(changes)
+
+    def shutdown(self) -> None:
+        """Volcado final al cerrar el worker"""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"[like_buffer] Error en el volcado final: {e}")
+
+
+like_buffer = LikeWriteBuffer()
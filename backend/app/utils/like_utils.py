@@ -1,21 +1,86 @@
-from typing import Dict, Any, List, Optional
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from bson import ObjectId
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
 from ..extensions import mongo
+from .dashboard_utils import invalidate_dashboard
+from .stats_utils import increment_creator_stats, increment_many_creator_stats
+
+# Tamaño de lote para las actualizaciones masivas de contadores
+LIKES_BATCH_SIZE: int = 1000
+
+# Filtro de likes vigentes (los documentos sin campo "active" son likes anteriores y cuentan)
+ACTIVE_LIKE_FILTER: Dict[str, Any] = {"active": {"$ne": False}}
+
+# Filtro de likes retirados
+INACTIVE_LIKE_FILTER: Dict[str, Any] = {"active": False}
+
+
+def toggle_like(post_object_id: ObjectId, user_email: str) -> Tuple[bool, Optional[int]]:
+    """
+    Alterna el like de un usuario sobre un post con dos operaciones atómicas
+
+    1. Upsert del documento único (post_id, user_email) invirtiendo su campo active
+    2. $inc del contador likes_count del post, devolviendo el valor resultante
+
+    Dos toques concurrentes del mismo usuario se serializan sobre el mismo documento
+    (el índice único impide duplicados), y cada uno aplica al contador el incremento
+    que corresponde a su propio resultado.
+
+    Returns:
+        Tupla (estado final del like, nuevo likes_count o None si el post no existe)
+    """
+    post_id = str(post_object_id)
+    now = datetime.utcnow()
+
+    like_doc = mongo.db.likes.find_one_and_update(
+        {"post_id": post_id, "user_email": user_email},
+        [{"$set": {
+            # Un documento recién insertado no tiene created_at (queda activo); uno anterior
+            # a este campo sí lo tiene y, sin "active", estaba activo (queda inactivo)
+            "active": {"$not": [{"$ifNull": ["$active", {"$eq": [{"$type": "$created_at"}, "date"]}]}]},
+            "created_at": {"$ifNull": ["$created_at", now]},
+            "updated_at": now
+        }}],
+        projection={"_id": 0, "active": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    liked: bool = like_doc["active"]
+
+    updated_post = mongo.db.posts.find_one_and_update(
+        {"_id": post_object_id},
+        {"$inc": {"likes_count": 1 if liked else -1}},
+        projection={"_id": 0, "likes_count": 1, "creator_email": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated_post is None:
+        # El post no existe: descartar el documento de like que se acaba de crear
+        mongo.db.likes.delete_one({"post_id": post_id, "user_email": user_email})
+        return False, None
+
+    increment_creator_stats(updated_post["creator_email"], likes_count=1 if liked else -1)
+    return liked, updated_post.get("likes_count", 0)
+
 
 def add_like_info_to_posts(posts: List[Dict[str, Any]], current_user_email: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Agrega información de likes a una lista de posts
-    
+
+    El conteo se toma del contador likes_count almacenado en cada post; la colección
+    de likes solo se consulta para saber a qué posts dio like el usuario actual.
+
     Args:
         posts: Lista de posts (diccionarios)
         current_user_email: Email del usuario actual (opcional)
-    
+
     Returns:
         Lista de posts con información de likes agregada
     """
     if not posts:
         return posts
-    
+
     # Si no se proporciona email del usuario, intentar obtenerlo del JWT
     if current_user_email is None:
         try:
@@ -23,31 +88,177 @@ def add_like_info_to_posts(posts: List[Dict[str, Any]], current_user_email: Opti
             current_user_email = get_jwt_identity()
         except:
             pass
-    
-    # Obtener todos los post_ids
-    post_ids = [str(post.get("_id", "")) for post in posts]
-    
-    # Obtener todos los likes de estos posts en una sola consulta
-    likes_data = list(mongo.db.likes.find({"post_id": {"$in": post_ids}}))
-    
-    # Organizar likes por post_id
-    likes_by_post = {}
+
+    # Obtener los likes del usuario actual sobre estos posts en una sola consulta
     user_likes = set()
-    
-    for like in likes_data:
-        post_id = like["post_id"]
-        if post_id not in likes_by_post:
-            likes_by_post[post_id] = 0
-        likes_by_post[post_id] += 1
-        
-        # Marcar si el usuario actual le dio like
-        if current_user_email and like["user_email"] == current_user_email:
-            user_likes.add(post_id)
-    
+    if current_user_email:
+        post_ids = [str(post.get("_id", "")) for post in posts]
+        user_likes = {
+            like["post_id"]
+            for like in mongo.db.likes.find(
+                {"post_id": {"$in": post_ids}, "user_email": current_user_email, **ACTIVE_LIKE_FILTER},
+                {"_id": 0, "post_id": 1}
+            )
+        }
+
     # Agregar información de likes a cada post
     for post in posts:
         post_id = str(post.get("_id", ""))
-        post["likes_count"] = likes_by_post.get(post_id, 0)
+        post["likes_count"] = post.get("likes_count", 0)
         post["user_liked"] = post_id in user_likes
-    
+
     return posts
+
+
+def release_user_likes_batch(user_email: str, limit: int = LIKES_BATCH_SIZE) -> int:
+    """
+    Elimina un lote de likes de un usuario descontando los activos de los contadores
+
+    Los likes se borran antes de descontarlos: si el proceso se interrumpe entre ambos
+    pasos, reconcile-likes / rebuild-creator-stats corrigen los contadores.
+
+    Returns:
+        Número de likes eliminados (0 cuando no quedan)
+    """
+    likes = list(mongo.db.likes.find({"user_email": user_email}, {"_id": 1, "post_id": 1, "active": 1}).limit(limit))
+    if not likes:
+        return 0
+    mongo.db.likes.delete_many({"_id": {"$in": [like["_id"] for like in likes]}})
+
+    post_ids: List[ObjectId] = [
+        ObjectId(like["post_id"])
+        for like in likes
+        if like.get("active") is not False and ObjectId.is_valid(like["post_id"])
+    ]
+    if post_ids:
+        mongo.db.posts.bulk_write(
+            [UpdateOne({"_id": post_id}, {"$inc": {"likes_count": -1}}) for post_id in post_ids],
+            ordered=False
+        )
+
+        # Descontar también los likes recibidos en las estadísticas de cada creador
+        creator_deltas: Dict[str, Dict[str, int]] = {}
+        for post in mongo.db.posts.find({"_id": {"$in": post_ids}}, {"_id": 0, "creator_email": 1}):
+            deltas = creator_deltas.setdefault(post["creator_email"], {"likes_count": 0})
+            deltas["likes_count"] -= 1
+        increment_many_creator_stats(creator_deltas)
+
+    return len(likes)
+
+
+def release_user_likes(user_email: str) -> int:
+    """
+    Elimina los likes de un usuario descontándolos de los contadores de cada post
+
+    Returns:
+        Número de likes eliminados
+    """
+    total = 0
+    while (removed := release_user_likes_batch(user_email)) > 0:
+        total += removed
+    return total
+
+
+def remove_duplicate_likes() -> int:
+    """
+    Elimina likes duplicados por (post_id, user_email), conservando el más antiguo
+
+    Necesario antes de crear el índice único en bases de datos con duplicados previos
+
+    Returns:
+        Número de documentos eliminados
+    """
+    pipeline = [
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {"post_id": "$post_id", "user_email": "$user_email"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    ops: List[DeleteOne] = []
+    for group in mongo.db.likes.aggregate(pipeline, allowDiskUse=True):
+        ops.extend(DeleteOne({"_id": like_id}) for like_id in group["ids"][1:])
+
+    removed = 0
+    for start in range(0, len(ops), LIKES_BATCH_SIZE):
+        removed += mongo.db.likes.bulk_write(ops[start:start + LIKES_BATCH_SIZE], ordered=False).deleted_count
+    return removed
+
+
+def reconcile_likes_counts(post_id: Optional[str] = None) -> int:
+    """
+    Recalcula likes_count de los posts a partir de la colección de likes
+
+    Args:
+        post_id: Reconciliar solo este post (opcional)
+
+    Returns:
+        Número de posts cuyo contador se corrigió
+    """
+    match: Dict[str, Any] = {"post_id": post_id, **ACTIVE_LIKE_FILTER} if post_id else dict(ACTIVE_LIKE_FILTER)
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$post_id", "count": {"$sum": 1}}}
+    ]
+    counts: Dict[str, int] = {item["_id"]: item["count"] for item in mongo.db.likes.aggregate(pipeline)}
+
+    posts_query: Dict[str, Any] = {"_id": ObjectId(post_id)} if post_id else {}
+    fixed = 0
+    ops: List[UpdateOne] = []
+    for post in mongo.db.posts.find(posts_query, {"_id": 1, "likes_count": 1}):
+        expected = counts.get(str(post["_id"]), 0)
+        if post.get("likes_count") != expected:
+            ops.append(UpdateOne({"_id": post["_id"]}, {"$set": {"likes_count": expected}}))
+            fixed += 1
+        if len(ops) >= LIKES_BATCH_SIZE:
+            mongo.db.posts.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        mongo.db.posts.bulk_write(ops, ordered=False)
+    return fixed
+
+
+def repair_likes_counts(post_ids: Iterable[str]) -> int:
+    """
+    Recalcula likes_count de unos posts desde la colección de likes, y likes_count de
+    sus creadores en creator_stats como suma de los contadores de sus posts
+
+    Corrige los contadores tras un volcado del buffer de likes que falló a medias. Los
+    incrementos que otros workers escriban mientras se ejecuta pueden perderse; en ese
+    caso reconcile-likes y rebuild-creator-stats los corrigen.
+
+    Returns:
+        Número de posts recalculados
+    """
+    object_ids = [ObjectId(post_id) for post_id in set(post_ids) if ObjectId.is_valid(post_id)]
+    if not object_ids:
+        return 0
+    counts: Dict[str, int] = {
+        item["_id"]: item["count"]
+        for item in mongo.db.likes.aggregate([
+            {"$match": {"post_id": {"$in": [str(post_id) for post_id in object_ids]}, **ACTIVE_LIKE_FILTER}},
+            {"$group": {"_id": "$post_id", "count": {"$sum": 1}}}
+        ])
+    }
+
+    ops: List[UpdateOne] = []
+    creator_emails = set()
+    for post in mongo.db.posts.find({"_id": {"$in": object_ids}}, {"_id": 1, "creator_email": 1}):
+        ops.append(UpdateOne({"_id": post["_id"]}, {"$set": {"likes_count": counts.get(str(post["_id"]), 0)}}))
+        creator_emails.add(post["creator_email"])
+    if ops:
+        mongo.db.posts.bulk_write(ops, ordered=False)
+
+    now = datetime.utcnow()
+    for item in mongo.db.posts.aggregate([
+        {"$match": {"creator_email": {"$in": list(creator_emails)}}},
+        {"$group": {"_id": "$creator_email", "likes": {"$sum": {"$ifNull": ["$likes_count", 0]}}}}
+    ]):
+        mongo.db.creator_stats.update_one(
+            {"creator_email": item["_id"]},
+            {"$set": {"likes_count": item["likes"], "updated_at": now}}
+        )
+    invalidate_dashboard(*creator_emails)
+    return len(ops)
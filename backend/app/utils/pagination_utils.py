@@ -0,0 +1,123 @@
+import base64
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from bson import ObjectId, json_util
+
+# Claves de ordenación estables (el _id desempata valores repetidos)
+POSTS_SORT: List[Tuple[str, int]] = [("created_at", -1), ("_id", -1)]
+USERNAME_SORT: List[Tuple[str, int]] = [("username", 1), ("_id", 1)]
+RECENT_SORT: List[Tuple[str, int]] = [("created_at", -1), ("_id", -1)]
+# Ranking de popularidad sobre creator_stats (creator_email es único y desempata)
+POPULAR_SORT: List[Tuple[str, int]] = [("followers_count", -1), ("creator_email", 1)]
+
+# Tipo de cada campo de las claves de ordenación: los valores de un cursor se validan con
+# él antes de usarse en el filtro (un cursor manipulado no puede inyectar operadores)
+CURSOR_FIELD_TYPES: Dict[str, type] = {
+    "created_at": datetime,
+    "_id": ObjectId,
+    "post_id": ObjectId,
+    "username": str,
+    "creator_email": str,
+    "followers_count": int
+}
+
+
+class InvalidCursorError(ValueError):
+    """El cursor de paginación recibido no es válido"""
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica los valores de la clave de ordenación del último elemento en un cursor opaco
+
+    Args:
+        values: Valores de la clave de ordenación, en el mismo orden que el sort
+
+    Returns:
+        Cursor en base64 url-safe
+    """
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decodifica un cursor generado por encode_cursor
+
+    Args:
+        cursor: Cursor opaco recibido del cliente
+        size: Número de valores que debe contener (campos de la clave de ordenación)
+
+    Raises:
+        InvalidCursorError: Si el cursor no se puede decodificar
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Cursor inválido")
+    return values
+
+
+def keyset_filter(sort: List[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+    """
+    Construye el filtro que selecciona los documentos posteriores a un cursor
+
+    Para un sort [(a, -1), (b, -1)] y valores [va, vb] genera
+    {"$or": [{a: {"$lt": va}}, {a: va, b: {"$lt": vb}}]}
+
+    Args:
+        sort: Clave de ordenación compuesta (campo, dirección)
+        values: Valores de la clave del último elemento devuelto
+    """
+    clauses: List[Dict[str, Any]] = []
+    for i, (field, direction) in enumerate(sort):
+        clause: Dict[str, Any] = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses} if len(clauses) > 1 else clauses[0]
+
+
+def validate_cursor_values(sort: List[Tuple[str, int]], values: List[Any]) -> None:
+    """
+    Comprueba que cada valor del cursor tiene el tipo de su campo de ordenación
+
+    Raises:
+        InvalidCursorError: Si algún valor no tiene el tipo esperado (p. ej. un documento
+            con operadores como {"$ne": null} o una expresión regular)
+    """
+    for (field, _), value in zip(sort, values):
+        expected = CURSOR_FIELD_TYPES[field]
+        # bool es subclase de int, pero nunca es un valor válido de la clave
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise InvalidCursorError("Cursor inválido")
+
+
+def apply_cursor(query: Dict[str, Any], sort: List[Tuple[str, int]], cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Añade a una consulta la condición de keyset de un cursor (si se proporcionó)
+
+    Raises:
+        InvalidCursorError: Si el cursor no es válido
+    """
+    if not cursor:
+        return query
+    values = decode_cursor(cursor, len(sort))
+    validate_cursor_values(sort, values)
+    return {"$and": [query, keyset_filter(sort, values)]}
+
+
+def next_cursor(items: List[Dict[str, Any]], sort: List[Tuple[str, int]], limit: int) -> Optional[str]:
+    """
+    Genera el cursor de la página siguiente a partir del último elemento de la página
+
+    Returns:
+        El cursor, o None si la página no está completa (no hay más resultados)
+    """
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([last.get(field) for field, _ in sort])
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+from flask import Flask
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Hay demasiadas operaciones de hash pendientes; el cliente debe reintentar más tarde"""
+
+
+class PasswordHasher:
+    """
+    Hash y verificación de contraseñas fuera de los hilos de las peticiones
+
+    Las operaciones de werkzeug (scrypt/pbkdf2) se ejecutan en un pool de procesos propio
+    de cada worker. Como mucho PASSWORD_HASH_MAX_PENDING operaciones pueden estar en cola o
+    en curso; si no hay hueco en PASSWORD_HASH_QUEUE_TIMEOUT segundos se lanza
+    PasswordHashingBusyError (las rutas responden 503) en lugar de acumular peticiones.
+    """
+
+    def __init__(self) -> None:
+        self.method: str = "scrypt"
+        self.workers: int = os.cpu_count() or 1
+        self.max_pending: int = self.workers * 4
+        self.queue_timeout: float = 0.5
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: Optional[Executor] = None
+        self._executor_pid: Optional[int] = None
+        self._method_prefix: Optional[str] = None
+
+    def init_app(self, app: Flask) -> None:
+        """Lee los parámetros de hash y el tamaño del pool"""
+        self.method = app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+        self.workers = int(app.config.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+        self.max_pending = max(int(app.config.get("PASSWORD_HASH_MAX_PENDING", max(self.workers, 1) * 4)), 1)
+        self.queue_timeout = float(app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 0.5))
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._method_prefix = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None  # Sin pool: hash en el propio hilo (desarrollo, tests)
+        # El pool se crea por proceso: tras el fork de gunicorn cada worker abre el suyo
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHashingBusyError("Demasiadas operaciones de contraseña en curso")
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return fn(*args)
+            return executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash_password(self, password: str) -> str:
+        """Genera el hash de una contraseña con los parámetros configurados"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify_password(self, password_hash: str, password: str) -> bool:
+        """Comprueba una contraseña contra su hash (con los parámetros con que se generó)"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Indica si el hash se generó con parámetros distintos de los configurados"""
+        if self._method_prefix is None:
+            # Forma completa del método (p. ej. "scrypt" -> "scrypt:32768:8:1")
+            self._method_prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return password_hash.split("$", 1)[0] != self._method_prefix
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,207 @@
+import logging
+import math
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import OperationFailure
+from ..extensions import mongo
+from .pagination_utils import POPULAR_SORT, InvalidCursorError, decode_cursor, encode_cursor
+from .stats_utils import get_creator_stats_map
+from .wallet_utils import WALLET_FIELDS_EXCLUDED
+
+logger = logging.getLogger(__name__)
+
+# Máximo de candidatos que aporta cada vía de búsqueda (prefijo y texto) antes de ordenar
+SEARCH_CANDIDATE_LIMIT: int = 200
+
+# Coincidencias por prefijo entre las que se eligen los candidatos más seguidos
+SEARCH_PREFIX_SCAN_LIMIT: int = 2000
+
+# Campos de búsqueda que no se devuelven en los listados de usuarios
+SEARCH_FIELDS_EXCLUDED: Dict[str, int] = {"username_lower": 0}
+
+# Relevancia asignada a las coincidencias por nombre de usuario
+EXACT_USERNAME_SCORE: float = 3.0
+PREFIX_USERNAME_SCORE: float = 2.0
+
+# Peso de la popularidad (log de seguidores) frente a la relevancia textual
+POPULARITY_WEIGHT: float = 0.25
+
+# Tamaño de lote para el rellenado de campos de búsqueda
+SEARCH_BATCH_SIZE: int = 1000
+
+
+def normalize_username(username: str) -> str:
+    """Forma normalizada (minúsculas) del nombre de usuario usada por el índice de prefijos"""
+    return username.strip().lower()
+
+
+def backfill_search_fields() -> int:
+    """
+    Rellena username_lower en los usuarios que no lo tienen o lo tienen desactualizado
+
+    Returns:
+        Número de usuarios actualizados
+    """
+    ops: List[UpdateOne] = []
+    updated = 0
+    for user in mongo.db.users.find({}, {"_id": 1, "username": 1, "username_lower": 1}):
+        expected = normalize_username(user.get("username", ""))
+        if user.get("username_lower") != expected:
+            ops.append(UpdateOne({"_id": user["_id"]}, {"$set": {"username_lower": expected}}))
+            updated += 1
+        if len(ops) >= SEARCH_BATCH_SIZE:
+            mongo.db.users.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        mongo.db.users.bulk_write(ops, ordered=False)
+    return updated
+
+
+def _prefix_query(term: str) -> Dict[str, Any]:
+    return {"role": "creator", "username_lower": {"$regex": f"^{re.escape(normalize_username(term))}"}}
+
+
+def _text_query(term: str) -> Dict[str, Any]:
+    return {"$text": {"$search": term}, "role": "creator"}
+
+
+def _prefix_candidates(term: str) -> List[Dict[str, Any]]:
+    """
+    Creadores cuyo username normalizado empieza por el término: la coincidencia exacta y
+    los SEARCH_CANDIDATE_LIMIT más seguidos entre las primeras SEARCH_PREFIX_SCAN_LIMIT
+    coincidencias (para términos cortos, no los primeros por orden alfabético)
+    """
+    prefix = normalize_username(term)
+    matches = list(mongo.db.users.find(
+        _prefix_query(term), {"_id": 0, "email": 1, "username_lower": 1}
+    ).sort("username_lower", ASCENDING).limit(SEARCH_PREFIX_SCAN_LIMIT))
+    emails = [match["email"] for match in matches]
+
+    chosen = {match["email"] for match in matches if match["username_lower"] == prefix}
+    chosen.update(
+        stats["creator_email"]
+        for stats in mongo.db.creator_stats.find(
+            {"creator_email": {"$in": emails}}, {"_id": 0, "creator_email": 1}
+        ).sort(POPULAR_SORT).limit(SEARCH_CANDIDATE_LIMIT)
+    )
+    # Creadores sin documento de estadísticas (cero seguidores), por orden alfabético
+    for email in emails:
+        if len(chosen) >= SEARCH_CANDIDATE_LIMIT:
+            break
+        chosen.add(email)
+
+    return list(mongo.db.users.find(
+        {"email": {"$in": list(chosen)}, "role": "creator"},
+        {"password": 0, **WALLET_FIELDS_EXCLUDED}
+    ))
+
+
+def _text_candidates(term: str) -> List[Dict[str, Any]]:
+    """
+    Creadores cuya bio coincide con el término, con su puntuación de texto
+
+    Sin el índice de texto bio_text (p. ej. antes de ejecutar build-search-index) la
+    búsqueda se limita al prefijo del username en lugar de fallar.
+    """
+    try:
+        return list(mongo.db.users.find(
+            _text_query(term),
+            {"password": 0, **WALLET_FIELDS_EXCLUDED, "text_score": {"$meta": "textScore"}}
+        ).sort([("text_score", {"$meta": "textScore"})]).limit(SEARCH_CANDIDATE_LIMIT))
+    except OperationFailure as e:
+        logger.warning(f"[search] Búsqueda en la bio no disponible (flask build-search-index): {e}")
+        return []
+
+
+def count_matches(term: str) -> int:
+    """Número de creadores que coinciden por prefijo de username o por texto de la bio"""
+    prefix_query = _prefix_query(term)
+    total = mongo.db.users.count_documents(prefix_query)
+    try:
+        text_query = _text_query(term)
+        # Los que coinciden por las dos vías se cuentan una sola vez
+        total += mongo.db.users.count_documents(text_query)
+        total -= mongo.db.users.count_documents({**text_query, "username_lower": prefix_query["username_lower"]})
+    except OperationFailure:
+        pass  # Sin índice de texto solo se busca por prefijo
+    return total
+
+
+def _sort_key(item: Dict[str, Any]) -> Tuple[float, str, str]:
+    return (-item["score"], item["username_lower"], str(item["_id"]))
+
+
+def search_creators(term: str, skip: int, limit: int,
+                    cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int, int, Optional[str]]:
+    """
+    Busca creadores por prefijo de username y por texto de la bio
+
+    Cada vía aporta como mucho SEARCH_CANDIDATE_LIMIT candidatos servidos por índice. Su
+    relevancia (coincidencia exacta/prefijo de username y textScore de la bio) se combina
+    con la popularidad del creador para ordenar el resultado; las páginas solo recorren
+    esos candidatos (los navegables), aunque el total cuente todas las coincidencias.
+
+    Args:
+        term: Término de búsqueda
+        skip: Número de resultados a saltar (paginación por offset, ignorado si hay cursor)
+        limit: Número máximo de resultados
+        cursor: Cursor opaco de la página anterior (opcional)
+
+    Returns:
+        Tupla (creadores de la página con followers_count y posts_count, total de
+        creadores que coinciden, número de resultados navegables por páginas, cursor de
+        la página siguiente o None)
+
+    Raises:
+        InvalidCursorError: Si el cursor no es válido
+    """
+    normalized = normalize_username(term)
+    candidates: Dict[Any, Dict[str, Any]] = {}
+
+    for user in _prefix_candidates(term):
+        user["username_lower"] = user.get("username_lower") or normalize_username(user.get("username", ""))
+        user["score"] = EXACT_USERNAME_SCORE if user["username_lower"] == normalized else PREFIX_USERNAME_SCORE
+        candidates[user["_id"]] = user
+
+    for user in _text_candidates(term):
+        text_score = user.pop("text_score", 0.0)
+        if user["_id"] in candidates:
+            candidates[user["_id"]]["score"] += text_score
+        else:
+            user["username_lower"] = user.get("username_lower") or normalize_username(user.get("username", ""))
+            user["score"] = text_score
+            candidates[user["_id"]] = user
+
+    # Mezclar relevancia y popularidad con las estadísticas precalculadas de los candidatos
+    stats_map = get_creator_stats_map(user["email"] for user in candidates.values())
+    for user in candidates.values():
+        stats = stats_map[user["email"]]
+        user["followers_count"] = stats["followers_count"]
+        user["posts_count"] = stats["posts_count"]
+        user["score"] = round(user["score"] + POPULARITY_WEIGHT * math.log1p(max(stats["followers_count"], 0)), 6)
+
+    ranked = sorted(candidates.values(), key=_sort_key)
+    # Con menos candidatos que el límite ninguna vía se cortó: los candidatos son todas las coincidencias
+    total = count_matches(term) if len(ranked) >= SEARCH_CANDIDATE_LIMIT else len(ranked)
+    available = len(ranked)
+
+    if cursor:
+        score, username_lower, last_id = decode_cursor(cursor, 3)
+        if not isinstance(score, (int, float)) or not isinstance(username_lower, str) or not isinstance(last_id, str):
+            raise InvalidCursorError("Cursor inválido")
+        after = (-score, username_lower, last_id)
+        ranked = [item for item in ranked if _sort_key(item) > after]
+    else:
+        ranked = ranked[skip:]
+
+    page = ranked[:limit]
+    page_cursor: Optional[str] = None
+    if len(ranked) > limit:
+        last = page[-1]
+        page_cursor = encode_cursor([last["score"], last["username_lower"], str(last["_id"])])
+
+    for user in page:
+        del user["score"]
+        del user["username_lower"]
+    return page, total, available, page_cursor
@@ -0,0 +1,182 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, Iterable, List
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from ..extensions import mongo
+from .dashboard_utils import invalidate_dashboard
+
+# Contadores mantenidos por creador en la colección creator_stats
+STATS_FIELDS: List[str] = [
+    "followers_count",
+    "posts_count",
+    "likes_count",
+    "donations_total",
+    "donations_count"
+]
+
+# Tamaño de lote para las escrituras masivas de estadísticas
+STATS_BATCH_SIZE: int = 1000
+
+
+def empty_stats() -> Dict[str, Any]:
+    """Estadísticas de un creador sin actividad"""
+    return {field: 0 for field in STATS_FIELDS}
+
+
+def _increment_update(deltas: Dict[str, int], now: datetime) -> Dict[str, Any]:
+    # Al crear el documento, los contadores que no se incrementan empiezan en cero
+    # para que todos los creadores tengan followers_count y entren en el orden "popular"
+    return {
+        "$inc": deltas,
+        "$set": {"updated_at": now},
+        "$setOnInsert": {field: 0 for field in STATS_FIELDS if field not in deltas}
+    }
+
+
+def init_creator_stats(creator_email: str) -> None:
+    """Crea el documento de estadísticas (a cero) de un creador recién registrado"""
+    mongo.db.creator_stats.update_one(
+        {"creator_email": creator_email},
+        {"$setOnInsert": {**empty_stats(), "updated_at": datetime.now()}},
+        upsert=True
+    )
+
+
+def increment_creator_stats(creator_email: str, **deltas: int) -> None:
+    """
+    Incrementa (o decrementa) contadores del documento de estadísticas de un creador
+
+    Ejemplo: increment_creator_stats(email, followers_count=1)
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    mongo.db.creator_stats.update_one(
+        {"creator_email": creator_email},
+        _increment_update(deltas, datetime.now()),
+        upsert=True
+    )
+    invalidate_dashboard(creator_email)
+
+
+def increment_followers_count(creator_email: str, delta: int) -> int:
+    """
+    Incrementa (o decrementa) followers_count de un creador
+
+    Returns:
+        followers_count resultante
+    """
+    stats = mongo.db.creator_stats.find_one_and_update(
+        {"creator_email": creator_email},
+        _increment_update({"followers_count": delta}, datetime.now()),
+        projection={"_id": 0, "followers_count": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    invalidate_dashboard(creator_email)
+    return stats["followers_count"]
+
+
+def increment_many_creator_stats(deltas_by_creator: Dict[str, Dict[str, int]]) -> None:
+    """Aplica incrementos de contadores a varios creadores con un bulk_write sin orden"""
+    now = datetime.now()
+    ops: List[UpdateOne] = []
+    for creator_email, deltas in deltas_by_creator.items():
+        deltas = {field: value for field, value in deltas.items() if value}
+        if deltas:
+            ops.append(UpdateOne(
+                {"creator_email": creator_email},
+                _increment_update(deltas, now),
+                upsert=True
+            ))
+    for start in range(0, len(ops), STATS_BATCH_SIZE):
+        mongo.db.creator_stats.bulk_write(ops[start:start + STATS_BATCH_SIZE], ordered=False)
+    invalidate_dashboard(*deltas_by_creator)
+
+
+def get_creator_stats(creator_email: str) -> Dict[str, Any]:
+    """Obtiene las estadísticas de un creador (ceros si todavía no tiene documento)"""
+    stats = empty_stats()
+    stored = mongo.db.creator_stats.find_one({"creator_email": creator_email}, {"_id": 0})
+    if stored:
+        stats.update({field: stored.get(field, 0) for field in STATS_FIELDS})
+    return stats
+
+
+def get_creator_stats_map(creator_emails: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene las estadísticas de varios creadores con una sola consulta $in
+
+    Returns:
+        Diccionario email -> estadísticas (con ceros para los creadores sin documento)
+    """
+    emails = list(set(creator_emails))
+    stats_map: Dict[str, Dict[str, Any]] = {email: empty_stats() for email in emails}
+    if not emails:
+        return stats_map
+
+    for stored in mongo.db.creator_stats.find({"creator_email": {"$in": emails}}, {"_id": 0}):
+        stats_map[stored["creator_email"]].update({field: stored.get(field, 0) for field in STATS_FIELDS})
+    return stats_map
+
+
+def delete_creator_stats(creator_email: str) -> None:
+    """Elimina el documento de estadísticas de un creador"""
+    mongo.db.creator_stats.delete_one({"creator_email": creator_email})
+    invalidate_dashboard(creator_email)
+
+
+def rebuild_creator_stats() -> int:
+    """
+    Recalcula desde cero las estadísticas de todos los creadores (incluidos los totales
+    de donaciones por moneda)
+
+    Returns:
+        Número de documentos de estadísticas escritos
+    """
+    stats: Dict[str, Dict[str, Any]] = defaultdict(empty_stats)
+
+    for item in mongo.db.followings.aggregate([
+        {"$group": {"_id": "$creator_email", "count": {"$sum": 1}}}
+    ], allowDiskUse=True):
+        stats[item["_id"]]["followers_count"] = item["count"]
+
+    for item in mongo.db.posts.aggregate([
+        {"$group": {
+            "_id": "$creator_email",
+            "count": {"$sum": 1},
+            "likes": {"$sum": {"$ifNull": ["$likes_count", 0]}}
+        }}
+    ], allowDiskUse=True):
+        stats[item["_id"]]["posts_count"] = item["count"]
+        stats[item["_id"]]["likes_count"] = item["likes"]
+
+    # Importación local: donation_utils depende de este módulo
+    from .donation_utils import aggregate_donation_totals
+    for email, totals in aggregate_donation_totals().items():
+        stats[email].update(totals)
+
+    creator_emails = [user["email"] for user in mongo.db.users.find({"role": "creator"}, {"_id": 0, "email": 1})]
+
+    now = datetime.now()
+    ops: List[ReplaceOne] = [
+        ReplaceOne(
+            {"creator_email": email},
+            {"creator_email": email, **stats[email], "updated_at": now},
+            upsert=True
+        )
+        for email in creator_emails
+    ]
+    for start in range(0, len(ops), STATS_BATCH_SIZE):
+        mongo.db.creator_stats.bulk_write(ops[start:start + STATS_BATCH_SIZE], ordered=False)
+
+    # Eliminar estadísticas de cuentas que ya no son creadores
+    current = set(creator_emails)
+    stale = [
+        item["creator_email"]
+        for item in mongo.db.creator_stats.find({}, {"_id": 0, "creator_email": 1})
+        if item["creator_email"] not in current
+    ]
+    for start in range(0, len(stale), STATS_BATCH_SIZE):
+        mongo.db.creator_stats.delete_many({"creator_email": {"$in": stale[start:start + STATS_BATCH_SIZE]}})
+    return len(ops)
@@ -0,0 +1,342 @@
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from bson import ObjectId
+from flask import Flask
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from ..extensions import mongo
+
+logger = logging.getLogger(__name__)
+
+# Días que se conservan las tareas terminadas (índice TTL sobre finished_at)
+TASK_RETENTION_SECONDS: int = 7 * 24 * 3600
+
+# Índices de la colección tasks (ver models/indexes.py)
+TASK_INDEXES: List[IndexModel] = [
+    # Reclamar la siguiente tarea disponible (pendiente o con el lease caducado)
+    IndexModel([("status", ASCENDING), ("available_at", ASCENDING)]),
+    IndexModel([("finished_at", ASCENDING)], expireAfterSeconds=TASK_RETENTION_SECONDS)
+]
+
+# Estados de una tarea
+TASK_PENDING, TASK_RUNNING, TASK_DONE, TASK_FAILED = "pending", "running", "done", "failed"
+
+# Modos de ejecución: hilo dentro de cada worker web, solo procesos "flask worker" o en línea
+TASK_QUEUE_MODES = ("thread", "worker", "inline")
+
+# Aplicación del proceso hijo cuando el worker usa un pool de procesos
+_process_app: Optional[Flask] = None
+
+
+def _process_init() -> None:
+    global _process_app
+    from .. import create_app
+    _process_app = create_app()
+
+
+def _process_run(name: str, payload: Dict[str, Any]) -> None:
+    with _process_app.app_context():
+        task_queue.handlers[name]["fn"](**payload)
+
+
+class TaskQueue:
+    """
+    Cola de tareas persistente en MongoDB (colección tasks)
+
+    Las rutas encolan efectos secundarios con enqueue() y responden sin esperarlos. Los
+    workers reclaman tareas con un lease que renuevan mientras se ejecutan: si un worker
+    cae, la tarea vuelve a estar disponible al caducar el lease. Los fallos se reintentan
+    con espera exponencial hasta max_attempts. Cada tipo de tarea puede limitar cuántas se
+    ejecutan a la vez entre todos los workers (max_concurrency, aproximado).
+
+    Las funciones de tarea se registran con el decorador task() y reciben el payload como
+    argumentos con nombre; deben ser idempotentes, porque una tarea puede ejecutarse más
+    de una vez (reintentos, leases caducados).
+    """
+
+    def __init__(self) -> None:
+        self.handlers: Dict[str, Dict[str, Any]] = {}
+        self.mode: str = "thread"
+        self.concurrency: int = 2
+        self.poll_interval: float = 1.0
+        self.lease_seconds: float = 60.0
+        self.backoff_base: float = 2.0
+        self.backoff_max: float = 300.0
+        self._app: Optional[Flask] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def worker_id(self) -> str:
+        """Identificador de este proceso en las tareas que tiene reclamadas"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def init_app(self, app: Flask) -> None:
+        """Lee la configuración de la cola y, en modo thread, arranca el hilo de cada worker web"""
+        self.mode = app.config.get("TASK_QUEUE_MODE", "thread")
+        if self.mode not in TASK_QUEUE_MODES:
+            raise ValueError(f"TASK_QUEUE_MODE no válido: {self.mode}. Use: {', '.join(TASK_QUEUE_MODES)}")
+        self.concurrency = max(int(app.config.get("TASK_WORKER_CONCURRENCY", 2)), 1)
+        self.poll_interval = float(app.config.get("TASK_POLL_SECONDS", 1.0))
+        self.lease_seconds = float(app.config.get("TASK_LEASE_SECONDS", 60.0))
+        self.backoff_base = float(app.config.get("TASK_RETRY_BACKOFF_SECONDS", 2.0))
+        self.backoff_max = float(app.config.get("TASK_RETRY_BACKOFF_MAX_SECONDS", 300.0))
+        self._app = app
+        if self.mode == "thread":
+            # El hilo se crea en la primera petición de cada worker (tras el fork de gunicorn)
+            app.before_request(self._ensure_started)
+
+    def task(self, name: str, max_concurrency: Optional[int] = None, max_attempts: int = 5) -> Callable:
+        """Registra una función como tipo de tarea"""
+        def decorator(fn: Callable) -> Callable:
+            self.handlers[name] = {"fn": fn, "max_concurrency": max_concurrency, "max_attempts": max_attempts}
+            return fn
+        return decorator
+
+    def enqueue(self, name: str, delay: float = 0, **payload: Any) -> Optional[ObjectId]:
+        """
+        Encola una tarea (en modo inline la ejecuta en el momento)
+
+        Args:
+            name: Tipo de tarea registrado con task()
+            delay: Segundos de espera antes de que la tarea esté disponible
+            payload: Argumentos de la tarea (valores serializables en BSON)
+
+        Returns:
+            _id de la tarea, o None en modo inline
+        """
+        if name not in self.handlers:
+            raise ValueError(f"Tarea no registrada: {name}")
+        if self.mode == "inline":
+            try:
+                self.handlers[name]["fn"](**payload)
+            except Exception as e:
+                logger.error(f"[task_queue] Error en la tarea {name}: {e}")
+            return None
+
+        now = datetime.now()
+        run_at = now + timedelta(seconds=delay)
+        task_id = mongo.db.tasks.insert_one({
+            "name": name,
+            "payload": payload,
+            "status": TASK_PENDING,
+            "attempts": 0,
+            "run_at": run_at,
+            "available_at": run_at,
+            "created_at": now
+        }).inserted_id
+        if self.mode == "thread":
+            self._ensure_started()
+            self._wake.set()
+        return task_id
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="task-queue", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_worker(self.concurrency)
+            except Exception as e:
+                logger.error(f"[task_queue] Error en el worker: {e}")
+                time.sleep(self.poll_interval)
+
+    def _saturated(self, names: List[str], now: datetime) -> List[str]:
+        """Tipos de tarea que ya tienen max_concurrency ejecuciones en curso"""
+        limits = {name: self.handlers[name]["max_concurrency"] for name in names if self.handlers[name]["max_concurrency"]}
+        if not limits:
+            return []
+        running = mongo.db.tasks.aggregate([
+            {"$match": {"status": TASK_RUNNING, "available_at": {"$gt": now}, "name": {"$in": list(limits)}}},
+            {"$group": {"_id": "$name", "count": {"$sum": 1}}}
+        ])
+        return [item["_id"] for item in running if item["count"] >= limits[item["_id"]]]
+
+    def _claim(self, names: List[str]) -> Optional[Dict[str, Any]]:
+        now = datetime.now()
+        saturated = set(self._saturated(names, now))
+        allowed = [name for name in names if name not in saturated]
+        if not allowed:
+            return None
+        return mongo.db.tasks.find_one_and_update(
+            {"status": {"$in": [TASK_PENDING, TASK_RUNNING]}, "available_at": {"$lte": now}, "name": {"$in": allowed}},
+            {
+                "$set": {
+                    "status": TASK_RUNNING,
+                    "available_at": now + timedelta(seconds=self.lease_seconds),
+                    "started_at": now,
+                    "worker": self.worker_id
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _execute(self, name: str, payload: Dict[str, Any]) -> None:
+        with self._app.app_context():
+            self.handlers[name]["fn"](**payload)
+
+    def _record(self, name: str, key: str, value: float = 1.0) -> None:
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(name, {
+                "done": 0, "failed": 0, "retried": 0,
+                "wait_total": 0.0, "wait_max": 0.0, "run_total": 0.0, "run_max": 0.0
+            })
+            metrics[key] += value
+            if key in ("wait_total", "run_total"):
+                max_key = key.replace("total", "max")
+                metrics[max_key] = max(metrics[max_key], value)
+
+    def _finish(self, task: Dict[str, Any], error: Optional[BaseException]) -> None:
+        now = datetime.now()
+        self._record(task["name"], "run_total", (now - task["started_at"]).total_seconds())
+        if error is None:
+            mongo.db.tasks.update_one(
+                {"_id": task["_id"], "worker": self.worker_id},
+                {"$set": {"status": TASK_DONE, "finished_at": now}}
+            )
+            self._record(task["name"], "done")
+            return
+
+        logger.error(f"[task_queue] Error en la tarea {task['name']} ({task['_id']}): {error}")
+        max_attempts = self.handlers.get(task["name"], {}).get("max_attempts", 1)
+        if task["attempts"] >= max_attempts:
+            update = {"status": TASK_FAILED, "failed_at": now, "error": str(error)}
+            self._record(task["name"], "failed")
+        else:
+            # Reintento con espera exponencial
+            backoff = min(self.backoff_base * 2 ** (task["attempts"] - 1), self.backoff_max)
+            update = {"status": TASK_PENDING, "available_at": now + timedelta(seconds=backoff), "error": str(error)}
+            self._record(task["name"], "retried")
+        mongo.db.tasks.update_one({"_id": task["_id"], "worker": self.worker_id}, {"$set": update})
+
+    def _renew_leases(self, tasks: Iterable[Dict[str, Any]]) -> None:
+        ids = [task["_id"] for task in tasks]
+        if ids:
+            mongo.db.tasks.update_many(
+                {"_id": {"$in": ids}, "status": TASK_RUNNING, "worker": self.worker_id},
+                {"$set": {"available_at": datetime.now() + timedelta(seconds=self.lease_seconds)}}
+            )
+
+    def _make_executor(self, concurrency: int, executor: str) -> Executor:
+        if executor == "process":
+            return ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_process_init
+            )
+        return ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="task")
+
+    def run_worker(
+        self,
+        concurrency: Optional[int] = None,
+        executor: str = "thread",
+        names: Optional[Iterable[str]] = None,
+        once: bool = False
+    ) -> int:
+        """
+        Reclama y ejecuta tareas con un pool de hilos o de procesos
+
+        Args:
+            concurrency: Tareas simultáneas como máximo (por defecto TASK_WORKER_CONCURRENCY)
+            executor: "thread" o "process" (para tareas que consumen CPU)
+            names: Limitar a estos tipos de tarea (por defecto, todos los registrados)
+            once: Terminar cuando no queden tareas disponibles
+
+        Returns:
+            Número de tareas procesadas
+        """
+        concurrency = concurrency or self.concurrency
+        names = list(names or self.handlers)
+        run = _process_run if executor == "process" else self._execute
+        pool = self._make_executor(concurrency, executor)
+        in_flight: Dict[Future, Dict[str, Any]] = {}
+        processed = 0
+        last_renewal = time.monotonic()
+        try:
+            while True:
+                for future in [future for future in in_flight if future.done()]:
+                    self._finish(in_flight.pop(future), future.exception())
+                    processed += 1
+
+                while len(in_flight) < concurrency:
+                    task = self._claim(names)
+                    if task is None:
+                        break
+                    self._record(task["name"], "wait_total", (task["started_at"] - task["run_at"]).total_seconds())
+                    in_flight[pool.submit(run, task["name"], task["payload"])] = task
+
+                # Renovar el lease de las tareas en curso antes de que caduque
+                if in_flight and time.monotonic() - last_renewal > self.lease_seconds / 3:
+                    self._renew_leases(in_flight.values())
+                    last_renewal = time.monotonic()
+
+                if in_flight:
+                    wait(list(in_flight), timeout=min(self.poll_interval, self.lease_seconds / 3), return_when=FIRST_COMPLETED)
+                elif once:
+                    return processed
+                else:
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+        finally:
+            pool.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Profundidad de la cola (todas las instancias) y latencias de las tareas de este proceso
+
+        wait_*: tiempo desde que la tarea está disponible hasta que empieza
+        run_*: duración de la ejecución
+        """
+        now = datetime.now()
+        depth: Dict[str, Dict[str, int]] = {TASK_PENDING: {}, TASK_RUNNING: {}, TASK_FAILED: {}}
+        for item in mongo.db.tasks.aggregate([
+            {"$match": {"status": {"$in": list(depth)}}},
+            {"$group": {"_id": {"status": "$status", "name": "$name"}, "count": {"$sum": 1}}}
+        ]):
+            depth[item["_id"]["status"]][item["_id"]["name"]] = item["count"]
+
+        oldest = mongo.db.tasks.find_one(
+            {"status": TASK_PENDING, "available_at": {"$lte": now}},
+            {"_id": 0, "run_at": 1},
+            sort=[("available_at", ASCENDING)]
+        )
+
+        local: Dict[str, Dict[str, Any]] = {}
+        with self._metrics_lock:
+            for name, metrics in self._metrics.items():
+                finished = metrics["done"] + metrics["failed"] + metrics["retried"]
+                local[name] = {
+                    "done": int(metrics["done"]),
+                    "failed": int(metrics["failed"]),
+                    "retried": int(metrics["retried"]),
+                    "wait_avg_ms": round(metrics["wait_total"] / finished * 1000, 3) if finished else 0.0,
+                    "wait_max_ms": round(metrics["wait_max"] * 1000, 3),
+                    "run_avg_ms": round(metrics["run_total"] / finished * 1000, 3) if finished else 0.0,
+                    "run_max_ms": round(metrics["run_max"] * 1000, 3)
+                }
+
+        return {
+            "mode": self.mode,
+            "depth": depth,
+            "oldest_pending_seconds": round((now - oldest["run_at"]).total_seconds(), 3) if oldest else 0.0,
+            "worker": local
+        }
+
+
+task_queue = TaskQueue()
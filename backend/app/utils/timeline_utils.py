@@ -0,0 +1,199 @@
+from typing import Dict, Any, List, Optional, Tuple
+from pymongo import UpdateOne
+from ..extensions import mongo
+from .pagination_utils import apply_cursor, keyset_filter
+
+# Número máximo de posts de un creador que se copian al timeline al seguirlo
+TIMELINE_BACKFILL_LIMIT: int = 200
+
+# Tamaño de lote para las escrituras masivas sobre timelines
+TIMELINE_BATCH_SIZE: int = 1000
+
+# Orden del timeline; equivale a POSTS_SORT, por lo que comparten cursor
+TIMELINE_SORT: List[Tuple[str, int]] = [("created_at", -1), ("post_id", -1)]
+
+
+def _timeline_entry_op(follower_email: str, post: Dict[str, Any]) -> UpdateOne:
+    """Operación idempotente que inserta un post en el timeline de un follower"""
+    return UpdateOne(
+        {"follower_email": follower_email, "post_id": post["_id"]},
+        {"$setOnInsert": {
+            "follower_email": follower_email,
+            "post_id": post["_id"],
+            "creator_email": post["creator_email"],
+            "created_at": post["created_at"]
+        }},
+        upsert=True
+    )
+
+
+def _flush(ops: List[UpdateOne]) -> None:
+    if ops:
+        mongo.db.timelines.bulk_write(ops, ordered=False)
+        ops.clear()
+
+
+def fan_out_post(post: Dict[str, Any]) -> int:
+    """
+    Distribuye un post recién creado a los timelines de los seguidores del creador
+
+    Args:
+        post: Documento del post ya insertado (debe incluir _id)
+
+    Returns:
+        Número de timelines actualizados
+    """
+    followers = mongo.db.followings.find(
+        {"creator_email": post["creator_email"]},
+        {"_id": 0, "follower_email": 1}
+    )
+
+    ops: List[UpdateOne] = []
+    total = 0
+    for item in followers:
+        ops.append(_timeline_entry_op(item["follower_email"], post))
+        total += 1
+        if len(ops) >= TIMELINE_BATCH_SIZE:
+            _flush(ops)
+    _flush(ops)
+    return total
+
+
+def fan_out_recent_posts(creator_email: str, limit: int = TIMELINE_BACKFILL_LIMIT) -> int:
+    """
+    Copia los posts más recientes de un creador a los timelines de todos sus seguidores
+    (al volver al modo push; las entradas que ya existían no se duplican)
+
+    Returns:
+        Número de entradas escritas
+    """
+    posts = list(mongo.db.posts.find(
+        {"creator_email": creator_email},
+        {"_id": 1, "creator_email": 1, "created_at": 1}
+    ).sort("created_at", -1).limit(limit))
+    if not posts:
+        return 0
+
+    ops: List[UpdateOne] = []
+    total = 0
+    for item in mongo.db.followings.find({"creator_email": creator_email}, {"_id": 0, "follower_email": 1}):
+        for post in posts:
+            ops.append(_timeline_entry_op(item["follower_email"], post))
+            total += 1
+            if len(ops) >= TIMELINE_BATCH_SIZE:
+                _flush(ops)
+    _flush(ops)
+    return total
+
+
+def backfill_timeline(follower_email: str, creator_email: str, limit: int = TIMELINE_BACKFILL_LIMIT) -> int:
+    """
+    Copia los posts más recientes de un creador al timeline de un follower (al seguirlo)
+
+    Returns:
+        Número de posts copiados
+    """
+    posts = mongo.db.posts.find(
+        {"creator_email": creator_email},
+        {"_id": 1, "creator_email": 1, "created_at": 1}
+    ).sort("created_at", -1).limit(limit)
+
+    ops: List[UpdateOne] = [_timeline_entry_op(follower_email, post) for post in posts]
+    total = len(ops)
+    _flush(ops)
+    return total
+
+
+def trim_timeline(follower_email: str, creator_email: str) -> int:
+    """Elimina del timeline de un follower los posts de un creador (al dejar de seguirlo)"""
+    result = mongo.db.timelines.delete_many({
+        "follower_email": follower_email,
+        "creator_email": creator_email
+    })
+    return result.deleted_count
+
+
+def remove_post_from_timelines(post_id: Any) -> int:
+    """Elimina un post de todos los timelines en los que aparece"""
+    return mongo.db.timelines.delete_many({"post_id": post_id}).deleted_count
+
+
+def remove_creator_from_timelines(creator_email: str) -> int:
+    """Elimina de todos los timelines los posts de un creador"""
+    return mongo.db.timelines.delete_many({"creator_email": creator_email}).deleted_count
+
+
+def clear_timeline(follower_email: str) -> int:
+    """Elimina el timeline completo de un follower"""
+    return mongo.db.timelines.delete_many({"follower_email": follower_email}).deleted_count
+
+
+def rebuild_timeline(follower_email: str, limit: int = TIMELINE_BACKFILL_LIMIT) -> int:
+    """
+    Reconstruye desde cero el timeline de un follower a partir de sus seguimientos
+
+    Returns:
+        Número de entradas del timeline reconstruido
+    """
+    clear_timeline(follower_email)
+
+    following_data = mongo.db.followings.find(
+        {"follower_email": follower_email},
+        {"_id": 0, "creator_email": 1}
+    )
+    return sum(
+        backfill_timeline(follower_email, item["creator_email"], limit)
+        for item in following_data
+    )
+
+
+def read_timeline(
+    follower_email: str,
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Lee una página del timeline de un follower
+
+    Args:
+        follower_email: Email del follower
+        skip: Número de entradas a saltar (se ignora si hay cursor)
+        limit: Tamaño de la página
+        cursor: Cursor opaco de keyset (created_at, _id) de la página anterior
+
+    Las entradas de posts borrados que aún no se limpiaron se omiten y se siguen leyendo
+    entradas tras la última leída hasta completar la página, de modo que una página corta
+    solo se devuelve al final del timeline.
+
+    Returns:
+        Tupla (posts de la página ordenados por fecha desc, total de entradas del timeline)
+    """
+    query = {"follower_email": follower_email}
+    total = mongo.db.timelines.count_documents(query)
+
+    posts: List[Dict[str, Any]] = []
+    entries_query = apply_cursor(query, TIMELINE_SORT, cursor)
+    first_batch = True
+    while len(posts) < limit:
+        wanted = limit - len(posts)
+        entries_cursor = mongo.db.timelines.find(
+            entries_query, {"_id": 0, "post_id": 1, "created_at": 1}
+        ).sort(TIMELINE_SORT)
+        if first_batch and not cursor:
+            entries_cursor = entries_cursor.skip(skip)
+        entries = list(entries_cursor.limit(wanted))
+        if not entries:
+            break
+
+        post_ids = [entry["post_id"] for entry in entries]
+        posts_by_id = {post["_id"]: post for post in mongo.db.posts.find({"_id": {"$in": post_ids}})}
+        # Mantener el orden del timeline
+        posts.extend(posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id)
+
+        if len(entries) < wanted:
+            break  # Fin del timeline
+        last = entries[-1]
+        entries_query = {"$and": [query, keyset_filter(TIMELINE_SORT, [last["created_at"], last["post_id"]])]}
+        first_batch = False
+    return posts, total
@@ -0,0 +1,143 @@
+import copy
+from typing import Dict, Any, Optional
+from flask import Flask, current_app, g, has_request_context
+from ..extensions import mongo
+from .cache_utils import TTLCache
+
+# Documentos de usuario recientes de este worker, por ("email", x) y ("username", x).
+# Otros workers no ven las invalidaciones de este, así que el TTL acota cuánto
+# tiempo pueden servir un documento desactualizado. Por eso solo sirve para mostrar
+# datos de perfil: las comprobaciones de contraseña y de rol usan find_account_by_*.
+user_cache = TTLCache()
+
+# Campos que nunca se guardan en la caché ni en el memo de la petición
+UNCACHED_FIELDS = ("password",)
+
+# Rol de las cuentas eliminadas cuyo borrado en cascada aún no ha terminado
+# (el documento se conserva como tombstone hasta el último paso del borrado)
+DELETED_ROLE: str = "deleted"
+
+# Aciertos de la memoización por petición (no llegan a consultar user_cache)
+_request_hits: Dict[str, int] = {"hits": 0}
+
+
+def init_user_cache(app: Flask) -> None:
+    """Configura el tamaño y la caducidad de la caché de usuarios"""
+    user_cache.configure(
+        max_size=int(app.config.get("USER_CACHE_MAX_SIZE", 10000)),
+        ttl_seconds=float(app.config.get("USER_CACHE_TTL_SECONDS", 30))
+    )
+
+
+def _request_memo() -> Optional[Dict[Any, Dict[str, Any]]]:
+    if not has_request_context():
+        return None
+    if "user_memo" not in g:
+        g.user_memo = {}
+    return g.user_memo
+
+
+def _remember(user: Dict[str, Any]) -> Dict[str, Any]:
+    user = {field: value for field, value in user.items() if field not in UNCACHED_FIELDS}
+    keys = [("email", user.get("email")), ("username", user.get("username"))]
+    memo = _request_memo()
+    for key in keys:
+        if key[1] is None:
+            continue
+        user_cache.set(key, user)
+        if memo is not None:
+            memo[key] = user
+    return user
+
+
+def _find_user(field: str, value: str) -> Optional[Dict[str, Any]]:
+    key = (field, value)
+    memo = _request_memo()
+    if memo is not None and key in memo:
+        _request_hits["hits"] += 1
+        return copy.deepcopy(memo[key])
+
+    user = user_cache.get(key)
+    if user is None:
+        try:
+            user = mongo.db.users.find_one({field: value})
+        except Exception as e:
+            current_app.logger.error(f"[find_user] Error: {e}")
+            return None
+        if user is None:
+            return None
+        user = _remember(user)
+    elif memo is not None:
+        memo[key] = user
+
+    # Copia para que quien llama pueda modificar el diccionario sin tocar la caché
+    return copy.deepcopy(user)
+
+
+def find_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """
+    Busca un usuario por su correo electrónico (memo de la petición, caché y base de datos)
+
+    Devuelve los datos de perfil sin la contraseña y pueden estar desactualizados hasta
+    USER_CACHE_TTL_SECONDS: no usar para comprobar credenciales ni roles.
+
+    Args:
+        email: El correo electrónico a buscar
+
+    Returns:
+        Un diccionario con los datos del usuario si se encuentra, None en caso contrario
+    """
+    return _find_user("email", email)
+
+
+def find_by_username(username: str) -> Optional[Dict[str, Any]]:
+    """
+    Busca un usuario por su nombre de usuario (memo de la petición, caché y base de datos)
+
+    Mismas limitaciones que find_by_email.
+
+    Returns:
+        Un diccionario con los datos del usuario si se encuentra, None en caso contrario
+    """
+    return _find_user("username", username)
+
+
+def find_account_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """
+    Documento completo de un usuario (con contraseña y rol) leído sin caché del primario
+
+    Para iniciar sesión, cambiar la contraseña, eliminar la cuenta y comprobar roles:
+    un cambio hecho en otro worker se ve inmediatamente.
+    """
+    return mongo.db.users.find_one({"email": email})
+
+
+def find_account_by_username(username: str) -> Optional[Dict[str, Any]]:
+    """Como find_account_by_email, por nombre de usuario"""
+    return mongo.db.users.find_one({"username": username})
+
+
+def invalidate_user(email: str, *usernames: str) -> None:
+    """
+    Descarta un usuario de la caché y del memo de la petición
+
+    Llamar tras modificar o eliminar su documento. Se pueden indicar usernames
+    adicionales (p. ej. el anterior a un cambio de nombre).
+    """
+    keys = [("email", email)] + [("username", username) for username in usernames if username]
+    memo = _request_memo()
+    cached = user_cache.peek(("email", email)) or (memo or {}).get(("email", email))
+    if cached and cached.get("username"):
+        keys.append(("username", cached["username"]))
+
+    for key in keys:
+        user_cache.delete(key)
+        if memo is not None:
+            memo.pop(key, None)
+
+
+def user_cache_stats() -> Dict[str, Any]:
+    """Contadores de la caché de usuarios y de la memoización por petición"""
+    stats = user_cache.stats()
+    stats["request_memo_hits"] = _request_hits["hits"]
+    return stats
@@ -0,0 +1,331 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from flask import Flask
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from ..extensions import mongo
+from ..models.creator_wallet import CreatorWallet
+from .user_utils import DELETED_ROLE, invalidate_user
+
+# Formatos de almacenamiento de las wallets (WALLET_STORAGE)
+COLLECTION, EMBEDDED = "collection", "embedded"
+WALLET_STORAGE_MODES = (COLLECTION, EMBEDDED)
+
+# Campos de las wallets embebidas en el documento del usuario: los listados de
+# creadores los excluyen para no servirlas en cada página
+WALLET_FIELDS_EXCLUDED: Dict[str, int] = {"wallets": 0, "default_wallet": 0}
+
+# Tamaño de lote de la migración entre formatos
+MIGRATION_BATCH_SIZE: int = 500
+
+
+def _public_wallet(wallet: Dict[str, Any], default_currency: Optional[str]) -> Dict[str, Any]:
+    """Wallet en el formato de las respuestas (igual en los dos formatos de almacenamiento)"""
+    public = {
+        "currency_type": wallet["currency_type"],
+        "wallet_address": wallet["wallet_address"],
+        "created_at": wallet.get("created_at")
+    }
+    if wallet.get("updated_at"):
+        public["updated_at"] = wallet["updated_at"]
+    public["is_default"] = wallet["currency_type"] == default_currency
+    return public
+
+
+def _default_currency(wallets: List[Dict[str, Any]], default_currency: Optional[str]) -> Optional[str]:
+    # Sin predeterminada (o si apunta a una wallet borrada) se usa la primera
+    currencies = [wallet["currency_type"] for wallet in wallets]
+    if default_currency in currencies:
+        return default_currency
+    return currencies[0] if currencies else None
+
+
+class WalletStore:
+    """
+    Acceso a las wallets de los creadores en cualquiera de los dos formatos
+
+    - "collection": un documento por (creator_email, currency_type) en creator_wallets,
+      con is_default en cada uno (cambiar la predeterminada son dos escrituras).
+    - "embedded": array wallets y puntero default_wallet en el documento del usuario.
+      La información de donación es una sola lectura y cada cambio una sola escritura
+      atómica sobre un documento.
+
+    Las rutas usan siempre este objeto; migrate-wallets copia los datos de un formato
+    al otro antes de cambiar WALLET_STORAGE.
+    """
+
+    def __init__(self) -> None:
+        self.storage: str = COLLECTION
+
+    def init_app(self, app: Flask) -> None:
+        """Lee el formato de almacenamiento configurado"""
+        storage = app.config.get("WALLET_STORAGE", COLLECTION)
+        if storage not in WALLET_STORAGE_MODES:
+            raise ValueError(f"WALLET_STORAGE no válido: {storage}. Use: {', '.join(WALLET_STORAGE_MODES)}")
+        self.storage = storage
+
+    @property
+    def embedded(self) -> bool:
+        return self.storage == EMBEDDED
+
+    def list(self, creator_email: str) -> List[Dict[str, Any]]:
+        """Wallets de un creador, con is_default en la predeterminada"""
+        if self.embedded:
+            user = mongo.db.users.find_one({"email": creator_email}, {"_id": 0, "wallets": 1, "default_wallet": 1}) or {}
+            wallets = user.get("wallets", [])
+            default_currency = user.get("default_wallet")
+        else:
+            wallets = list(mongo.db.creator_wallets.find({"creator_email": creator_email}, {"_id": 0}))
+            default_currency = next((wallet["currency_type"] for wallet in wallets if wallet.get("is_default")), None)
+        default_currency = _default_currency(wallets, default_currency)
+        return [_public_wallet(wallet, default_currency) for wallet in wallets]
+
+    def get(self, creator_email: str, currency_type: str) -> Optional[Dict[str, Any]]:
+        """Wallet de un creador para una moneda, o None si no la tiene"""
+        return next((wallet for wallet in self.list(creator_email) if wallet["currency_type"] == currency_type), None)
+
+    def add(self, wallet: CreatorWallet) -> bool:
+        """
+        Añade una wallet
+
+        Returns:
+            False si el creador ya tiene una wallet para esa moneda
+        """
+        if self.embedded:
+            # El filtro comprueba que no exista y el $push la añade en la misma operación
+            result = mongo.db.users.update_one(
+                {"email": wallet.creator_email, "wallets.currency_type": {"$ne": wallet.currency_type}},
+                {"$push": {"wallets": {
+                    "currency_type": wallet.currency_type,
+                    "wallet_address": wallet.wallet_address,
+                    "created_at": wallet.created_at
+                }}}
+            )
+            invalidate_user(wallet.creator_email)
+            return result.modified_count > 0
+
+        if mongo.db.creator_wallets.find_one(
+            {"creator_email": wallet.creator_email, "currency_type": wallet.currency_type}, {"_id": 1}
+        ):
+            return False
+        try:
+            mongo.db.creator_wallets.insert_one(wallet.to_dict())
+        except DuplicateKeyError:
+            # Otra petición la ha creado entre la comprobación y la inserción
+            return False
+        return True
+
+    def update_address(self, creator_email: str, currency_type: str, wallet_address: str) -> Optional[bool]:
+        """
+        Cambia la dirección de una wallet
+
+        Returns:
+            None si no existe la wallet; si existe, si la dirección ha cambiado
+        """
+        now = datetime.now()
+        if self.embedded:
+            result = mongo.db.users.update_one(
+                {"email": creator_email, "wallets.currency_type": currency_type},
+                {"$set": {"wallets.$.wallet_address": wallet_address, "wallets.$.updated_at": now}}
+            )
+            invalidate_user(creator_email)
+        else:
+            result = mongo.db.creator_wallets.update_one(
+                {"creator_email": creator_email, "currency_type": currency_type},
+                {"$set": {"wallet_address": wallet_address, "updated_at": now}}
+            )
+        if result.matched_count == 0:
+            return None
+        return result.modified_count > 0
+
+    def delete(self, creator_email: str, currency_type: str) -> bool:
+        """Elimina una wallet; False si no existía"""
+        if not self.embedded:
+            return mongo.db.creator_wallets.delete_one(
+                {"creator_email": creator_email, "currency_type": currency_type}
+            ).deleted_count > 0
+
+        # Si era la predeterminada, el puntero se quita en la misma escritura
+        pull = {"$pull": {"wallets": {"currency_type": currency_type}}}
+        result = mongo.db.users.update_one(
+            {"email": creator_email, "default_wallet": currency_type, "wallets.currency_type": currency_type},
+            {**pull, "$unset": {"default_wallet": ""}}
+        )
+        if result.matched_count == 0:
+            result = mongo.db.users.update_one(
+                {"email": creator_email, "wallets.currency_type": currency_type}, pull
+            )
+        invalidate_user(creator_email)
+        return result.modified_count > 0
+
+    def set_default(self, creator_email: str, currency_type: str) -> bool:
+        """Marca una wallet como predeterminada; False si no existe"""
+        if self.embedded:
+            # Una sola escritura atómica: solo cambia el puntero si la wallet existe
+            result = mongo.db.users.update_one(
+                {"email": creator_email, "wallets.currency_type": currency_type},
+                {"$set": {"default_wallet": currency_type}}
+            )
+            invalidate_user(creator_email)
+            return result.matched_count > 0
+
+        if not mongo.db.creator_wallets.find_one(
+            {"creator_email": creator_email, "currency_type": currency_type}, {"_id": 1}
+        ):
+            return False
+        mongo.db.creator_wallets.update_many(
+            {"creator_email": creator_email, "currency_type": {"$ne": currency_type}},
+            {"$set": {"is_default": False}}
+        )
+        mongo.db.creator_wallets.update_one(
+            {"creator_email": creator_email, "currency_type": currency_type},
+            {"$set": {"is_default": True}}
+        )
+        return True
+
+    def donation_info(self, username: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Perfil público de un creador y sus wallets (una sola lectura en formato embedded)
+
+        Returns:
+            (creador sin email ni wallets, wallets) o None si no existe el creador
+        """
+        creator = mongo.db.users.find_one(
+            {"username": username, "role": "creator"},
+            {"_id": 0, "password": 0, "username_lower": 0}  # Excluir campos sensibles e internos
+        )
+        if not creator:
+            return None
+
+        if self.embedded:
+            wallets = creator.pop("wallets", [])
+            default_currency = _default_currency(wallets, creator.pop("default_wallet", None))
+            wallets = [_public_wallet(wallet, default_currency) for wallet in wallets]
+        else:
+            wallets = self.list(creator["email"])
+        # No exponer el email del creador
+        creator.pop("email", None)
+        return creator, wallets
+
+    def resolve_addresses(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """
+        Creador dueño de cada (currency_type, wallet_address)
+
+        Las wallets de cuentas eliminadas (tombstone) no se resuelven aunque la cascada
+        todavía no las haya borrado.
+
+        Returns:
+            Diccionario (currency_type, wallet_address) -> creator_email (solo los encontrados)
+        """
+        pairs = set(pairs)
+        addresses = list({address for _, address in pairs})
+        if not addresses:
+            return {}
+        if self.embedded:
+            owners = {}
+            for user in mongo.db.users.find(
+                {"wallets.wallet_address": {"$in": addresses}, "role": {"$ne": DELETED_ROLE}},
+                {"_id": 0, "email": 1, "wallets": 1}
+            ):
+                for wallet in user.get("wallets", []):
+                    owners[(wallet["currency_type"], wallet["wallet_address"])] = user["email"]
+        else:
+            owners = {
+                (wallet["currency_type"], wallet["wallet_address"]): wallet["creator_email"]
+                for wallet in mongo.db.creator_wallets.find(
+                    {"wallet_address": {"$in": addresses}},
+                    {"_id": 0, "currency_type": 1, "wallet_address": 1, "creator_email": 1}
+                )
+            }
+            if owners:
+                deleted = {
+                    user["email"]
+                    for user in mongo.db.users.find(
+                        {"email": {"$in": list(set(owners.values()))}, "role": DELETED_ROLE}, {"_id": 0, "email": 1}
+                    )
+                }
+                owners = {pair: email for pair, email in owners.items() if email not in deleted}
+        return {pair: owners[pair] for pair in pairs if pair in owners}
+
+
+wallet_store = WalletStore()
+
+
+def migrate_wallets(target: str) -> int:
+    """
+    Copia las wallets al formato target ("embedded" o "collection")
+
+    Es idempotente: cada creador se reescribe completo en el destino (también los que se
+    quedaron sin wallets), así que se puede repetir tras una interrupción. Los datos de
+    origen no se borran (permiten volver al formato anterior); cambiar WALLET_STORAGE
+    después de migrar.
+
+    Returns:
+        Número de creadores migrados
+    """
+    if target not in WALLET_STORAGE_MODES:
+        raise ValueError(f"Formato no válido: {target}. Use: {', '.join(WALLET_STORAGE_MODES)}")
+    migrated = 0
+
+    if target == EMBEDDED:
+        ops: List[Any] = []
+        creator_emails = set()
+        for group in mongo.db.creator_wallets.aggregate([
+            {"$sort": {"creator_email": 1, "created_at": 1}},
+            {"$group": {"_id": "$creator_email", "wallets": {"$push": "$$ROOT"}}}
+        ], allowDiskUse=True):
+            wallets = group["wallets"]
+            embedded = [
+                {key: wallet[key] for key in ("currency_type", "wallet_address", "created_at", "updated_at") if key in wallet}
+                for wallet in wallets
+            ]
+            update: Dict[str, Any] = {"$set": {"wallets": embedded}}
+            default_currency = next((wallet["currency_type"] for wallet in wallets if wallet.get("is_default")), None)
+            if default_currency:
+                update["$set"]["default_wallet"] = default_currency
+            else:
+                update["$unset"] = {"default_wallet": ""}
+            ops.append(UpdateOne({"email": group["_id"]}, update))
+            creator_emails.add(group["_id"])
+            if len(ops) >= MIGRATION_BATCH_SIZE:
+                migrated += len(ops)
+                mongo.db.users.bulk_write(ops, ordered=False)
+                ops = []
+        # Creadores cuyas wallets se borraron después de una migración anterior
+        for user in mongo.db.users.find({"wallets": {"$exists": True}}, {"_id": 0, "email": 1}):
+            if user["email"] not in creator_emails:
+                ops.append(UpdateOne({"email": user["email"]}, {"$set": {"wallets": []}, "$unset": {"default_wallet": ""}}))
+                if len(ops) >= MIGRATION_BATCH_SIZE:
+                    migrated += len(ops)
+                    mongo.db.users.bulk_write(ops, ordered=False)
+                    ops = []
+        if ops:
+            migrated += len(ops)
+            mongo.db.users.bulk_write(ops, ordered=False)
+        return migrated
+
+    ops = []
+    # También los usuarios con el array vacío: sus filas de una migración anterior se borran
+    for user in mongo.db.users.find(
+        {"wallets": {"$exists": True}}, {"_id": 0, "email": 1, "wallets": 1, "default_wallet": 1}
+    ):
+        wallets = user.get("wallets") or []
+        default_currency = user.get("default_wallet")
+        # Las wallets borradas después de una migración anterior también se borran del destino
+        ops.append(DeleteMany({
+            "creator_email": user["email"],
+            "currency_type": {"$nin": [wallet["currency_type"] for wallet in wallets]}
+        }))
+        for wallet in wallets:
+            ops.append(ReplaceOne(
+                {"creator_email": user["email"], "currency_type": wallet["currency_type"]},
+                {**wallet, "creator_email": user["email"], "is_default": wallet["currency_type"] == default_currency},
+                upsert=True
+            ))
+        migrated += 1
+        if len(ops) >= MIGRATION_BATCH_SIZE:
+            mongo.db.creator_wallets.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        mongo.db.creator_wallets.bulk_write(ops, ordered=False)
+    return migrated
@@ -0,0 +1,76 @@
+"""
+Autocompletado de creadores (trie en memoria): carga, memoria y latencia por prefijo
+
+Genera creadores con nombres aleatorios y seguidores con distribución de Pareto, carga el
+trie desde MongoDB midiendo la memoria que ocupa (tracemalloc) y mide la latencia de
+suggest por longitud del prefijo y la de las actualizaciones incrementales.
+
+    python -m bench.autocomplete --creators 1000000 --queries 20000
+"""
+import random
+import string
+import time
+import tracemalloc
+from .common import bench_app, parse_args, report, timed
+
+INSERT_BATCH_SIZE = 10000
+
+
+def _arguments(parser) -> None:
+    parser.add_argument("--creators", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000)
+
+
+def main() -> None:
+    args = parse_args(__doc__, _arguments)
+    app = bench_app(args)
+
+    from app.extensions import mongo
+    from app.utils.autocomplete_utils import CreatorAutocomplete
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        usernames = set()
+        while len(usernames) < args.creators:
+            usernames.add("".join(rng.choices(string.ascii_lowercase + string.digits, k=rng.randint(5, 16))))
+        names = sorted(usernames)
+        for start in range(0, len(names), INSERT_BATCH_SIZE):
+            batch = names[start:start + INSERT_BATCH_SIZE]
+            mongo.db.users.insert_many([
+                {"email": f"{username}@bench.local", "username": username, "role": "creator"} for username in batch
+            ])
+            mongo.db.creator_stats.insert_many([
+                {"creator_email": f"{username}@bench.local", "followers_count": int(rng.paretovariate(1.2))}
+                for username in batch
+            ])
+
+        # Trie sin aplicación registrada: se consulta de forma síncrona
+        autocomplete = CreatorAutocomplete()
+        tracemalloc.start()
+        started = time.perf_counter()
+        loaded = autocomplete.load()
+        load_seconds = time.perf_counter() - started
+        trie_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"carga: {loaded} creadores en {load_seconds:.1f} s, "
+              f"{trie_bytes / 2 ** 20:.1f} MiB ({trie_bytes / max(1, loaded):.0f} bytes por creador)")
+
+        for length in (1, 2, 3, 5):
+            samples = timed(lambda: autocomplete.suggest(rng.choice(names)[:length]), args.queries)
+            report(f"suggest: prefijo de {length}", samples)
+
+        updates = max(1, args.queries // 10)
+        report("add_creator", timed(
+            lambda: autocomplete.add_creator(f"new{rng.random()}@bench.local", f"new{rng.randrange(10 ** 9)}"), updates
+        ))
+        report("rename_creator", timed(
+            lambda: autocomplete.rename_creator(f"{rng.choice(names)}@bench.local", f"renamed{rng.randrange(10 ** 9)}"),
+            updates
+        ))
+        report("remove_creator", timed(
+            lambda: autocomplete.remove_creator(f"{rng.choice(names)}@bench.local"), updates
+        ))
+
+
+if __name__ == "__main__":
+    main()
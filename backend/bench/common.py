@@ -0,0 +1,83 @@
+"""
+Utilidades comunes de los benchmarks
+
+Los benchmarks se ejecutan desde backend/ como módulos (python -m bench.<nombre>) contra
+la base de datos de MONGO_BENCH_URI, que se vacía al empezar. Con --mongomock se
+ejecutan contra mongomock para comprobar que funcionan; sus tiempos no son representativos.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+from flask import Flask
+
+DEFAULT_BENCH_URI = "mongodb://localhost:27017/donacrypto_bench"
+
+
+def parse_args(description: str, arguments: Optional[Callable[[argparse.ArgumentParser], None]] = None) -> argparse.Namespace:
+    """Argumentos comunes (--mongomock, --seed) más los propios de cada benchmark"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--mongomock", action="store_true", help="Usar mongomock en lugar de MONGO_BENCH_URI")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos generados")
+    if arguments:
+        arguments(parser)
+    return parser.parse_args()
+
+
+def bench_app(args: argparse.Namespace, **config: Any) -> Flask:
+    """
+    Crea la aplicación sobre una base de datos de benchmark vacía y con los índices creados
+
+    Args:
+        args: Argumentos de parse_args
+        config: Valores de configuración que sustituyen a los de create_app
+    """
+    os.environ["MONGO_URI"] = os.getenv("MONGO_BENCH_URI", DEFAULT_BENCH_URI)
+    os.environ.setdefault("TASK_QUEUE_MODE", "inline")
+    os.environ.setdefault("JWT_BLOCKLIST_BACKEND", "memory")
+
+    from app import create_app
+    from app.extensions import mongo
+    from app.models.indexes import ensure_indexes
+
+    app = create_app()
+    app.config.update(config)
+    if args.mongomock:
+        import mongomock
+        from tests.mongomock_compat import patch_mongomock
+        patch_mongomock()
+        mongo.cx = mongomock.MongoClient()
+        mongo.db = mongo.cx["donacrypto_bench"]
+
+    with app.app_context():
+        mongo.cx.drop_database(mongo.db.name)
+        ensure_indexes()
+    return app
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> List[float]:
+    """Ejecuta fn repeat veces y devuelve la duración de cada ejecución (segundos)"""
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summary(samples: List[float]) -> Dict[str, float]:
+    """Media, p50 y p99 en milisegundos"""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3)
+    }
+
+
+def report(name: str, samples: List[float], **extra: Any) -> None:
+    """Imprime una línea de resultados"""
+    values = {**summary(samples), **extra}
+    print(f"{name:<40} " + "  ".join(f"{key}={value}" for key, value in values.items()))
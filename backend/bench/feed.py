@@ -0,0 +1,108 @@
+"""
+Feed en modo push (timelines materializados), pull (posts de los creadores) e híbrido
+
+Para cada distribución de seguidores mide el coste de publicar un post (fan-out a los
+seguidores en push) y la latencia de leer la primera página del feed con tres umbrales:
+todos los creadores en push, todos en pull, e híbrido con FEED_CELEBRITY_THRESHOLD (o
+--threshold), donde solo los creadores con al menos ese número de seguidores van en pull.
+
+Distribuciones: "uniform" (cada follower sigue creadores al azar) y "zipf" (cola larga:
+unos pocos creadores famosos acumulan casi todos los seguidores, el caso del híbrido).
+
+    python -m bench.feed --creators 50 --followers 20000 --follows 20 --distribution uniform,zipf
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from .common import bench_app, parse_args, report, timed
+
+# Exponente de la distribución zipf: peso del creador de rango r = 1 / r^ZIPF_EXPONENT
+ZIPF_EXPONENT = 1.2
+
+
+def _arguments(parser) -> None:
+    parser.add_argument("--creators", type=int, default=50)
+    parser.add_argument("--followers", type=int, default=20000)
+    parser.add_argument("--follows", type=int, default=20, help="Creadores seguidos por cada follower")
+    parser.add_argument("--distribution", default="uniform,zipf", help="Distribuciones de seguidores, separadas por comas")
+    parser.add_argument("--threshold", type=int, default=None,
+                        help="Umbral del modo híbrido (por defecto FEED_CELEBRITY_THRESHOLD)")
+    parser.add_argument("--posts", type=int, default=20, help="Posts por creador")
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=20)
+
+
+def _followed(creators: List[str], weights: Optional[List[float]], count: int, rng: random.Random) -> List[str]:
+    """Muestra sin reemplazo de count creadores (ponderada si hay pesos)"""
+    if weights is None:
+        return rng.sample(creators, count)
+    # Muestreo ponderado sin reemplazo (Efraimidis-Spirakis): las count claves mayores
+    keyed = sorted(((rng.random() ** (1 / weight), creator) for creator, weight in zip(creators, weights)), reverse=True)
+    return [creator for _, creator in keyed[:count]]
+
+
+def _seed(mongo, args, distribution: str, rng: random.Random) -> List[Dict[str, Any]]:
+    creators = [f"creator{i}@bench.local" for i in range(args.creators)]
+    followers = [f"follower{i}@bench.local" for i in range(args.followers)]
+    weights = [1 / (rank + 1) ** ZIPF_EXPONENT for rank in range(len(creators))] if distribution == "zipf" else None
+    mongo.db.users.insert_many([
+        {"email": email, "username": email.split("@")[0], "role": "creator", "created_at": datetime.now()}
+        for email in creators
+    ])
+    follows = min(args.follows, len(creators))
+    for start in range(0, len(followers), 1000):
+        mongo.db.followings.insert_many([
+            {"follower_email": follower, "creator_email": creator, "created_at": datetime.now()}
+            for follower in followers[start:start + 1000]
+            for creator in _followed(creators, weights, follows, rng)
+        ])
+    started = datetime.now() - timedelta(days=30)
+    posts = [
+        {"creator_email": creator, "title": f"post {n}", "content": "", "likes_count": 0,
+         "created_at": started + timedelta(seconds=rng.randint(0, 30 * 86400))}
+        for creator in creators
+        for n in range(args.posts)
+    ]
+    mongo.db.posts.insert_many(posts)
+    return posts
+
+
+def main() -> None:
+    args = parse_args(__doc__, _arguments)
+    app = bench_app(args)
+
+    from app.extensions import mongo
+    from app.utils.feed_utils import build_feed, publish_post
+    from app.utils.stats_utils import rebuild_creator_stats
+
+    rng = random.Random(args.seed)
+    hybrid_threshold = args.threshold if args.threshold is not None else app.config["FEED_CELEBRITY_THRESHOLD"]
+    with app.app_context():
+        for distribution in args.distribution.split(","):
+            for collection in ("users", "followings", "posts", "timelines", "creator_stats"):
+                mongo.db[collection].delete_many({})
+            posts = _seed(mongo, args, distribution, rng)
+            rebuild_creator_stats()
+            readers = [f"follower{rng.randrange(args.followers)}@bench.local" for _ in range(args.reads)]
+            max_followers = max(
+                (stats.get("followers_count", 0) for stats in mongo.db.creator_stats.find({}, {"followers_count": 1})),
+                default=0
+            )
+            print(f"{distribution}: creador con más seguidores: {max_followers}")
+
+            for mode, threshold in (("push", 2 ** 31), ("pull", 0), (f"híbrido {hybrid_threshold}", hybrid_threshold)):
+                app.config["FEED_CELEBRITY_THRESHOLD"] = threshold
+                celebrities = mongo.db.creator_stats.count_documents({"followers_count": {"$gte": threshold}})
+                mongo.db.timelines.delete_many({})
+                iterator = iter(posts)
+                publish = timed(lambda: publish_post(next(iterator)), len(posts))
+                report(f"{distribution}, {mode}: publicar post", publish, celebrities=celebrities,
+                       timelines=mongo.db.timelines.count_documents({}))
+
+                readers_iter = iter(readers)
+                read = timed(lambda: build_feed(next(readers_iter), 0, args.page_size), len(readers))
+                report(f"{distribution}, {mode}: primera página del feed", read)
+
+
+if __name__ == "__main__":
+    main()
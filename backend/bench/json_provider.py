@@ -0,0 +1,61 @@
+"""
+Serialización de respuestas: StdlibJSONProvider frente a OrjsonJSONProvider
+
+Serializa páginas de feed de 100 posts (ObjectId, fechas, likes) con cada proveedor
+mediante response(), como jsonify. No usa la base de datos.
+
+    python -m bench.json_provider --pages 2000
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId
+from .common import report, timed
+
+
+def _feed_page(rng: random.Random, size: int) -> dict:
+    now = datetime.utcnow()
+    posts = [
+        {
+            "_id": ObjectId(),
+            "creator_email": f"creator{rng.randrange(500)}@bench.local",
+            "creator_username": f"creator{rng.randrange(500)}",
+            "title": f"Post {n}",
+            "content": " ".join(rng.choices(["cripto", "arte", "música", "código", "donación"], k=40)),
+            "created_at": now - timedelta(seconds=rng.randrange(10 ** 6), microseconds=rng.randrange(10 ** 6)),
+            "updated_at": now,
+            "likes_count": rng.randrange(10000),
+            "user_liked": rng.random() < 0.2
+        }
+        for n in range(size)
+    ]
+    return {"posts": posts, "has_more": True, "next_cursor": "eyJhIjoxfQ"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--posts", type=int, default=100, help="Posts por página")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.utils.json_utils import OrjsonJSONProvider, StdlibJSONProvider, orjson
+
+    app = create_app()
+    rng = random.Random(args.seed)
+    pages = [_feed_page(rng, args.posts) for _ in range(20)]
+
+    providers = [("json", StdlibJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonJSONProvider(app)))
+    with app.app_context():
+        for name, provider in providers:
+            counter = iter(range(args.pages))
+            size = len(provider.response(pages[0]).get_data())
+            samples = timed(lambda: provider.response(pages[next(counter) % len(pages)]), args.pages)
+            report(f"{name}: página de {args.posts} posts", samples, bytes=size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Likes directos frente al buffer write-behind (LIKE_WRITE_BEHIND)
+
+Mide la latencia de cada toggle, el coste de los volcados y las escrituras que llegan a
+la base de datos, y comprueba al final que likes_count de cada post coincide con la
+colección de likes, también con varios buffers (workers) tocando los mismos likes.
+
+    python -m bench.like_buffer --toggles 20000 --posts 200 --users 500 --workers 4
+"""
+import random
+import time
+from typing import List
+from bson import ObjectId
+from .common import bench_app, parse_args, report, timed
+
+
+def _arguments(parser) -> None:
+    parser.add_argument("--toggles", type=int, default=20000)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4, help="Buffers independientes (uno por worker)")
+
+
+def _seed_posts(mongo, count: int) -> List[ObjectId]:
+    creators = [f"creator{i}@bench.local" for i in range(max(1, count // 20))]
+    mongo.db.creator_stats.insert_many([{"creator_email": email, "likes_count": 0} for email in creators])
+    result = mongo.db.posts.insert_many([
+        {"creator_email": creators[i % len(creators)], "title": f"post {i}", "likes_count": 0}
+        for i in range(count)
+    ])
+    return list(result.inserted_ids)
+
+
+def _check_counters(mongo) -> int:
+    """Número de posts cuyo likes_count no coincide con la colección de likes"""
+    from app.utils.like_utils import ACTIVE_LIKE_FILTER
+    counts = {
+        item["_id"]: item["count"]
+        for item in mongo.db.likes.aggregate([
+            {"$match": dict(ACTIVE_LIKE_FILTER)},
+            {"$group": {"_id": "$post_id", "count": {"$sum": 1}}}
+        ])
+    }
+    return sum(
+        1 for post in mongo.db.posts.find({}, {"likes_count": 1})
+        if post.get("likes_count", 0) != counts.get(str(post["_id"]), 0)
+    )
+
+
+def main() -> None:
+    args = parse_args(__doc__, _arguments)
+    app = bench_app(args)
+
+    from app.extensions import mongo
+    from app.utils.like_buffer import LikeWriteBuffer
+    from app.utils.like_utils import toggle_like
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        post_ids = _seed_posts(mongo, args.posts)
+        users = [f"user{i}@bench.local" for i in range(args.users)]
+        pairs = [(rng.choice(post_ids), rng.choice(users)) for _ in range(args.toggles)]
+
+        if not args.mongomock:
+            # mongomock no admite las actualizaciones con pipeline de toggle_like
+            iterator = iter(pairs)
+            report("toggle directo", timed(lambda: toggle_like(*next(iterator)), len(pairs)),
+                   mismatched_posts=_check_counters(mongo))
+
+        # Varios workers con su propio buffer sobre los mismos likes; el volcado se lanza a mano
+        buffers = [LikeWriteBuffer() for _ in range(args.workers)]
+        for buffer in buffers:
+            buffer._ensure_started = lambda: None
+        iterator = iter(enumerate(pairs))
+
+        def buffered_toggle() -> None:
+            index, (post_id, user_email) = next(iterator)
+            buffers[index % len(buffers)].toggle(post_id, user_email)
+
+        toggle_samples = timed(buffered_toggle, len(pairs))
+        writes = 0
+        flush_samples: List[float] = []
+        for buffer in buffers:
+            started = time.perf_counter()
+            writes += buffer.flush()
+            flush_samples.append(time.perf_counter() - started)
+        report("toggle con buffer", toggle_samples)
+        report("volcado por worker", flush_samples, like_writes=writes, toggles=len(pairs),
+               mismatched_posts=_check_counters(mongo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Inicios de sesión concurrentes: peticiones por segundo, latencia y rechazos 503
+
+Lanza POST /auth/login desde varios hilos a la vez (como un worker con varios hilos) con
+el pool de hash de --hash-workers procesos (0 = hash en el hilo de la petición). Para
+comparar, ejecutarlo con --hash-workers 0 y con el número de núcleos.
+
+    python -m bench.login --hash-workers 4 --concurrency 1,4,16,64 --logins 2000
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from .common import bench_app, parse_args, report
+
+PASSWORD = "password123"
+
+
+def _arguments(parser) -> None:
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=2000, help="Inicios de sesión por nivel de concurrencia")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Hilos simultáneos, separados por comas")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--hash-method", default="scrypt")
+    parser.add_argument("--max-pending", type=int, default=None)
+
+
+def main() -> None:
+    args = parse_args(__doc__, _arguments)
+    config = {"PASSWORD_HASH_WORKERS": args.hash_workers, "PASSWORD_HASH_METHOD": args.hash_method}
+    if args.max_pending is not None:
+        config["PASSWORD_HASH_MAX_PENDING"] = args.max_pending
+    app = bench_app(args, **config)
+
+    from app.extensions import mongo
+    from app.utils.password_utils import password_hasher
+
+    # create_app ya configuró el hasher: volver a leer la configuración del benchmark
+    password_hasher.init_app(app)
+    with app.app_context():
+        password_hash = password_hasher.hash_password(PASSWORD)
+        emails = [f"user{i}@bench.local" for i in range(args.users)]
+        mongo.db.users.insert_many([
+            {"email": email, "username": email.split("@")[0], "role": "follower", "password": password_hash}
+            for email in emails
+        ])
+
+    def login(n: int) -> Tuple[float, int]:
+        started = time.perf_counter()
+        with app.test_client() as client:
+            response = client.post("/auth/login", json={"email": emails[n % len(emails)], "password": PASSWORD})
+        return time.perf_counter() - started, response.status_code
+
+    for concurrency in (int(value) for value in args.concurrency.split(",")):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results: List[Tuple[float, int]] = list(pool.map(login, range(args.logins)))
+        elapsed = time.perf_counter() - started
+
+        ok = [seconds for seconds, status in results if status == 200]
+        busy = sum(1 for _, status in results if status == 503)
+        report(
+            f"login: {concurrency} hilos, pool de {args.hash_workers}", ok or [0.0],
+            req_per_s=round(len(ok) / elapsed, 1), rejected_503=busy,
+            errors=len(results) - len(ok) - busy
+        )
+
+
+if __name__ == "__main__":
+    main()
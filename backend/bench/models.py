@@ -0,0 +1,96 @@
+"""
+Modelos con __slots__: memoria y velocidad de from_dict / to_dict con 10^6 instancias
+
+Para cada modelo construye --instances objetos con from_dict a partir de documentos como
+los de MongoDB, mide la memoria que ocupan (tracemalloc; los valores de los campos son
+compartidos, así que se mide el coste del propio objeto) y la velocidad de from_dict y
+to_dict. La fila "dict" es la referencia: copiar los documentos tal cual.
+No usa la base de datos.
+
+    python -m bench.models --instances 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from bson import ObjectId
+
+# Documentos distintos que se reutilizan de forma cíclica
+DOCUMENTS = 1000
+
+
+def _documents() -> Dict[str, List[Dict[str, Any]]]:
+    now = datetime.utcnow()
+    return {
+        "User": [
+            {"username": f"user{i}", "email": f"user{i}@bench.local", "role": "creator", "first_name": "Ana",
+             "last_name": "García", "password": "scrypt:32768:8:1$salt$hash", "created_at": now}
+            for i in range(DOCUMENTS)
+        ],
+        "Post": [
+            {"creator_email": f"user{i}@bench.local", "title": f"Post {i}", "content": "contenido", "media_urls": [],
+             "created_at": now, "updated_at": now, "likes_count": i}
+            for i in range(DOCUMENTS)
+        ],
+        "Following": [
+            {"follower_email": f"user{i}@bench.local", "creator_email": "creator@bench.local", "created_at": now}
+            for i in range(DOCUMENTS)
+        ],
+        "Like": [
+            {"user_email": f"user{i}@bench.local", "post_id": str(ObjectId()), "active": True, "created_at": now}
+            for i in range(DOCUMENTS)
+        ],
+        "CreatorWallet": [
+            {"creator_email": f"user{i}@bench.local", "wallet_address": f"0x{i:040x}", "currency_type": "ETH",
+             "created_at": now}
+            for i in range(DOCUMENTS)
+        ]
+    }
+
+
+def _build(from_dict: Callable[[Dict[str, Any]], Any], documents: List[Dict[str, Any]], count: int) -> List[Any]:
+    return [from_dict(documents[i % DOCUMENTS]) for i in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instances", type=int, default=1000000)
+    args = parser.parse_args()
+
+    from app.models.creator_wallet import CreatorWallet
+    from app.models.following import Following
+    from app.models.like import Like
+    from app.models.post import Post
+    from app.models.user import User
+
+    models = {"User": User, "Post": Post, "Following": Following, "Like": Like, "CreatorWallet": CreatorWallet}
+    documents = _documents()
+    count = args.instances
+
+    for name, model in models.items():
+        for label, from_dict, to_dict in (
+            (f"{name} (dict)", dict, dict),
+            (name, model.from_dict, model.to_dict)
+        ):
+            tracemalloc.start()
+            instances = _build(from_dict, documents[name], count)
+            memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del instances
+
+            started = time.perf_counter()
+            instances = _build(from_dict, documents[name], count)
+            build_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            for instance in instances:
+                to_dict(instance)
+            dump_seconds = time.perf_counter() - started
+            del instances
+
+            print(f"{label:<24} bytes_per_instance={memory / count:.0f}  "
+                  f"from_dict_per_s={count / build_seconds:,.0f}  to_dict_per_s={count / dump_seconds:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
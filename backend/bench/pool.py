@@ -0,0 +1,102 @@
+"""
+Pool de conexiones de MongoDB: rendimiento por tamaño del pool y peticiones simultáneas
+
+Para cada tamaño de pool abre un MongoClient con esas opciones (y los compresores de
+--compressors) y lanza GET /user/explore-all-creators desde N hilos a la vez, como las
+peticiones simultáneas de un worker. Además de peticiones por segundo y latencia muestra
+los contadores del pool (conexiones en uso, esperas de checkout y checkouts fallidos).
+Con --mongomock no hay pool y solo se comprueba que el benchmark funciona.
+
+    python -m bench.pool --pool-sizes 5,20,100 --threads 1,8,32,64 --requests 2000
+"""
+import contextlib
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Tuple
+from .common import bench_app, parse_args, report
+
+
+def _arguments(parser) -> None:
+    parser.add_argument("--creators", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000, help="Peticiones por combinación")
+    parser.add_argument("--pool-sizes", default="5,20,100", help="maxPoolSize, separados por comas")
+    parser.add_argument("--threads", default="1,8,32,64", help="Peticiones simultáneas, separadas por comas")
+    parser.add_argument("--compressors", default="", help="Compresión de red: zstd, snappy, zlib")
+    parser.add_argument("--wait-queue-timeout-ms", type=int, default=None)
+
+
+def _seed(mongo, rng: random.Random, count: int) -> None:
+    creators = [
+        {"email": f"creator{i}@bench.local", "username": f"creator{i}", "username_lower": f"creator{i}",
+         "role": "creator", "created_at": datetime.utcnow()}
+        for i in range(count)
+    ]
+    mongo.db.users.insert_many(creators)
+    mongo.db.users.insert_one({"email": "reader@bench.local", "username": "reader", "role": "follower"})
+    mongo.db.creator_stats.insert_many([
+        {"creator_email": creator["email"], "followers_count": int(rng.paretovariate(1.2)), "posts_count": 0}
+        for creator in creators
+    ])
+
+
+def main() -> None:
+    args = parse_args(__doc__, _arguments)
+    app = bench_app(args)
+
+    from flask_jwt_extended import create_access_token
+    from pymongo import MongoClient
+    from app.extensions import mongo
+    from app.utils.db_utils import PoolMetricsListener
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        _seed(mongo, rng, args.creators)
+        token = create_access_token(identity="reader@bench.local", additional_claims={"role": "follower"})
+    headers = {"Authorization": f"Bearer {token}"}
+    pages = max(1, args.creators // 12)
+
+    def request(n: int) -> Tuple[float, int]:
+        started = time.perf_counter()
+        with app.test_client() as client:
+            response = client.get(
+                "/user/explore-all-creators", query_string={"sort": "popular", "page": n % pages + 1}, headers=headers
+            )
+        return time.perf_counter() - started, response.status_code
+
+    for pool_size in (int(value) for value in args.pool_sizes.split(",")):
+        for threads in (int(value) for value in args.threads.split(",")):
+            # Cliente nuevo por combinación: los contadores del pool empiezan de cero
+            listener = PoolMetricsListener()
+            if not args.mongomock:
+                options = {"maxPoolSize": pool_size, "event_listeners": [listener]}
+                if args.compressors:
+                    options["compressors"] = args.compressors
+                if args.wait_queue_timeout_ms is not None:
+                    options["waitQueueTimeoutMS"] = args.wait_queue_timeout_ms
+                mongo.cx = MongoClient(app.config["MONGO_URI"], **options)
+                mongo.db = mongo.cx.get_default_database()
+
+            started = time.perf_counter()
+            # role_required imprime los claims en cada petición
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    results: List[Tuple[float, int]] = list(executor.map(request, range(args.requests)))
+            elapsed = time.perf_counter() - started
+
+            ok = [seconds for seconds, status in results if status == 200]
+            stats = listener.stats(pool_size)
+            report(
+                f"pool {pool_size}, {threads} hilos", ok or [0.0],
+                req_per_s=round(len(ok) / elapsed, 1), errors=len(results) - len(ok),
+                max_checked_out=stats["max_checked_out"], wait_avg_ms=stats["checkout_wait_avg_ms"],
+                wait_max_ms=stats["checkout_wait_max_ms"], checkout_failures=stats["checkout_failures"]
+            )
+            if not args.mongomock:
+                mongo.cx.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Búsqueda de creadores (/user/search-creators): índices frente al $regex anterior
+
+Para cada tamaño de --creators genera creadores con nombres y bios aleatorios y mide, con
+términos de 2, 3 y 5 caracteres del username y con palabras de la bio:
+- "indexado": search_creators (prefijo sobre username_lower + índice de texto de la bio)
+- "regex": la consulta anterior, $regex sin anclar e insensible a mayúsculas sobre username
+  y bio, con count_documents y página ordenada por username
+Con --mongomock no hay índice de texto (la vía indexada solo busca por prefijo) y los
+tiempos no son representativos.
+
+    python -m bench.search --creators 100000,1000000 --queries 300
+"""
+import random
+import string
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from .common import parse_args, bench_app, report, timed
+
+WORDS = ["arte", "música", "código", "cripto", "viajes", "cocina", "ciencia", "juegos", "diseño", "fotografía"]
+
+INSERT_BATCH_SIZE = 10000
+
+PAGE_SIZE = 20
+
+
+def _arguments(parser) -> None:
+    parser.add_argument("--creators", default="100000,1000000", help="Tamaños del conjunto, separados por comas")
+    parser.add_argument("--queries", type=int, default=300)
+
+
+def _seed(mongo, rng: random.Random, count: int) -> List[str]:
+    usernames = set()
+    while len(usernames) < count:
+        usernames.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))))
+    names = sorted(usernames)
+    for start in range(0, len(names), INSERT_BATCH_SIZE):
+        creators = [
+            {"email": f"{username}@bench.local", "username": username, "username_lower": username,
+             "role": "creator", "bio": " ".join(rng.sample(WORDS, 3)), "created_at": datetime.utcnow()}
+            for username in names[start:start + INSERT_BATCH_SIZE]
+        ]
+        mongo.db.users.insert_many(creators)
+        mongo.db.creator_stats.insert_many([
+            {"creator_email": creator["email"], "followers_count": int(rng.paretovariate(1.2)), "posts_count": 0}
+            for creator in creators
+        ])
+    return names
+
+
+def _regex_search(mongo, term: str) -> int:
+    """Consulta anterior de /user/search-creators (primera página y total)"""
+    from app.utils.pagination_utils import USERNAME_SORT
+    from app.utils.stats_utils import get_creator_stats_map
+
+    pattern = {"$regex": term, "$options": "i"}
+    query = {"role": "creator", "$or": [{"username": pattern}, {"bio": pattern}]}
+    total = mongo.db.users.count_documents(query)
+    page = list(mongo.db.users.find(query, {"password": 0}).sort(USERNAME_SORT).limit(PAGE_SIZE))
+    get_creator_stats_map(creator["email"] for creator in page)
+    return total
+
+
+def main() -> None:
+    args = parse_args(__doc__, _arguments)
+    app = bench_app(args)
+
+    from app.extensions import mongo
+    from app.models.indexes import ensure_indexes
+    from app.utils.search_utils import search_creators
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        for size in (int(value) for value in args.creators.split(",")):
+            mongo.db.users.drop()
+            mongo.db.creator_stats.drop()
+            ensure_indexes(["users", "creator_stats"])
+            names = _seed(mongo, rng, size)
+
+            terms: Dict[str, Callable[[], str]] = {
+                "prefijo de 2": lambda: rng.choice(names)[:2],
+                "prefijo de 3": lambda: rng.choice(names)[:3],
+                "prefijo de 5": lambda: rng.choice(names)[:5],
+                "palabra de la bio": lambda: rng.choice(WORDS)
+            }
+            paths: Dict[str, Callable[[str], int]] = {
+                "indexado": lambda term: search_creators(term, 0, PAGE_SIZE)[1],
+                "regex": lambda term: _regex_search(mongo, term)
+            }
+            for label, make_term in terms.items():
+                # Los mismos términos para las dos vías
+                queries = [make_term() for _ in range(args.queries)]
+                for path, search in paths.items():
+                    totals: List[Any] = []
+                    pending = iter(queries)
+                    samples = timed(lambda: totals.append(search(next(pending))), len(queries))
+                    report(f"{size}: {label}, {path}", samples, mean_total=round(sum(totals) / len(totals), 1))
+
+
+if __name__ == "__main__":
+    main()
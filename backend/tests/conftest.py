@@ -0,0 +1,113 @@
+"""
+Fixtures de las pruebas
+
+Por defecto las pruebas usan mongomock. Con MONGO_TEST_URI se ejecutan contra esa base
+de datos (que se vacía antes de cada prueba) y se activan también las marcadas con
+requires_mongo: concurrencia, varios procesos y actualizaciones con pipeline, que
+mongomock no reproduce.
+"""
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterator, Optional
+
+import mongomock
+import pymongo.collection
+import pytest
+
+MONGO_TEST_URI: str = os.getenv("MONGO_TEST_URI", "")
+
+os.environ["MONGO_URI"] = MONGO_TEST_URI or "mongodb://localhost:27017/donacrypto_test"
+os.environ.setdefault("TASK_QUEUE_MODE", "inline")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+from app import create_app  # noqa: E402
+from app.extensions import mongo  # noqa: E402
+from app.models.indexes import ensure_indexes  # noqa: E402
+from app.utils.dashboard_utils import dashboard_cache  # noqa: E402
+from app.utils.user_utils import user_cache  # noqa: E402
+from tests.mongomock_compat import patch_mongomock  # noqa: E402
+
+requires_mongo = pytest.mark.skipif(not MONGO_TEST_URI, reason="Necesita MONGO_TEST_URI (MongoDB real)")
+
+if not MONGO_TEST_URI:
+    patch_mongomock()
+
+
+@pytest.fixture
+def app() -> Iterator[Any]:
+    """Aplicación sobre una base de datos vacía con los índices creados"""
+    app = create_app()
+    app.config["TESTING"] = True
+    if not MONGO_TEST_URI:
+        mongo.cx = mongomock.MongoClient()
+        mongo.db = mongo.cx["donacrypto_test"]
+    user_cache.clear()
+    dashboard_cache.clear()
+    with app.app_context():
+        mongo.cx.drop_database(mongo.db.name)
+        ensure_indexes()
+        yield app
+
+
+@pytest.fixture
+def client(app: Any) -> Any:
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client: Any):
+    """Registra un usuario e inicia sesión; devuelve las cabeceras con su token"""
+    def _register(username: str, role: str = "follower", email: Optional[str] = None) -> Dict[str, str]:
+        email = email or f"{username}@example.com"
+        response = client.post("/auth/register", json={
+            "username": username, "email": email, "password": "password123", "role": role
+        })
+        assert response.status_code == 201, response.get_json()
+        response = client.post("/auth/login", json={"email": email, "password": "password123"})
+        assert response.status_code == 200, response.get_json()
+        return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+    return _register
+
+
+class QueryCounter:
+    """Cuenta las lecturas por colección (find, find_one, aggregate, count_documents...)"""
+
+    METHODS = ("find", "find_one", "aggregate", "count_documents", "distinct", "find_one_and_update")
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def wrap(self, method: Any, name: str) -> Any:
+        counter = self
+
+        def wrapper(collection: Any, *args: Any, **kwargs: Any) -> Any:
+            # find_one llama internamente a find: solo se cuenta la llamada exterior
+            depth = getattr(counter._local, "depth", 0)
+            if depth == 0:
+                counter.calls[(collection.name, name)] += 1
+            counter._local.depth = depth + 1
+            try:
+                return method(collection, *args, **kwargs)
+            finally:
+                counter._local.depth = depth
+        return wrapper
+
+
+@pytest.fixture
+def query_counter(monkeypatch: pytest.MonkeyPatch) -> QueryCounter:
+    """Cuenta las operaciones de lectura enviadas a la base de datos durante la prueba"""
+    counter = QueryCounter()
+    collection_class = pymongo.collection.Collection if MONGO_TEST_URI else mongomock.Collection
+    for name in QueryCounter.METHODS:
+        monkeypatch.setattr(collection_class, name, counter.wrap(getattr(collection_class, name), name))
+    return counter
@@ -0,0 +1,99 @@
+"""
+Ajustes de mongomock para pymongo 4.x
+
+mongomock 4.3 no acepta los argumentos que pymongo 4.9+ pasa a las operaciones de
+bulk_write (sort en UpdateOne/ReplaceOne). Este módulo sustituye bulk_write por una
+versión que aplica cada operación por separado y devuelve los mismos resultados y
+errores (BulkWriteError con writeErrors/upserted) que un servidor real.
+
+mongomock tampoco implementa $text: las consultas con $text fallan como en un servidor
+sin índice de texto (OperationFailure con código 27).
+"""
+from typing import Any, Dict, List
+import mongomock
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+
+class _BulkResult:
+    def __init__(self, details: Dict[str, Any]) -> None:
+        self.bulk_api_result = details
+        self.acknowledged = True
+        self.inserted_count = details["nInserted"]
+        self.matched_count = details["nMatched"]
+        self.modified_count = details["nModified"]
+        self.deleted_count = details["nRemoved"]
+        self.upserted_count = details["nUpserted"]
+        self.upserted_ids = {item["index"]: item["_id"] for item in details["upserted"]}
+
+
+def _apply(collection: mongomock.Collection, op: Any, details: Dict[str, Any], index: int) -> None:
+    document = getattr(op, "_doc", None)
+    if isinstance(op, InsertOne):
+        collection.insert_one(document)
+        details["nInserted"] += 1
+    elif isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+        if isinstance(op, ReplaceOne):
+            result = collection.replace_one(op._filter, document, upsert=op._upsert)
+        elif isinstance(op, UpdateOne):
+            result = collection.update_one(op._filter, document, upsert=op._upsert)
+        else:
+            result = collection.update_many(op._filter, document, upsert=op._upsert)
+        if result.upserted_id is not None:
+            details["nUpserted"] += 1
+            details["upserted"].append({"index": index, "_id": result.upserted_id})
+        else:
+            details["nMatched"] += result.matched_count
+            details["nModified"] += result.modified_count
+    elif isinstance(op, DeleteOne):
+        details["nRemoved"] += collection.delete_one(op._filter).deleted_count
+    elif isinstance(op, DeleteMany):
+        details["nRemoved"] += collection.delete_many(op._filter).deleted_count
+    else:
+        raise TypeError(f"Operación no soportada: {op!r}")
+
+
+def bulk_write(self: mongomock.Collection, requests: List[Any], ordered: bool = True, **kwargs: Any) -> _BulkResult:
+    details: Dict[str, Any] = {
+        "writeErrors": [], "writeConcernErrors": [], "upserted": [],
+        "nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0
+    }
+    for index, op in enumerate(requests):
+        try:
+            _apply(self, op, details, index)
+        except DuplicateKeyError as e:
+            details["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e), "op": op})
+            if ordered:
+                break
+    if details["writeErrors"]:
+        raise BulkWriteError(details)
+    return _BulkResult(details)
+
+
+# Código de error de MongoDB para $text sin índice de texto
+INDEX_NOT_FOUND: int = 27
+
+_find = mongomock.Collection.find
+_count_documents = mongomock.Collection.count_documents
+
+
+def _reject_text(query: Any) -> None:
+    if isinstance(query, dict) and "$text" in query:
+        raise OperationFailure("text index required for $text query", code=INDEX_NOT_FOUND)
+
+
+def find(self: mongomock.Collection, filter: Any = None, *args: Any, **kwargs: Any) -> Any:
+    _reject_text(filter)
+    return _find(self, filter, *args, **kwargs)
+
+
+def count_documents(self: mongomock.Collection, filter: Any, *args: Any, **kwargs: Any) -> int:
+    _reject_text(filter)
+    return _count_documents(self, filter, *args, **kwargs)
+
+
+def patch_mongomock() -> None:
+    """Instala bulk_write, find y count_documents compatibles en mongomock.Collection"""
+    mongomock.Collection.bulk_write = bulk_write
+    mongomock.Collection.find = find
+    mongomock.Collection.count_documents = count_documents
@@ -0,0 +1,32 @@
+from app.extensions import mongo
+from app.models.indexes import ensure_indexes
+from app.routes import auth_routes
+
+
+def _register(client, username: str, email: str):
+    return client.post("/auth/register", json={
+        "username": username, "email": email, "password": "password123", "role": "follower"
+    })
+
+
+def test_duplicate_username_is_a_conflict(client):
+    assert _register(client, "taken_name", "first@example.com").status_code == 201
+    response = _register(client, "taken_name", "second@example.com")
+    assert response.status_code == 409
+    assert mongo.db.users.count_documents({"username": "taken_name"}) == 1
+
+
+def test_duplicate_key_on_insert_is_a_conflict(client, monkeypatch):
+    # Simula otro registro con el mismo username guardado tras la comprobación
+    assert _register(client, "taken_name", "first@example.com").status_code == 201
+    monkeypatch.setattr(auth_routes, "find_account_by_username", lambda username: None)
+    assert _register(client, "taken_name", "second@example.com").status_code == 409
+
+
+def test_unique_index_on_duplicated_data_reports_the_values(app):
+    mongo.db.users.drop_indexes()
+    mongo.db.users.insert_many([{"email": f"user{i}@example.com", "username": "twin"} for i in range(2)])
+
+    errors = ensure_indexes(["users"])
+    assert len(errors["users"]) == 1
+    assert "username" in errors["users"][0] and "'twin'" in errors["users"][0]
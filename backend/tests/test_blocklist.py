@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import time
+from types import SimpleNamespace
+
+from pymongo.errors import PyMongoError
+
+from app.extensions import blacklist
+from app.utils import blocklist_utils
+from tests.conftest import requires_mongo
+
+
+def test_blocklist_fails_closed_when_sync_keeps_failing(app, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(blocklist_utils, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(blacklist, "_next_sync", 0.0)
+    monkeypatch.setattr(blacklist, "_last_sync", None)
+
+    failing = [False]
+    sync = blacklist._sync
+
+    def flaky_sync():
+        if failing[0]:
+            raise PyMongoError("sin conexión")
+        sync()
+
+    monkeypatch.setattr(blacklist, "_sync", flaky_sync)
+    blacklist.add("revoked", time.time() + 3600)
+    assert "revoked" in blacklist
+    assert "valid" not in blacklist
+
+    # Dentro del margen se responde con la copia local
+    failing[0] = True
+    clock[0] += blacklist.sync_seconds
+    assert "valid" not in blacklist
+    assert "revoked" in blacklist
+
+    # Pasado el margen sin sincronizar, todo token se rechaza
+    clock[0] += blacklist.max_stale_seconds
+    assert "valid" in blacklist
+
+    # Al recuperarse la sincronización se vuelve a aceptar
+    failing[0] = False
+    clock[0] += blacklist.sync_seconds
+    assert "valid" not in blacklist
+
+
+def _watch_revocation(jti: str, ready, revoked, results) -> None:
+    """Worker independiente: espera a ver revocado un token que revoca otro proceso"""
+    os.environ["JWT_BLOCKLIST_SYNC_SECONDS"] = "0.2"
+    from app import create_app
+    from app.extensions import blacklist
+
+    with create_app().app_context():
+        before = jti in blacklist
+        ready.release()
+        revoked.wait(10)
+        deadline = time.monotonic() + 5
+        while jti not in blacklist and time.monotonic() < deadline:
+            time.sleep(0.05)
+        results.put((before, jti in blacklist))
+
+
+@requires_mongo
+def test_revocation_reaches_other_processes(app):
+    context = multiprocessing.get_context("spawn")
+    ready, revoked, results = context.Semaphore(0), context.Event(), context.Queue()
+    workers = [
+        context.Process(target=_watch_revocation, args=("shared-jti", ready, revoked, results))
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        assert ready.acquire(timeout=30)
+
+    blacklist.add("shared-jti", time.time() + 3600)
+    revoked.set()
+    outcomes = [results.get(timeout=15) for _ in workers]
+    for worker in workers:
+        worker.join(5)
+
+    assert outcomes == [(False, True)] * len(workers)
@@ -0,0 +1,104 @@
+import random
+from typing import Dict, List
+
+import pytest
+
+from app.extensions import mongo
+from app.utils.cascade_utils import cascade_deleter
+
+
+@pytest.fixture
+def ranking(register) -> List[str]:
+    """Creadores con followers_count repetidos; devuelve el orden popular esperado"""
+    rng = random.Random(9)
+    followers: Dict[str, int] = {}
+    for i in range(23):
+        username = f"creator{i:02d}"
+        register(username, role="creator")
+        followers[username] = rng.choice([0, 3, 3, 7, 12])  # Muchos empates a propósito
+        mongo.db.creator_stats.update_one(
+            {"creator_email": f"{username}@example.com"},
+            {"$set": {"followers_count": followers[username]}}
+        )
+    return sorted(followers, key=lambda username: (-followers[username], f"{username}@example.com"))
+
+
+def _walk(client, headers, limit: int, by_cursor: bool) -> List[str]:
+    seen: List[str] = []
+    page, cursor = 1, None
+    while True:
+        params: Dict[str, object] = {"sort": "popular", "limit": limit}
+        if by_cursor and cursor:
+            params["cursor"] = cursor
+        elif not by_cursor:
+            params["page"] = page
+        response = client.get("/user/explore-all-creators", query_string=params, headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        seen.extend(creator["username"] for creator in body["creators"])
+        cursor, page = body["next_cursor"], page + 1
+        if (by_cursor and not cursor) or (not by_cursor and page > body["pages"]):
+            return seen
+
+
+@pytest.mark.parametrize("by_cursor", [True, False])
+def test_popular_pages_are_consistent(client, register, ranking, by_cursor):
+    headers = register("explorer")
+    seen = _walk(client, headers, limit=7, by_cursor=by_cursor)
+
+    assert len(seen) == len(set(seen))
+    assert seen == ranking
+
+
+def test_popular_total_matches_the_ranking(client, register, ranking, monkeypatch):
+    headers = register("explorer")
+    # La cascada queda pendiente: el creador borrado sigue como tombstone
+    monkeypatch.setattr(cascade_deleter, "enqueue_account", lambda *args, **kwargs: None)
+    login = client.post("/auth/login", json={"email": f"{ranking[0]}@example.com", "password": "password123"})
+    response = client.delete(
+        "/user/delete-account", json={"password": "password123"},
+        headers={"Authorization": f"Bearer {login.get_json()['access_token']}"}
+    )
+    assert response.status_code == 200
+    # Creador sin documento de estadísticas: no entra en el ranking
+    mongo.db.creator_stats.delete_one({"creator_email": f"{ranking[1]}@example.com"})
+
+    seen = _walk(client, headers, limit=7, by_cursor=False)
+    body = client.get("/user/explore-all-creators", query_string={"sort": "popular"}, headers=headers).get_json()
+    assert seen == ranking[2:]
+    assert body["total"] == len(seen)
+
+
+def test_follow_by_username_reads_the_account_once(client, register, query_counter):
+    register("artist1", role="creator")
+    headers = register("fan001")
+
+    query_counter.reset()
+    response = client.post("/user/follow", json={"creator_username": "artist1"}, headers=headers)
+    assert response.status_code == 201
+    assert query_counter.calls[("users", "find_one")] == 1
+
+
+def test_public_profile_is_served_from_the_user_cache(client, register, query_counter):
+    register("artist1", role="creator")
+    assert client.get("/user/creator/artist1").status_code == 200
+
+    query_counter.reset()
+    assert client.get("/user/creator/artist1").status_code == 200
+    assert client.get("/user/creator/posts/artist1").status_code == 200
+    assert query_counter.calls[("users", "find_one")] == 0
+
+
+def test_search_pages_stop_at_ranked_candidates(client, register, monkeypatch):
+    from app.utils import search_utils
+    monkeypatch.setattr(search_utils, "SEARCH_CANDIDATE_LIMIT", 4)
+    for i in range(10):
+        register(f"match{i:02d}", role="creator")
+    headers = register("seeker")
+
+    body = client.get("/user/search-creators", query_string={"q": "match", "limit": 2}, headers=headers).get_json()
+    assert body["total"] == 10
+    assert body["pages"] == 2
+    last = client.get("/user/search-creators", query_string={"q": "match", "limit": 2, "page": 2},
+                      headers=headers).get_json()
+    assert len(last["creators"]) == 2 and last["next_cursor"] is None
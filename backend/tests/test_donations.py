@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from app.utils.donation_utils import aggregate_donation_totals, check_donation_totals
+from app.utils.ingest_utils import ingest_donations
+from app.utils.stats_utils import rebuild_creator_stats
+
+CURRENCIES = ["BTC", "ETH", "USDT", "DOGE"]
+
+
+@pytest.fixture
+def creators(register):
+    names = [f"creator{i}" for i in range(4)]
+    for name in names:
+        register(name, role="creator")
+    return names
+
+
+def _ingest_random_donations(creators, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    records = [
+        {
+            "tx_hash": f"0x{n:064x}",
+            "currency_type": rng.choice(CURRENCIES),
+            "amount": round(rng.uniform(0.0001, 50), 8),
+            "receiver_email": f"{rng.choice(creators)}@example.com",
+            "timestamp": f"2024-05-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+02:00"
+        }
+        for n in range(count)
+    ]
+    return ingest_donations(records, chunk_size=97), records
+
+
+def test_materialized_totals_match_aggregation(client, creators):
+    report, records = _ingest_random_donations(creators, 500)
+    assert report["inserted"] == 500
+
+    # Una segunda carga del mismo fichero no cambia los totales
+    assert ingest_donations(records)["duplicates"] == 500
+    assert check_donation_totals() == []
+
+    expected = aggregate_donation_totals()
+    for name in creators:
+        profile = client.get(f"/user/creator/{name}").get_json()
+        totals = expected[f"{name}@example.com"]
+        assert profile["number_of_donations"] == totals["donations_count"]
+        assert profile["total_donations_received"] == pytest.approx(totals["donations_total"])
+        assert profile["donations_by_currency"].keys() == totals["donations_by_currency"].keys()
+        for currency, values in totals["donations_by_currency"].items():
+            assert profile["donations_by_currency"][currency]["count"] == values["count"]
+            assert profile["donations_by_currency"][currency]["total"] == pytest.approx(values["total"])
+
+
+def test_check_donation_totals_fixes_drift(app, creators):
+    from app.extensions import mongo
+
+    _ingest_random_donations(creators, 200, seed=1)
+    mongo.db.creator_stats.update_one({"creator_email": "creator0@example.com"}, {"$inc": {"donations_count": 3}})
+    mongo.db.creator_stats.update_one({"creator_email": "creator1@example.com"}, {"$unset": {"donations_by_currency": ""}})
+
+    assert {email for email, _, _ in check_donation_totals()} == {"creator0@example.com", "creator1@example.com"}
+    assert len(check_donation_totals(fix=True)) == 2
+    assert check_donation_totals() == []
+
+    # La reconstrucción completa llega a los mismos totales
+    rebuild_creator_stats()
+    assert check_donation_totals() == []
+
+
+@pytest.mark.parametrize("timestamp", ["99999999999999999", 1e20, float("nan"), True, "ayer"])
+def test_invalid_timestamps_are_counted_not_raised(app, creators, timestamp):
+    report = ingest_donations([
+        {"tx_hash": "0xbad", "currency_type": "ETH", "amount": 1, "receiver_email": "creator0@example.com",
+         "timestamp": timestamp},
+        {"tx_hash": "0xgood", "currency_type": "ETH", "amount": 1, "receiver_email": "creator0@example.com"}
+    ])
+    assert (report["inserted"], report["invalid"]) == (1, 1)
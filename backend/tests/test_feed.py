@@ -0,0 +1,60 @@
+from typing import Dict, List
+
+
+def _seed_feed(client, register, follower: str, creators: List[str], posts_per_creator: int) -> Dict[str, str]:
+    """Follower que sigue a los creadores indicados, cada uno con posts_per_creator posts"""
+    headers = register(follower)
+    for creator in creators:
+        creator_headers = register(creator, role="creator")
+        for n in range(posts_per_creator):
+            response = client.post("/user/creator/create-post", json={"title": f"{creator} {n}", "content": "..."},
+                                   headers=creator_headers)
+            assert response.status_code == 201
+        assert client.post("/user/follow", json={"creator_username": creator}, headers=headers).status_code == 201
+    return headers
+
+
+def test_feed_page_costs_constant_queries(client, register, query_counter):
+    small = _seed_feed(client, register, "follower_small", ["creator_a1", "creator_a2"], 2)
+    large = _seed_feed(client, register, "follower_large", [f"creator_b{i}" for i in range(5)], 4)
+
+    # Los likes del usuario se resuelven en la misma consulta, tenga los que tenga
+    first_post = client.get("/user/feed?limit=10", headers=large).get_json()["posts"][0]
+    assert client.post("/user/like-post", json={"post_id": first_post["_id"]}, headers=large).status_code == 200
+
+    counts = {}
+    for name, headers, expected in (("small", small, 4), ("large", large, 10)):
+        query_counter.reset()
+        response = client.get("/user/feed?limit=10", headers=headers)
+        assert response.status_code == 200
+        posts = response.get_json()["posts"]
+        assert len(posts) == expected
+        assert all(post["creator_username"] for post in posts)
+        counts[name] = dict(query_counter.calls)
+
+    # Mismo número de consultas con 4 posts de 2 creadores que con 10 posts de 5
+    assert counts["small"] == counts["large"]
+    assert counts["large"].get(("users", "find"), 0) <= 1
+    assert counts["large"].get(("likes", "find"), 0) <= 1
+    assert sum(counts["large"].values()) <= 10
+
+
+
+def test_feed_cursor_walks_past_deleted_posts(app, client, register):
+    from app.extensions import mongo
+
+    headers = _seed_feed(client, register, "follower_gap", ["creator_gap"], 9)
+    # Posts borrados cuyas entradas de timeline aún no se limpiaron
+    for post in mongo.db.posts.find({"title": {"$in": ["creator_gap 7", "creator_gap 6", "creator_gap 2"]}}):
+        mongo.db.posts.delete_one({"_id": post["_id"]})
+
+    titles, cursor = [], None
+    while True:
+        query = "/user/feed?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(query, headers=headers).get_json()
+        titles.extend(post["title"] for post in page["posts"])
+        assert len(page["posts"]) == 3 or page["next_cursor"] is None
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert titles == [f"creator_gap {n}" for n in (8, 5, 4, 3, 1, 0)]
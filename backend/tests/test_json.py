@@ -0,0 +1,32 @@
+import json
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from bson import ObjectId
+
+from app.utils.json_utils import OrjsonJSONProvider, StdlibJSONProvider, orjson
+
+DATES = [
+    datetime(2024, 3, 1, 12, 30),
+    datetime(2024, 3, 1, 12, 30, 5, 250),
+    datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc),
+    datetime(2024, 3, 1, 12, 30, 5, 250, tzinfo=ZoneInfo("UTC")),
+    datetime(2024, 1, 15, 9, 0, tzinfo=ZoneInfo("Europe/London")),
+    datetime(2024, 3, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))),
+    datetime(2024, 3, 1, 12, 30, tzinfo=timezone(timedelta(hours=-5, minutes=-30)))
+]
+
+
+@pytest.mark.skipif(orjson is None, reason="Necesita orjson")
+@pytest.mark.parametrize("value", DATES, ids=str)
+def test_providers_serialize_dates_identically(app, value):
+    document = {"_id": ObjectId("65e1c0ffee0000000000abcd"), "created_at": value, "items": [value]}
+    # Los separadores difieren entre proveedores; los valores serializados no
+    assert json.loads(OrjsonJSONProvider(app).dumps(document)) == json.loads(StdlibJSONProvider(app).dumps(document))
+
+
+def test_utc_dates_end_in_z(app):
+    provider = StdlibJSONProvider(app)
+    assert provider.dumps(datetime(2024, 3, 1, 12, 30)) == '"2024-03-01T12:30:00Z"'
+    assert provider.dumps(datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)) == '"2024-03-01T12:30:00Z"'
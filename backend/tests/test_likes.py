@@ -0,0 +1,64 @@
+import threading
+
+from app.extensions import mongo
+from app.utils.like_utils import ACTIVE_LIKE_FILTER, toggle_like
+from tests.conftest import requires_mongo
+
+
+def _post(creator_email: str = "creator@example.com"):
+    mongo.db.creator_stats.insert_one({"creator_email": creator_email, "likes_count": 0})
+    return mongo.db.posts.insert_one({"creator_email": creator_email, "title": "post", "likes_count": 0}).inserted_id
+
+
+def _run_concurrently(app, jobs):
+    """Ejecuta cada función en su propio hilo, todas a la vez"""
+    barrier = threading.Barrier(len(jobs))
+    errors = []
+
+    def run(job):
+        with app.app_context():
+            barrier.wait()
+            try:
+                job()
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(job,)) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+@requires_mongo
+def test_concurrent_toggles_keep_counter_consistent(app):
+    post_id = _post()
+    # Usuario i toca i + 1 veces repartidas en 4 hilos: los impares quedan con like
+    users = [f"user{i}@example.com" for i in range(12)]
+    jobs = []
+    for i, user_email in enumerate(users):
+        taps = i + 1
+        for thread in range(4):
+            share = taps // 4 + (1 if thread < taps % 4 else 0)
+            if share:
+                jobs.append(lambda user_email=user_email, share=share: [toggle_like(post_id, user_email) for _ in range(share)])
+    _run_concurrently(app, jobs)
+
+    expected = sum(1 for i in range(len(users)) if (i + 1) % 2 == 1)
+    assert mongo.db.likes.count_documents({"post_id": str(post_id)}) == len(users)  # Índice único: sin duplicados
+    assert mongo.db.likes.count_documents({"post_id": str(post_id), **ACTIVE_LIKE_FILTER}) == expected
+    assert mongo.db.posts.find_one({"_id": post_id})["likes_count"] == expected
+    assert mongo.db.creator_stats.find_one({"creator_email": "creator@example.com"})["likes_count"] == expected
+
+
+@requires_mongo
+def test_double_tap_from_many_threads(app):
+    post_id = _post()
+    # 16 toques simultáneos del mismo usuario: número par, el like termina retirado
+    _run_concurrently(app, [lambda: toggle_like(post_id, "tapper@example.com") for _ in range(16)])
+
+    assert mongo.db.likes.count_documents({"post_id": str(post_id)}) == 1
+    assert mongo.db.posts.find_one({"_id": post_id})["likes_count"] == 0
+    liked, count = toggle_like(post_id, "tapper@example.com")
+    assert (liked, count) == (True, 1)
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from app.extensions import mongo
+from app.models.creator_wallet import CreatorWallet
+from app.utils.ingest_utils import ingest_donations
+from app.utils.user_utils import DELETED_ROLE
+from app.utils.wallet_utils import COLLECTION, EMBEDDED, migrate_wallets, wallet_store
+
+ADDRESS = "0x" + "ab" * 20
+
+
+@pytest.fixture(params=[COLLECTION, EMBEDDED])
+def storage(request, app, monkeypatch):
+    monkeypatch.setattr(wallet_store, "storage", request.param)
+    return request.param
+
+
+def _creator(email: str, role: str = "creator") -> None:
+    mongo.db.users.insert_one({"email": email, "username": email.split("@")[0], "role": role,
+                               "created_at": datetime.utcnow()})
+
+
+def test_migration_to_collection_clears_emptied_wallets(app, monkeypatch):
+    _creator("artist@example.com")
+    monkeypatch.setattr(wallet_store, "storage", EMBEDDED)
+    assert wallet_store.add(CreatorWallet("artist@example.com", ADDRESS, "ETH"))
+    assert migrate_wallets(COLLECTION) == 1
+    assert mongo.db.creator_wallets.count_documents({"creator_email": "artist@example.com"}) == 1
+
+    # Se borra la única wallet en el formato embebido y se vuelve a migrar
+    assert wallet_store.delete("artist@example.com", "ETH")
+    migrate_wallets(COLLECTION)
+    assert mongo.db.creator_wallets.count_documents({"creator_email": "artist@example.com"}) == 0
+
+
+def test_migration_to_embedded_clears_emptied_wallets(app, monkeypatch):
+    _creator("artist@example.com")
+    monkeypatch.setattr(wallet_store, "storage", COLLECTION)
+    assert wallet_store.add(CreatorWallet("artist@example.com", ADDRESS, "ETH"))
+    assert migrate_wallets(EMBEDDED) == 1
+
+    assert wallet_store.delete("artist@example.com", "ETH")
+    migrate_wallets(EMBEDDED)
+    user = mongo.db.users.find_one({"email": "artist@example.com"})
+    assert user["wallets"] == [] and "default_wallet" not in user
+
+
+def test_ingest_skips_wallets_of_deleted_creators(app, storage):
+    _creator("artist@example.com")
+    assert wallet_store.add(CreatorWallet("artist@example.com", ADDRESS, "ETH"))
+    record = {"tx_hash": "0x01", "currency_type": "ETH", "amount": "1.5", "wallet_address": ADDRESS}
+    assert wallet_store.resolve_addresses([("ETH", ADDRESS)]) == {("ETH", ADDRESS): "artist@example.com"}
+
+    # Cuenta marcada como eliminada; la cascada todavía no ha borrado sus wallets
+    mongo.db.users.update_one({"email": "artist@example.com"}, {"$set": {"role": DELETED_ROLE}})
+    assert wallet_store.resolve_addresses([("ETH", ADDRESS)]) == {}
+    report = ingest_donations([record])
+    assert (report["inserted"], report["invalid"]) == (0, 1)
+    assert mongo.db.donations.count_documents({}) == 0
+
+
+def test_concurrent_add_in_collection_mode_is_a_conflict(app, monkeypatch):
+    _creator("artist@example.com")
+    monkeypatch.setattr(wallet_store, "storage", COLLECTION)
+    assert wallet_store.add(CreatorWallet("artist@example.com", ADDRESS, "ETH"))
+
+    # Simula otra petición que inserta la misma wallet después de la comprobación previa
+    monkeypatch.setattr(type(mongo.db.creator_wallets), "find_one", lambda *args, **kwargs: None)
+    assert not wallet_store.add(CreatorWallet("artist@example.com", ADDRESS, "ETH"))
+    assert mongo.db.creator_wallets.count_documents({"creator_email": "artist@example.com"}) == 1